@@ -1,47 +1,72 @@
 from flask import Flask, render_template, request, redirect, session, url_for, flash, jsonify
 from flask_sqlalchemy import SQLAlchemy
 from werkzeug.security import generate_password_hash, check_password_hash
-import uuid
-import json
+from types import SimpleNamespace
 from datetime import datetime
+import functools
+import uuid
 import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import serverless  # noqa: E402
+from game_api import init_game_api  # noqa: E402
 
 app = Flask(__name__)
 app.config['SECRET_KEY'] = os.environ.get('FLASK_SECRET_KEY', 'secret!')
 app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('DATABASE_URL', 'sqlite:///chess_game.db')
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 
+serverless.use_compiled_templates(app)
+
+# Registered at import (Flask rejects init_app after the first request); the
+# engine only connects once models() creates the schema
 db = SQLAlchemy(app)
 
-# Models
-class User(db.Model):
-    id = db.Column(db.Integer, primary_key=True)
-    username = db.Column(db.String(80), unique=True, nullable=False)
-    password_hash = db.Column(db.String(255), nullable=False)
 
-    def set_password(self, password: str):
-        self.password_hash = generate_password_hash(password)
+@functools.lru_cache(maxsize=None)
+def models():
+    """
+    User and Room, defined on the first request that touches the database:
+    the mappers are configured and the schema created once per instance,
+    not at import and not on every request to /
+    """
+    class User(db.Model):
+        id = db.Column(db.Integer, primary_key=True)
+        username = db.Column(db.String(80), unique=True, nullable=False)
+        password_hash = db.Column(db.String(255), nullable=False)
+
+        def set_password(self, password: str):
+            self.password_hash = generate_password_hash(password)
 
-    def check_password(self, password: str) -> bool:
-        return check_password_hash(self.password_hash, password)
+        def check_password(self, password: str) -> bool:
+            return check_password_hash(self.password_hash, password)
 
-class Room(db.Model):
-    id = db.Column(db.String(64), primary_key=True)
-    name = db.Column(db.String(120), nullable=False)
-    type = db.Column(db.String(20), nullable=False, default='public')
-    password = db.Column(db.String(255), nullable=True)
-    mode = db.Column(db.String(20), nullable=False, default='pvp')
-    created_by = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=True)
-    created_at = db.Column(db.DateTime, nullable=True, default=datetime.utcnow)
+    class Room(db.Model):
+        id = db.Column(db.String(64), primary_key=True)
+        name = db.Column(db.String(120), nullable=False)
+        type = db.Column(db.String(20), nullable=False, default='public')
+        password = db.Column(db.String(255), nullable=True)
+        mode = db.Column(db.String(20), nullable=False, default='pvp')
+        created_by = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=True)
+        created_at = db.Column(db.DateTime, nullable=True, default=datetime.utcnow)
+
+    with app.app_context():
+        db.create_all()
+    return SimpleNamespace(User=User, Room=Room)
+
+
+if not serverless.cold_start_enabled():
+    models()
+
+# HTTP game API (no Socket.IO on Vercel), for rooms of the Room table
+init_game_api(app, room_exists=lambda room_id: db.session.get(models().Room, room_id) is not None)
 
 # Routes
 @app.route("/")
 def landing():
     try:
-        # Initialize database only when needed
-        with app.app_context():
-            db.create_all()
-        
         if "username" in session:
             return redirect(url_for("dashboard"))
         return render_template('landing.html')
@@ -59,7 +84,8 @@ def login():
                 flash("Username dan password tidak boleh kosong", "error")
                 return render_template("login.html")
             
-            user = User.query.filter_by(username=username).first()
+            m = models()
+            user = m.User.query.filter_by(username=username).first()
             if not user:
                 flash("Username tidak terdaftar", "error")
                 return render_template("login.html")
@@ -86,11 +112,12 @@ def register():
                 flash("Username dan password tidak boleh kosong", "error")
                 return render_template("register.html")
             
-            if User.query.filter_by(username=username).first():
+            m = models()
+            if m.User.query.filter_by(username=username).first():
                 flash("Username sudah ada", "error")
                 return render_template("register.html")
             
-            user = User(username=username)
+            user = m.User(username=username)
             user.set_password(password)
             db.session.add(user)
             db.session.commit()
@@ -107,7 +134,8 @@ def dashboard():
         if "username" not in session:
             return redirect(url_for("landing"))
         
-        rooms = Room.query.all()
+        m = models()
+        rooms = m.Room.query.all()
         return render_template("dashboard.html", rooms=rooms, username=session["username"])
     except Exception as e:
         return f"Error: {str(e)}", 500
@@ -127,8 +155,9 @@ def create_room():
             flash("Nama room tidak boleh kosong", "error")
             return redirect(url_for("dashboard"))
         
+        m = models()
         room_id = str(uuid.uuid4())
-        room = Room(
+        room = m.Room(
             id=room_id,
             name=name,
             type=room_type,
@@ -151,12 +180,13 @@ def game(room_id):
         if "username" not in session:
             return redirect(url_for("landing"))
         
-        room = Room.query.filter_by(id=room_id).first()
+        m = models()
+        room = m.Room.query.filter_by(id=room_id).first()
         if not room:
             flash("Room tidak ditemukan", "error")
             return redirect(url_for("dashboard"))
         
-        return render_template("game.html", room=room, username=session["username"])
+        return render_template("game.html", room=room, room_id=room_id, username=session["username"])
     except Exception as e:
         return f"Error: {str(e)}", 500
 
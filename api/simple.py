@@ -1,7 +1,14 @@
 from flask import Flask, render_template, request, redirect, session, url_for, flash, jsonify
 import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import serverless  # noqa: E402
+from game_api import init_game_api  # noqa: E402
 
 app = Flask(__name__)  # Use default folders (api/templates and api/static)
+serverless.use_compiled_templates(app)
 
 app.config['SECRET_KEY'] = os.environ.get('FLASK_SECRET_KEY', 'secret!')
 
@@ -9,6 +16,9 @@ app.config['SECRET_KEY'] = os.environ.get('FLASK_SECRET_KEY', 'secret!')
 users = {}
 rooms = {}
 
+# game state is kept in GAME_STATE_URL, not here: each invocation may be a new instance
+init_game_api(app)
+
 # Routes
 @app.route("/")
 def landing():
@@ -110,7 +120,7 @@ def game(room_id):
             return redirect(url_for("dashboard"))
         
         room = rooms[room_id]
-        return render_template("game.html", room=room, username=session["username"])
+        return render_template("game.html", room=room, room_id=room_id, username=session["username"])
     except Exception as e:
         return f"Error: {str(e)}", 500
 
@@ -0,0 +1,27 @@
+from jinja2.runtime import LoopContext, Macro, Markup, Namespace, TemplateNotFound, TemplateReference, TemplateRuntimeError, Undefined, escape, identity, internalcode, markup_join, missing, str_join
+name = 'game.html'
+
+def root(context, missing=missing):
+    resolve = context.resolve_or_missing
+    undefined = environment.undefined
+    concat = environment.concat
+    cond_expr_undefined = Undefined
+    if 0: yield None
+    l_0_url_for = resolve('url_for')
+    l_0_room_id = resolve('room_id')
+    l_0_username = resolve('username')
+    pass
+    yield '<!DOCTYPE html>\n<html>\n<head>\n    <title>Game Room</title>\n    \n    <link rel="stylesheet" href="'
+    yield escape(context.call((undefined(name='url_for') if l_0_url_for is missing else l_0_url_for), 'static', filename='css/style.css'))
+    yield '">\n    <style>\n      .wrap { max-width: 1100px; margin: 16px auto; color: var(--text); font-family: Inter, system-ui, -apple-system, Segoe UI, Roboto, Arial, sans-serif; }\n      .top { display:flex; align-items:center; justify-content:space-between; margin-bottom: 12px; }\n      .status { font-size: 14px; color: var(--muted); }\n      .board { width: 360px; height: 360px; display: grid; grid-template-columns: repeat(3, 1fr); grid-template-rows: repeat(3, 1fr); border: 2px solid var(--border); border-radius: 12px; overflow: hidden; background: #0b1224; box-shadow: 0 10px 30px rgba(0,0,0,.25); }\n      .cell { display:flex; align-items:center; justify-content:center; font-size: 64px; cursor: pointer; color: #e5e7eb; background: #0e1426; border: 1px solid var(--border); }\n      .cell:hover { background: #121a31; }\n      .panel { margin-top: 10px; color: var(--text); display:flex; gap:8px; align-items:center; flex-wrap: wrap; }\n      .btn { padding: 10px 12px; background: linear-gradient(135deg, var(--primary), #34d399); color:#064e3b; border:none; border-radius: 10px; cursor: pointer; font-weight:700; }\n      .btn:disabled { background: #374151; color:#9ca3af; cursor:not-allowed; }\n      .btn.secondary { background: #1f2937; color: #e5e7eb; }\n      .btn.danger { background: #dc2626; color: #fef2f2; }\n      .btn.success { background: #059669; color: #f0fdf4; }\n      .notice { margin-left: auto; color: var(--muted); }\n      .player-info { display: flex; gap: 16px; margin-bottom: 16px; }\n      .player-card { background: #0e1426; padding: 12px; border-radius: 8px; border: 1px solid var(--border); text-align: center; }\n      .player-card.current { border-color: #34d399; background: #064e3b; }\n      .flash-message { padding: 12px; border-radius: 8px; margin-bottom: 16px; position: fixed; top: 20px; right: 20px; z-index: 1001; max-width: 300px; }\n      .flash-message.error { background: #7f1d1d; color: #fca5a5; border: 1px solid #dc2626; }\n      .flash-message.success { background: #065f46; color: #6ee7b7; border: 1px solid #059669; }\n      .flash-message.info { background: #1e40af; color: #93c5fd; border: 1px solid #2563eb; }\n    </style>\n    \n</head>\n<body>\n<div class="wrap">\n  <div class="top">\n    <div class="status">Room: <strong>'
+    yield escape((undefined(name='room_id') if l_0_room_id is missing else l_0_room_id))
+    yield '</strong> • User: <strong>'
+    yield escape((undefined(name='username') if l_0_username is missing else l_0_username))
+    yield '</strong></div>\n    <div class="status" id="status">Connecting...</div>\n  </div>\n  \n  <div class="player-info" id="playerInfo" style="display: none;">\n    <div class="player-card" id="playerX">\n      <div style="font-size: 24px; font-weight: bold; color: #34d399;">X</div>\n      <div id="playerXName">-</div>\n    </div>\n    <div class="player-card" id="playerO">\n      <div style="font-size: 24px; font-weight: bold; color: #fbbf24;">O</div>\n      <div id="playerOName">-</div>\n    </div>\n  </div>\n  \n  <div class="board" id="board"></div>\n  \n  <div class="panel">\n    <button class="btn" id="btnRematch" style="display: none;">Play Again</button>\n    <button class="btn secondary" id="btnLeave">Leave Room</button>\n    <span id="rematchInfo" class="notice"></span>\n  </div>\n</div>\n\n<script>\n// No Socket.IO on the serverless deployment: the game API (game_api.py) is\n// long-polled, each request held until the room\'s version moves past ours.\nconst roomId = "'
+    yield escape((undefined(name='room_id') if l_0_room_id is missing else l_0_room_id))
+    yield '";\nconst username = "'
+    yield escape((undefined(name='username') if l_0_username is missing else l_0_username))
+    yield '";\nconst api = `/api/game/${encodeURIComponent(roomId)}`;\nconst WAIT_SECONDS = 8;\n\nlet myMark = null; // \'X\' | \'O\' | null (watching)\nlet turn = \'X\';\nlet board = Array(9).fill(\'\');\nlet winner = null;\nlet version = 0;\nlet etag = null;\n\nconst statusEl = document.getElementById(\'status\');\nconst boardEl = document.getElementById(\'board\');\nconst rematchInfo = document.getElementById(\'rematchInfo\');\nconst playerInfo = document.getElementById(\'playerInfo\');\nconst playerXName = document.getElementById(\'playerXName\');\nconst playerOName = document.getElementById(\'playerOName\');\nconst btnRematch = document.getElementById(\'btnRematch\');\n\nfunction showFlashMessage(message, type = \'info\') {\n  const flash = document.createElement(\'div\');\n  flash.className = `flash-message ${type}`;\n  flash.textContent = message;\n  document.body.appendChild(flash);\n  \n  setTimeout(() => {\n    flash.style.opacity = \'0\';\n    flash.style.transition = \'opacity 0.3s ease\';\n    setTimeout(() => flash.remove(), 300);\n  }, 3000);\n}\n\nfunction renderBoard(){\n  boardEl.innerHTML = \'\';\n  for (let i=0;i<9;i++){\n    const div = document.createElement(\'div\');\n    div.className = \'cell\';\n    div.textContent = board[i] || \'\';\n    div.addEventListener(\'click\', () => onCell(i));\n    boardEl.appendChild(div);\n  }\n}\n\nfunction updateStatus(){\n  if (winner === \'draw\') { \n    statusEl.textContent = \'Game Draw!\'; \n    return; \n  }\n  if (winner === \'X\' || winner === \'O\') { \n    statusEl.textContent = `Winner: ${winner}`; \n    return; \n  }\n  statusEl.textContent = `Turn: ${turn}` + (myMark ? ` | You: ${myMark}` : \' | Watching\');\n}\n\nfunction updatePlayerCards() {\n  document.getElementById(\'playerX\').classList.toggle(\'current\', turn === \'X\');\n  document.getElementById(\'playerO\').classList.toggle(\'current\', turn === \'O\');\n}\n\nfunction apply(state, tag) {\n  // a held poll and a move response can cross: never go back to an older version\n  if (state.version < version) return;\n  version = state.version;\n  etag = tag || etag;\n  board = state.board;\n  turn = state.turn;\n  winner = state.winner;\n  myMark = state.you;\n  playerXName.textContent = state.players.X || \'-\';\n  playerOName.textContent = state.players.O || \'-\';\n  playerInfo.style.display = \'flex\';\n  btnRematch.style.display = winner && myMark ? \'inline-block\' : \'none\';\n  rematchInfo.textContent = winner ? \'Game finished.\' : \'\';\n  renderBoard();\n  updateStatus();\n  updatePlayerCards();\n}\n\nasync function post(path, body) {\n  const r = await fetch(`${api}/${path}`, {\n    method: \'POST\',\n    headers: { \'Content-Type\': \'application/json\' },\n    body: JSON.stringify(body || {})\n  });\n  const data = await r.json();\n  if (r.ok) {\n    apply(data, r.headers.get(\'ETag\'));\n  } else if (path !== \'join\') {\n    showFlashMessage(data.error || \'Error occurred\', \'error\');\n  }\n}\n\nasync function poll() {\n  while (true) {\n    try {\n      const r = await fetch(`${api}/state?wait=${WAIT_SECONDS}`, {\n        headers: etag ? { \'If-None-Match\': etag } : {},\n        cache: \'no-store\'\n      });\n      if (r.status === 200) {\n        apply(await r.json(), r.headers.get(\'ETag\'));\n      } else if (r.status !== 304) {\n        await new Promise(resolve => setTimeout(resolve, 2000));\n      }\n    } catch (e) {\n      await new Promise(resolve => setTimeout(resolve, 2000));\n    }\n  }\n}\n\nfunction onCell(i){\n  if (!myMark || winner) return;\n  if (board[i]) return;\n  if (turn !== myMark) return;\n  post(\'move\', { index: i, version: version });\n}\n\nbtnRematch.addEventListener(\'click\', () => post(\'reset\'));\n\ndocument.getElementById(\'btnLeave\').addEventListener(\'click\', () => {\n  window.location.href = \'/dashboard\';\n});\n\nrenderBoard();\n// a full room answers 409 to join: the page then just watches\npost(\'join\').finally(poll);\n</script>\n</body>\n</html>'
+
+blocks = {}
+debug_info = '6=15&34=17&61=21&62=23'
\ No newline at end of file
@@ -0,0 +1,100 @@
+from jinja2.runtime import LoopContext, Macro, Markup, Namespace, TemplateNotFound, TemplateReference, TemplateRuntimeError, Undefined, escape, identity, internalcode, markup_join, missing, str_join
+name = 'dashboard.html'
+
+def root(context, missing=missing):
+    resolve = context.resolve_or_missing
+    undefined = environment.undefined
+    concat = environment.concat
+    cond_expr_undefined = Undefined
+    if 0: yield None
+    l_0_url_for = resolve('url_for')
+    l_0_session = resolve('session')
+    l_0_rooms = resolve('rooms')
+    l_0_get_flashed_messages = resolve('get_flashed_messages')
+    try:
+        t_1 = environment.filters['capitalize']
+    except KeyError:
+        @internalcode
+        def t_1(*unused):
+            raise TemplateRuntimeError("No filter named 'capitalize' found.")
+    try:
+        t_2 = environment.filters['upper']
+    except KeyError:
+        @internalcode
+        def t_2(*unused):
+            raise TemplateRuntimeError("No filter named 'upper' found.")
+    pass
+    yield '<!DOCTYPE html>\n<html>\n<head>\n    <title>Dashboard</title>\n    <link rel="stylesheet" href="'
+    yield escape(context.call((undefined(name='url_for') if l_0_url_for is missing else l_0_url_for), 'static', filename='css/style.css'))
+    yield '">\n    <meta name="viewport" content="width=device-width, initial-scale=1"/>\n    <script src="https://cdn.socket.io/4.0.0/socket.io.min.js"></script>\n    <style>\n      .layout { display:grid; grid-template-columns: 1fr 1fr; gap: 24px; max-width: 1100px; margin: 0 auto; }\n      .card { background: var(--card); padding:18px; border-radius:14px; border:1px solid var(--border); box-shadow: 0 10px 30px rgba(0,0,0,.25); text-align:left; }\n      .rooms-list { list-style:none; padding:0; margin:0; }\n      .rooms-list li { display:flex; justify-content:space-between; align-items:center; padding:12px; border:1px solid var(--border); border-radius:12px; margin-bottom:10px; background:#0b1224; }\n      .btn { padding:10px 12px; border-radius:10px; }\n      .btn.secondary { background:#1f2937; }\n      .field { width:100%; padding:12px; border:1px solid var(--border); border-radius:10px; background:#0e1426; color:var(--text); }\n      .row { display:flex; gap:10px; }\n      .room-meta { display:flex; gap:8px; margin-top:4px; }\n      .tag { padding:4px 8px; border-radius:6px; font-size:12px; font-weight:500; }\n      .tag.green { background:#065f46; color:#6ee7b7; }\n      .tag.purple { background:#5b21b6; color:#c4b5fd; }\n      .tag.blue { background:#1e40af; color:#93c5fd; }\n      .tag.orange { background:#92400e; color:#fbbf24; }\n      .room-info { flex:1; }\n      .room-actions { display:flex; gap:8px; align-items:center; }\n      .flash-message { padding:12px; border-radius:8px; margin-bottom:16px; }\n      .flash-message.error { background:#7f1d1d; color:#fca5a5; border:1px solid #dc2626; }\n      .flash-message.success { background:#065f46; color:#6ee7b7; border:1px solid #059669; }\n      .flash-message.info { background:#1e40af; color:#93c5fd; border:1px solid #2563eb; }\n    </style>\n</head>\n<body>\n<div class="nav">\n  <a class="brand" href="/">\n    <div class="logo"></div>\n    <span>TicTacToe Online</span>\n  </a>\n  <div class="right">\n    <span class="chip">Hi, '
+    yield escape(environment.getitem((undefined(name='session') if l_0_session is missing else l_0_session), 'username'))
+    yield '</span>\n    <a class="btn secondary" href="'
+    yield escape(context.call((undefined(name='url_for') if l_0_url_for is missing else l_0_url_for), 'logout'))
+    yield '">Logout</a>\n  </div>\n</div>\n\n<div class="layout">\n  <div class="card">\n    <h3>Create Room</h3>\n    <form method="POST">\n      <input class="field" type="text" name="room_name" placeholder="Room Name" required>\n      <div class="row">\n        <select class="field" name="room_type" id="room_type">\n          <option value="public">Public</option>\n          <option value="private">Private</option>\n        </select>\n        <select class="field" name="room_mode" id="room_mode">\n          <option value="pvp">PvP</option>\n          <option value="bot">Vs Computer</option>\n        </select>\n      </div>\n      <input class="field" type="password" name="password" id="password_field" placeholder="Password (for private)" style="display:none;">\n      <button class="btn" type="submit">Create Room</button>\n    </form>\n    <p class="muted" style="margin:8px 0 0">Max 2 players. In Vs Computer mode, you play as X.</p>\n  </div>\n\n  <div class="card">\n    <h3>Available Rooms</h3>\n    <ul class="rooms-list" id="roomsList">\n      '
+    for l_1_r in (undefined(name='rooms') if l_0_rooms is missing else l_0_rooms):
+        _loop_vars = {}
+        pass
+        yield '\n      <li data-room-id="'
+        yield escape(environment.getitem(l_1_r, 'id'))
+        yield '">\n        <div class="room-info">\n          <div><strong>'
+        yield escape(environment.getitem(l_1_r, 'name'))
+        yield '</strong></div>\n          <div class="room-meta">\n            <span class="tag '
+        yield escape(('green' if (environment.getitem(l_1_r, 'type') == 'public') else 'purple'))
+        yield '">'
+        yield escape(t_1(environment.getitem(l_1_r, 'type')))
+        yield '</span>\n            <span class="tag blue">'
+        yield escape(t_2(environment.getitem(l_1_r, 'mode')))
+        yield '</span>\n            <span class="tag orange">Players: '
+        yield escape(environment.getitem(l_1_r, 'players'))
+        yield '</span>\n            <span class="tag">By: '
+        yield escape(environment.getitem(l_1_r, 'created_by'))
+        yield '</span>\n          </div>\n        </div>\n        <div class="room-actions">\n          '
+        if (environment.getitem(l_1_r, 'type') == 'public'):
+            pass
+            yield '\n            <a class="btn" href="'
+            yield escape(context.call((undefined(name='url_for') if l_0_url_for is missing else l_0_url_for), 'game', room_id=environment.getitem(l_1_r, 'id'), _loop_vars=_loop_vars))
+            yield '">Join</a>\n          '
+        else:
+            pass
+            yield '\n            '
+            if (environment.getitem(l_1_r, 'created_by') == environment.getitem((undefined(name='session') if l_0_session is missing else l_0_session), 'username')):
+                pass
+                yield '\n              <!-- Room creator can join directly -->\n              <a class="btn" href="'
+                yield escape(context.call((undefined(name='url_for') if l_0_url_for is missing else l_0_url_for), 'game', room_id=environment.getitem(l_1_r, 'id'), _loop_vars=_loop_vars))
+                yield '">Join (Your Room)</a>\n            '
+            else:
+                pass
+                yield '\n              <!-- Other users need password -->\n              <form action="'
+                yield escape(context.call((undefined(name='url_for') if l_0_url_for is missing else l_0_url_for), 'game', room_id=environment.getitem(l_1_r, 'id'), _loop_vars=_loop_vars))
+                yield '" method="GET" class="row" style="align-items:center;">\n                <input class="field" style="max-width:160px;" type="password" name="password" placeholder="Room Password" required>\n                <button class="btn" type="submit">Join</button>\n              </form>\n            '
+            yield '\n          '
+        yield '\n        </div>\n      </li>\n      '
+    l_1_r = missing
+    yield '\n    </ul>\n    <div id="noRooms" style="display:none; text-align:center; padding:20px; color:var(--muted);">\n      No rooms available. Create one to get started!\n    </div>\n  </div>\n</div>\n\n<!-- Flash Messages -->\n'
+    l_1_messages = context.call((undefined(name='get_flashed_messages') if l_0_get_flashed_messages is missing else l_0_get_flashed_messages), with_categories=True)
+    pass
+    yield '\n  '
+    if l_1_messages:
+        pass
+        yield '\n    '
+        l_2_loop = missing
+        for (l_2_category, l_2_message), l_2_loop in LoopContext(l_1_messages, undefined):
+            _loop_vars = {}
+            pass
+            yield '\n      <div class="flash-message '
+            yield escape(l_2_category)
+            yield '" id="flash-'
+            yield escape(environment.getattr(l_2_loop, 'index'))
+            yield '">\n        '
+            yield escape(l_2_message)
+            yield '\n        <button onclick="this.parentElement.remove()" style="float:right; background:none; border:none; color:inherit; cursor:pointer;">×</button>\n      </div>\n    '
+        l_2_loop = l_2_category = l_2_message = missing
+        yield '\n  '
+    yield '\n'
+    l_1_messages = missing
+    yield "\n\n<script>\nconst socket = io();\nconst roomsList = document.getElementById('roomsList');\nconst noRooms = document.getElementById('noRooms');\n\n// Auto-hide flash messages after 5 seconds\nsetTimeout(() => {\n  document.querySelectorAll('.flash-message').forEach(msg => {\n    msg.style.opacity = '0';\n    setTimeout(() => msg.remove(), 300);\n  });\n}, 5000);\n\n// Update room list in realtime\nfunction updateRoomList() {\n  const rooms = Array.from(roomsList.children);\n  if (rooms.length === 0) {\n    noRooms.style.display = 'block';\n  } else {\n    noRooms.style.display = 'none';\n  }\n}\n\n// Handle new room created\nsocket.on('room_created', (data) => {\n  const room = data.room;\n  const currentUsername = '"
+    yield escape(context.call(environment.getattr((undefined(name='session') if l_0_session is missing else l_0_session), 'get'), 'username', ''))
+    yield '\';\n  const isCreator = room.created_by === currentUsername;\n  \n  const li = document.createElement(\'li\');\n  li.setAttribute(\'data-room-id\', room.id);\n  li.innerHTML = `\n    <div class="room-info">\n      <div><strong>${room.name}</strong></div>\n      <div class="room-meta">\n        <span class="tag ${room.type === \'public\' ? \'green\' : \'purple\'}">${room.type.charAt(0).toUpperCase() + room.type.slice(1)}</span>\n        <span class="tag blue">${room.mode.toUpperCase()}</span>\n        <span class="tag orange">Players: ${room.players}</span>\n        <span class="tag">By: ${room.created_by}</span>\n      </div>\n    </div>\n    <div class="room-actions">\n      ${room.type === \'public\' \n        ? `<a class="btn" href="/game/${room.id}">Join</a>`\n        : isCreator\n          ? `<a class="btn" href="/game/${room.id}">Join (Your Room)</a>`\n          : `<form action="/game/${room.id}" method="GET" class="row" style="align-items:center;">\n              <input class="field" style="max-width:160px;" type="password" name="password" placeholder="Room Password" required>\n              <button class="btn" type="submit">Join</button>\n             </form>`\n      }\n    </div>\n  `;\n  \n  // Add with animation\n  li.style.opacity = \'0\';\n  li.style.transform = \'translateY(-20px)\';\n  roomsList.insertBefore(li, roomsList.firstChild);\n  \n  setTimeout(() => {\n    li.style.transition = \'all 0.3s ease\';\n    li.style.opacity = \'1\';\n    li.style.transform = \'translateY(0)\';\n  }, 10);\n  \n  updateRoomList();\n});\n\n// Handle room updated (player count)\nsocket.on(\'room_updated\', (data) => {\n  const roomElement = document.querySelector(`[data-room-id="${data.room_id}"]`);\n  if (roomElement) {\n    const playerCountElement = roomElement.querySelector(\'.tag.orange\');\n    if (playerCountElement) {\n      playerCountElement.textContent = `Players: ${data.players}`;\n    }\n  }\n});\n\n// Handle room dissolved\nsocket.on(\'room_dissolved\', (data) => {\n  const roomElement = document.querySelector(`[data-room-id="${data.room_id}"]`);\n  if (roomElement) {\n    roomElement.style.transition = \'all 0.3s ease\';\n    roomElement.style.opacity = \'0\';\n    roomElement.style.transform = \'translateX(100px)\';\n    setTimeout(() => {\n      roomElement.remove();\n      updateRoomList();\n    }, 300);\n  }\n});\n\n// Handle user connections\nsocket.on(\'user_connected\', (data) => {\n  console.log(`User connected: ${data.username}`);\n});\n\nsocket.on(\'user_disconnected\', (data) => {\n  console.log(`User disconnected: ${data.username}`);\n});\n\n// Initialize room list state\nupdateRoomList();\n\ndocument.getElementById("room_type").addEventListener("change", function(){\n    let passField = document.getElementById("password_field");\n    passField.style.display = (this.value === "private") ? "block" : "none";\n});\n</script>\n</body>\n</html>'
+
+blocks = {}
+debug_info = '5=28&38=30&39=32&67=34&68=38&70=40&72=42&73=46&74=48&75=50&79=52&80=55&82=60&84=63&87=68&105=77&106=81&107=85&108=89&141=96'
\ No newline at end of file
@@ -0,0 +1,46 @@
+from jinja2.runtime import LoopContext, Macro, Markup, Namespace, TemplateNotFound, TemplateReference, TemplateRuntimeError, Undefined, escape, identity, internalcode, markup_join, missing, str_join
+name = 'landing.html'
+
+def root(context, missing=missing):
+    resolve = context.resolve_or_missing
+    undefined = environment.undefined
+    concat = environment.concat
+    cond_expr_undefined = Undefined
+    if 0: yield None
+    l_0_url_for = resolve('url_for')
+    l_0_session = resolve('session')
+    pass
+    yield '<!DOCTYPE html>\n<html>\n<head>\n  <meta charset="utf-8"/>\n  <meta name="viewport" content="width=device-width, initial-scale=1"/>\n  <title>TicTacToe Online</title>\n  <link rel="stylesheet" href="'
+    yield escape(context.call((undefined(name='url_for') if l_0_url_for is missing else l_0_url_for), 'static', filename='css/style.css'))
+    yield '">\n</head>\n<body>\n  <div class="page">\n    <div class="nav">\n      <a class="brand" href="/">\n        <div class="logo"></div>\n        <span>TicTacToe Online</span>\n      </a>\n      <div class="right">\n        <span class="chip">Fast • Secure • Realtime</span>\n        '
+    if context.call(environment.getattr((undefined(name='session') if l_0_session is missing else l_0_session), 'get'), 'username'):
+        pass
+        yield '\n          <a class="btn secondary" href="'
+        yield escape(context.call((undefined(name='url_for') if l_0_url_for is missing else l_0_url_for), 'dashboard'))
+        yield '">Dashboard</a>\n          <a class="btn secondary" href="'
+        yield escape(context.call((undefined(name='url_for') if l_0_url_for is missing else l_0_url_for), 'logout'))
+        yield '">Logout</a>\n        '
+    else:
+        pass
+        yield '\n          <a class="btn secondary" href="'
+        yield escape(context.call((undefined(name='url_for') if l_0_url_for is missing else l_0_url_for), 'login'))
+        yield '">Login</a>\n          <a class="btn" href="'
+        yield escape(context.call((undefined(name='url_for') if l_0_url_for is missing else l_0_url_for), 'register'))
+        yield '">Get Started</a>\n        '
+    yield '\n      </div>\n    </div>\n\n    <section class="hero">\n      <h1>Play TicTacToe with Friends</h1>\n      <p>Create private or public rooms. Real-time moves, PvP or Vs Computer.</p>\n      <div class="cta">\n        '
+    if context.call(environment.getattr((undefined(name='session') if l_0_session is missing else l_0_session), 'get'), 'username'):
+        pass
+        yield '\n          <a class="btn" href="'
+        yield escape(context.call((undefined(name='url_for') if l_0_url_for is missing else l_0_url_for), 'dashboard'))
+        yield '">Go to Dashboard</a>\n        '
+    else:
+        pass
+        yield '\n          <a class="btn" href="'
+        yield escape(context.call((undefined(name='url_for') if l_0_url_for is missing else l_0_url_for), 'register'))
+        yield '">Start Free</a>\n          <a class="btn secondary" href="'
+        yield escape(context.call((undefined(name='url_for') if l_0_url_for is missing else l_0_url_for), 'login'))
+        yield '">Login</a>\n        '
+    yield '\n      </div>\n    </section>\n\n    <section class="grid cols-3" style="max-width:1100px;margin:0 auto;">\n      <div class="card">\n        <h3>Protected Rooms</h3>\n        <p class="muted">Create private rooms secured with a password. Share the unique link to invite friends.</p>\n      </div>\n      <div class="card">\n        <h3>Realtime Gameplay</h3>\n        <p class="muted">Powered by WebSockets for instant moves and smooth multiplayer.</p>\n      </div>\n      <div class="card">\n        <h3>Play Vs Computer</h3>\n        <p class="muted">Practice solo with a simple built-in bot to sharpen your strategy.</p>\n      </div>\n    </section>\n\n    <footer class="footer">© 2024 TicTacToe Online • Built with Flask + Socket.IO</footer>\n  </div>\n</body>\n</html>\n'
+
+blocks = {}
+debug_info = '7=14&18=16&19=19&20=21&22=26&23=28&32=31&33=34&35=39&36=41'
\ No newline at end of file
@@ -0,0 +1,44 @@
+from jinja2.runtime import LoopContext, Macro, Markup, Namespace, TemplateNotFound, TemplateReference, TemplateRuntimeError, Undefined, escape, identity, internalcode, markup_join, missing, str_join
+name = 'login.html'
+
+def root(context, missing=missing):
+    resolve = context.resolve_or_missing
+    undefined = environment.undefined
+    concat = environment.concat
+    cond_expr_undefined = Undefined
+    if 0: yield None
+    l_0_url_for = resolve('url_for')
+    l_0_get_flashed_messages = resolve('get_flashed_messages')
+    pass
+    yield '<!DOCTYPE html>\n<html>\n<head>\n    <title>Login</title>\n    <link rel="stylesheet" href="'
+    yield escape(context.call((undefined(name='url_for') if l_0_url_for is missing else l_0_url_for), 'static', filename='css/style.css'))
+    yield '">\n    <meta name="viewport" content="width=device-width, initial-scale=1"/>\n    <style>\n      .links { display:flex; gap:10px; justify-content:space-between; align-items:center; margin-top:10px; }\n      .links a { color: var(--accent); text-decoration:none; }\n      .flash-message { padding:12px; border-radius:8px; margin-bottom:16px; }\n      .flash-message.error { background:#7f1d1d; color:#fca5a5; border:1px solid #dc2626; }\n      .flash-message.success { background:#065f46; color:#6ee7b7; border:1px solid #059669; }\n      .flash-message.info { background:#1e40af; color:#93c5fd; border:1px solid #2563eb; }\n    </style>\n    \n</head>\n<body>\n  <div class="page">\n    <div class="nav">\n      <a class="brand" href="/">\n        <div class="logo"></div>\n        <span>TicTacToe Online</span>\n      </a>\n      <div class="right">\n        <a class="btn secondary" href="'
+    yield escape(context.call((undefined(name='url_for') if l_0_url_for is missing else l_0_url_for), 'landing'))
+    yield '">Home</a>\n      </div>\n    </div>\n\n    <div class="container">\n      <h2 style="margin:0 0 8px">Welcome back</h2>\n      <p class="muted" style="margin:0 0 16px">Sign in to continue to your dashboard</p>\n      \n      <!-- Flash Messages -->\n      '
+    l_1_messages = context.call((undefined(name='get_flashed_messages') if l_0_get_flashed_messages is missing else l_0_get_flashed_messages), with_categories=True)
+    pass
+    yield '\n        '
+    if l_1_messages:
+        pass
+        yield '\n          '
+        l_2_loop = missing
+        for (l_2_category, l_2_message), l_2_loop in LoopContext(l_1_messages, undefined):
+            _loop_vars = {}
+            pass
+            yield '\n            <div class="flash-message '
+            yield escape(l_2_category)
+            yield '" id="flash-'
+            yield escape(environment.getattr(l_2_loop, 'index'))
+            yield '">\n              '
+            yield escape(l_2_message)
+            yield '\n              <button onclick="this.parentElement.remove()" style="float:right; background:none; border:none; color:inherit; cursor:pointer;">×</button>\n            </div>\n          '
+        l_2_loop = l_2_category = l_2_message = missing
+        yield '\n        '
+    yield '\n      '
+    l_1_messages = missing
+    yield '\n      \n      <form method="POST">\n        <input type="text" name="username" placeholder="Username" required>\n        <input type="password" name="password" placeholder="Password" required>\n        <button type="submit">Login</button>\n      </form>\n      <div class="links">\n        <span class="muted">Belum punya akun?</span>\n        <a class="btn" style="padding:10px 14px" href="'
+    yield escape(context.call((undefined(name='url_for') if l_0_url_for is missing else l_0_url_for), 'register'))
+    yield '">Create account</a>\n      </div>\n    </div>\n  </div>\n\n  <script>\n    // Auto-hide flash messages after 5 seconds\n    setTimeout(() => {\n      document.querySelectorAll(\'.flash-message\').forEach(msg => {\n        msg.style.opacity = \'0\';\n        msg.style.transition = \'opacity 0.3s ease\';\n        setTimeout(() => msg.remove(), 300);\n      });\n    }, 5000);\n  </script>\n</body>\n</html>'
+
+blocks = {}
+debug_info = '5=14&25=16&35=21&36=25&37=29&38=33&52=40'
\ No newline at end of file
@@ -0,0 +1,156 @@
+"""
+Password hashing off the eventlet hub, and login attempt throttling.
+
+werkzeug's scrypt takes tens of milliseconds of CPU per hash; run inline
+it stalls every game on the worker for that long.  HashService runs
+hashing and verification in a bounded thread pool (hashlib releases the
+GIL while it works) and the calling greenlet polls the future with a
+cooperative sleep, like BotService does for bot searches.  When
+`queue_limit` requests are already in flight it refuses new ones
+(PasswordBusy) instead of queueing without bound.
+
+Throttle is a token bucket per key (client IP, username): `limit`
+attempts per `window` seconds, checked before any hashing happens, so
+brute-force traffic is turned away without costing CPU.
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from werkzeug.security import check_password_hash, generate_password_hash
+
+HASH_WORKERS = 2
+HASH_QUEUE_LIMIT = 32
+POLL_INTERVAL = 0.002  # seconds between future.done() checks
+
+LOGIN_WINDOW = 60  # seconds
+LOGIN_IP_LIMIT = 30  # attempts per LOGIN_WINDOW per client IP
+LOGIN_USER_LIMIT = 10  # attempts per LOGIN_WINDOW per username
+THROTTLE_MAX_KEYS = 100000  # idle buckets are pruned past this many keys
+
+
+class PasswordBusy(Exception):
+    """Too many hashes in flight; the caller should answer 503"""
+
+
+class HashService:
+    def __init__(self, workers=HASH_WORKERS, queue_limit=HASH_QUEUE_LIMIT, sleep=time.sleep):
+        self.workers = workers  # 0 hashes inline (blocks the hub, for tests and comparison)
+        self.queue_limit = queue_limit
+        self._sleep = sleep
+        self._pool = None
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+        self.hash_seconds = 0.0
+        self.wait_seconds = 0.0
+
+    def _get_pool(self):
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='hash')
+        return self._pool
+
+    def _run(self, fn, *args):
+        if not self.workers:
+            started = time.monotonic()
+            try:
+                return fn(*args)
+            finally:
+                self.completed += 1
+                self.hash_seconds += time.monotonic() - started
+        if self.in_flight >= self.queue_limit:
+            self.rejected += 1
+            raise PasswordBusy()
+
+        started = time.monotonic()
+        future = self._get_pool().submit(_timed, fn, *args)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            while not future.done():
+                self._sleep(POLL_INTERVAL)
+            result, elapsed = future.result()
+        finally:
+            self.in_flight -= 1
+        self.completed += 1
+        self.hash_seconds += elapsed
+        self.wait_seconds += max(0.0, time.monotonic() - started - elapsed)
+        return result
+
+    def hash(self, password):
+        """generate_password_hash(password); blocks only the calling greenlet"""
+        return self._run(generate_password_hash, password)
+
+    def verify(self, password_hash, password):
+        """check_password_hash(password_hash, password); blocks only the calling greenlet"""
+        return self._run(check_password_hash, password_hash, password)
+
+    def stats(self):
+        done = self.completed or 1
+        return {
+            'workers': self.workers,
+            'queue_limit': self.queue_limit,
+            'queue_depth': self.in_flight,
+            'max_queue_depth': self.max_in_flight,
+            'completed': self.completed,
+            'rejected': self.rejected,
+            'hash_ms_avg': self.hash_seconds / done * 1000,
+            'queue_wait_ms_avg': self.wait_seconds / done * 1000,
+        }
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+def _timed(fn, *args):
+    """Runs in a pool thread: the result and the time spent hashing"""
+    started = time.monotonic()
+    return fn(*args), time.monotonic() - started
+
+
+class Throttle:
+    def __init__(self, limit, window=LOGIN_WINDOW, clock=time.monotonic, max_keys=THROTTLE_MAX_KEYS):
+        self.limit = limit
+        self.rate = limit / window  # tokens regained per second
+        self.clock = clock
+        self.max_keys = max_keys
+        self._buckets = {}  # key -> (tokens, time of last update)
+        self.allowed = 0
+        self.denied = 0
+
+    def _tokens(self, key, now):
+        tokens, last = self._buckets.get(key, (self.limit, now))
+        return min(self.limit, tokens + (now - last) * self.rate)
+
+    def allow(self, key):
+        """Take one attempt for `key`; False when its bucket is empty"""
+        now = self.clock()
+        tokens = self._tokens(key, now)
+        if tokens < 1:
+            self._buckets[key] = (tokens, now)
+            self.denied += 1
+            return False
+        if len(self._buckets) >= self.max_keys and key not in self._buckets:
+            self._prune(now)
+        self._buckets[key] = (tokens - 1, now)
+        self.allowed += 1
+        return True
+
+    def reset(self, key):
+        self._buckets.pop(key, None)
+
+    def _prune(self, now):
+        """Forget buckets that have refilled (they behave like new keys)"""
+        for key in [k for k in self._buckets if self._tokens(k, now) >= self.limit]:
+            del self._buckets[key]
+
+    def stats(self):
+        return {
+            'limit': self.limit,
+            'keys': len(self._buckets),
+            'allowed': self.allowed,
+            'denied': self.denied,
+        }
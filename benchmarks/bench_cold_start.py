@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Cold start of the serverless entries (api/index.py, api/simple.py).
+
+Every run is a fresh interpreter, as a new function instance is, timing:
+
+  import        importing the entry module
+  first /       the first response, the landing page (what a cold visitor waits
+                for after the import)
+  import->/     both together
+  first db      the first request that touches the database (POST /register)
+  warm /        a later request to /, per request
+
+for SERVERLESS_COLD_START=1 (lazy database, compiled templates) and 0
+(everything loaded at import, templates compiled from source), median of
+RUNS.  --profile prints the slowest imports of each entry instead
+(python -X importtime, cumulative).
+
+    python benchmarks/bench_cold_start.py [runs]
+    python benchmarks/bench_cold_start.py --profile [modules]
+"""
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+API = os.path.join(ROOT, 'api')
+
+RUNS = 15
+WARM = 200
+PROFILE_TOP = 12
+ENTRIES = ('simple', 'index')
+MODES = (('eager', '0'), ('cold', '1'))
+
+
+def instance(entry):
+    """One cold instance: import the entry and serve its first requests"""
+    import time
+
+    started = time.perf_counter()
+    module = __import__(entry)
+    imported = time.perf_counter()
+    client = module.app.test_client()
+    assert client.get('/').status_code == 200
+    first = time.perf_counter()
+    r = client.post('/register', data={'username': 'bench', 'password': 'pw'})
+    assert r.status_code == 302
+    db = time.perf_counter()
+    for _ in range(WARM):
+        client.get('/')
+    warm = (time.perf_counter() - db) / WARM
+    print(json.dumps({'import': imported - started, 'first': first - imported,
+                      'total': first - started, 'db': db - first, 'warm': warm}))
+
+
+def run(entry, flag):
+    env = dict(os.environ, SERVERLESS_COLD_START=flag,
+               DATABASE_URL=f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'cold.db')}",
+               GAME_STATE_URL=f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'state.db')}")
+    out = subprocess.run([sys.executable, os.path.abspath(__file__), '--instance', entry],
+                         cwd=API, env=env, check=True, capture_output=True, text=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def profile(entry, top):
+    """Slowest imports of an entry, cumulative microseconds"""
+    err = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {entry}'], cwd=API,
+                         check=True, capture_output=True, text=True).stderr
+    rows = []
+    for line in err.splitlines():
+        if line.startswith('import time:') and '|' in line and 'cumulative' not in line:
+            _, cumulative, name = line[len('import time:'):].split('|')
+            rows.append((int(cumulative), name))
+    total = sum(cumulative for cumulative, name in rows if not name[1:].startswith(' '))
+    print(f"{entry}: {total / 1000:.0f} ms of imports")
+    for cumulative, name in sorted(rows, reverse=True)[:top]:
+        print(f"  {cumulative / 1000:>7.1f} ms  {name.strip()}")
+
+
+def main():
+    if sys.argv[1:2] == ['--instance']:
+        sys.path.insert(0, API)
+        instance(sys.argv[2])
+        return
+    if sys.argv[1:2] == ['--profile']:
+        for entry in ENTRIES:
+            profile(entry, int(sys.argv[2]) if len(sys.argv) > 2 else PROFILE_TOP)
+        return
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else RUNS
+    print(f"median of {runs} fresh interpreters, ms")
+    print(f"{'entry':>7} | {'mode':>5} | {'import':>7} | {'first /':>7} | {'import->/':>9} | "
+          f"{'first db':>8} | {'warm /':>7}")
+    for entry in ENTRIES:
+        for mode, flag in MODES:
+            samples = [run(entry, flag) for _ in range(runs)]
+            median = {key: statistics.median(s[key] for s in samples) * 1000 for key in samples[0]}
+            print(f"{entry:>7} | {mode:>5} | {median['import']:>7.1f} | {median['first']:>7.1f} | "
+                  f"{median['total']:>9.1f} | {median['db']:>8.1f} | {median['warm']:>7.2f}")
+
+
+if __name__ == "__main__":
+    main()
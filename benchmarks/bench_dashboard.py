@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Dashboard latency as the number of rooms grows.
+
+Compares the old listing (Room.query.all() + User.query.get per room)
+with the in-memory lobby index that dashboard() uses now.
+
+    python benchmarks/bench_dashboard.py
+"""
+
+import os
+import sys
+import tempfile
+import time
+import uuid
+
+DB_PATH = os.path.join(tempfile.mkdtemp(), 'bench_dashboard.db')
+os.environ.setdefault('DATABASE_URL', f'sqlite:///{DB_PATH}')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import run  # noqa: E402
+from run import app, db, Room, User  # noqa: E402
+
+SIZES = [10, 100, 1000, 2000]
+REPEAT = 20
+
+
+def legacy_listing():
+    """The listing dashboard() used before the lobby index (N+1 queries)"""
+    room_list = []
+    for r in Room.query.all():
+        count = len(run.active_rooms.get(r.id, {}).get('members', set()))
+        creator_name = "Unknown"
+        if r.created_by:
+            creator = db.session.get(User, r.created_by)
+            if creator:
+                creator_name = creator.username
+        room_list.append({
+            'id': r.id,
+            'name': r.name,
+            'type': r.type,
+            'mode': r.mode,
+            'players': count,
+            'created_by': creator_name
+        })
+    return room_list
+
+
+def seed(total):
+    with app.app_context():
+        user = User.query.filter_by(username='bench').first()
+        if not user:
+            user = User(username='bench', password_hash='x')
+            db.session.add(user)
+            db.session.commit()
+        missing = total - Room.query.count()
+        for i in range(missing):
+            db.session.add(Room(id=str(uuid.uuid4()), name=f'Room {i}', type='public',
+                                mode='pvp', created_by=user.id))
+        db.session.commit()
+    run.load_lobby_index()
+
+
+def timed(fn):
+    best = float('inf')
+    for _ in range(REPEAT):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best * 1000
+
+
+def main():
+    client = app.test_client()
+    with client.session_transaction() as sess:
+        sess['username'] = 'bench'
+
+    print(f"{'rooms':>6} | {'legacy list ms':>14} | {'index list ms':>13} | {'GET /dashboard ms':>17}")
+    for n in SIZES:
+        seed(n)
+        with app.app_context():
+            # expire identity map so every legacy lookup goes to SQLite
+            legacy = timed(lambda: (db.session.expire_all(), legacy_listing()))
+        index = timed(run._lobby_listing)
+        page = timed(lambda: client.get('/dashboard'))
+        print(f"{n:>6} | {legacy:>14.2f} | {index:>13.3f} | {page:>17.2f}")
+
+
+if __name__ == "__main__":
+    run.start_services()  # as the server entry point does
+    main()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Cost of polling the serverless game API (game_api.py).
+
+  poll        GET /state without a validator (full JSON every time) and
+              with If-None-Match on an unchanged room (304 after reading
+              the version column), per request
+  long poll   a held GET /state?wait=8 while the opponent moves from
+              another thread: time from the move's response to the held
+              request's answer (bounded by POLL_STEP)
+
+    python benchmarks/bench_game_api.py [requests]
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import time
+
+os.environ.setdefault('GAME_STATE_URL', f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench_game_api.db')}")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask  # noqa: E402
+
+import game_api  # noqa: E402
+
+REQUESTS = 2000
+WAKES = 20
+
+
+def percentile(samples, q):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))] if ordered else 0.0
+
+
+def client(app, username):
+    http = app.test_client()
+    with http.session_transaction() as session:
+        session['username'] = username
+    return http
+
+
+def bench_poll(app, requests):
+    alice, bob = client(app, 'alice'), client(app, 'bob')
+    alice.post('/api/game/bench/join')
+    etag = bob.post('/api/game/bench/join').headers['ETag']
+    print(f"{'poll':>14} | {'us/request':>10}")
+    for name, headers, status in (('full state', {}, 200), ('If-None-Match', {'If-None-Match': etag}, 304)):
+        started = time.perf_counter()
+        for _ in range(requests):
+            assert bob.get('/api/game/bench/state', headers=headers).status_code == status
+        print(f"{name:>14} | {(time.perf_counter() - started) / requests * 1e6:>10.0f}")
+
+
+def bench_wake(app):
+    players = {'X': client(app, 'alice'), 'O': client(app, 'bob')}
+    for http in players.values():
+        http.post('/api/game/wake/join')
+    delays = []
+    for _ in range(WAKES):
+        state = players['X'].get('/api/game/wake/state').json
+        if state['winner']:
+            state = players['X'].post('/api/game/wake/reset').json
+        mover, waiter = players[state['turn']], players['O' if state['turn'] == 'X' else 'X']
+        etag = waiter.get('/api/game/wake/state').headers['ETag']
+        answered = []
+        held = threading.Thread(target=lambda: answered.append(
+            (waiter.get('/api/game/wake/state?wait=8', headers={'If-None-Match': etag}).status_code,
+             time.perf_counter())))
+        held.start()
+        time.sleep(0.1)  # the poll is held by now
+        mover.post('/api/game/wake/move', json={'index': state['board'].index('')})
+        moved = time.perf_counter()
+        held.join()
+        assert answered[0][0] == 200
+        delays.append(answered[0][1] - moved)
+    print(f"long poll wake after a move: p50 {percentile(delays, 0.5) * 1000:.0f} ms, "
+          f"max {max(delays) * 1000:.0f} ms (POLL_STEP {game_api.POLL_STEP * 1000:.0f} ms)")
+
+
+def main():
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else REQUESTS
+    app = Flask(__name__)
+    app.config['SECRET_KEY'] = 'bench'
+    game_api.init_game_api(app)
+    bench_poll(app, requests)
+    bench_wake(app)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Storage and replay cost of archived games, packed records against JSON.
+
+  size        the same random games (100k TicTacToe, 500 chess of up to 120
+              plies) stored three ways in SQLite, file size after VACUUM
+              divided by games:
+                packed     game_record rows (header + varint moves, int time)
+                json       one row per game, moves as a JSON list, players,
+                           mode and result as text, a DATETIME
+                move log   one row per move, the way the Move table keeps
+                           a room's log
+  encode      encode() of a finished game, per game
+  replay      iter_moves() over a record, and json.loads() of the JSON row
+
+    python benchmarks/bench_game_records.py [ttt games] [chess games]
+"""
+
+import json
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from chess_engine import ChessGame, move_uci  # noqa: E402
+from game_record import encode, iter_moves, pack_move  # noqa: E402
+from tictactoe import TicTacToe  # noqa: E402
+
+TTT_GAMES = 100000
+CHESS_GAMES = 500
+CHESS_MAX_PLIES = 120
+PLAYERS = [f"player{i}" for i in range(1000)]
+
+
+def ttt_game(rng):
+    game, moves, mark, winner = TicTacToe(), [], 'X', None
+    cells = list(range(9))
+    rng.shuffle(cells)
+    for index in cells:
+        winner = game.play(index, mark)
+        moves.append(index)
+        if winner:
+            break
+        mark = 'O' if mark == 'X' else 'X'
+    return 'pvp', 'X', winner, moves
+
+
+def chess_game(rng):
+    game, winner = ChessGame(), None
+    while len(game.moves) < CHESS_MAX_PLIES and not winner:
+        winner, _ = game.play(move_uci(rng.choice(game.position.legal_moves())))
+    return 'chess', 'white', winner, list(game.moves)
+
+
+def games(rng, ttt, chess):
+    for _ in range(ttt):
+        yield ttt_game(rng)
+    for _ in range(chess):
+        yield chess_game(rng)
+
+
+def store(path, schema, insert, rows):
+    conn = sqlite3.connect(path)
+    conn.executescript(schema)
+    conn.executemany(insert, rows)
+    conn.commit()
+    conn.execute("VACUUM")
+    conn.close()
+    return os.path.getsize(path)
+
+
+def bench_size(played, directory):
+    now = int(time.time())
+    ended = datetime.utcnow()
+    packed_rows, json_rows, log_rows = [], [], []
+    for number, (mode, opener, result, moves) in enumerate(played):
+        first, second = PLAYERS[number % len(PLAYERS)], PLAYERS[(number * 7 + 1) % len(PLAYERS)]
+        room_id = f"room-{number % 5000:05d}"
+        record = encode(mode, opener, result, b''.join(pack_move(mode, move) for move in moves))
+        packed_rows.append((room_id, first, second, len(moves), record, now))
+        json_rows.append((room_id, first, second, mode, result, json.dumps(moves), ended))
+        mark = opener
+        for move in moves:
+            log_rows.append((room_id, 'move', mark, str(move), ended))
+            mark = {'X': 'O', 'O': 'X', 'white': 'black', 'black': 'white'}[mark]
+    index = "CREATE INDEX ix_room ON {0} (room_id);"
+    sizes = {
+        'packed': store(os.path.join(directory, 'packed.db'),
+                        "CREATE TABLE game_record (id INTEGER PRIMARY KEY, room_id VARCHAR(64),"
+                        " first_player VARCHAR(80), second_player VARCHAR(80), plies INTEGER,"
+                        " record BLOB, ended_at INTEGER);" + index.format('game_record'),
+                        "INSERT INTO game_record (room_id, first_player, second_player, plies,"
+                        " record, ended_at) VALUES (?, ?, ?, ?, ?, ?)", packed_rows),
+        'json': store(os.path.join(directory, 'json.db'),
+                      "CREATE TABLE game (id INTEGER PRIMARY KEY, room_id VARCHAR(64),"
+                      " first_player VARCHAR(80), second_player VARCHAR(80), mode VARCHAR(10),"
+                      " result VARCHAR(10), moves TEXT, ended_at DATETIME);" + index.format('game'),
+                      "INSERT INTO game (room_id, first_player, second_player, mode, result, moves,"
+                      " ended_at) VALUES (?, ?, ?, ?, ?, ?, ?)", json_rows),
+        'move log': store(os.path.join(directory, 'log.db'),
+                          "CREATE TABLE move (id INTEGER PRIMARY KEY, room_id VARCHAR(64),"
+                          " kind VARCHAR(10), mark VARCHAR(10), value VARCHAR(80),"
+                          " created_at DATETIME);" + index.format('move'),
+                          "INSERT INTO move (room_id, kind, mark, value, created_at)"
+                          " VALUES (?, ?, ?, ?, ?)", log_rows),
+    }
+    moves_bytes = sum(len(row[4]) for row in packed_rows)
+    print(f"{len(played)} games, {len(log_rows)} moves; packed records average "
+          f"{moves_bytes / len(played):.1f} bytes")
+    print(f"{'storage':>9} | {'file MB':>8} | {'bytes/game':>10}")
+    for name, size in sizes.items():
+        print(f"{name:>9} | {size / 1e6:>8.2f} | {size / len(played):>10.1f}")
+    return packed_rows, json_rows
+
+
+def bench_codec(played, packed_rows, json_rows):
+    print(f"{'operation':>18} | {'us/game':>8}")
+    started = time.perf_counter()
+    for mode, opener, result, moves in played:
+        encode(mode, opener, result, b''.join(pack_move(mode, move) for move in moves))
+    print(f"{'encode':>18} | {(time.perf_counter() - started) / len(played) * 1e6:>8.2f}")
+    started = time.perf_counter()
+    for (mode, _, _, _), row in zip(played, packed_rows):
+        for _ in iter_moves(mode, row[4][2:]):
+            pass
+    print(f"{'replay packed':>18} | {(time.perf_counter() - started) / len(played) * 1e6:>8.2f}")
+    started = time.perf_counter()
+    for row in json_rows:
+        for _ in json.loads(row[5]):
+            pass
+    print(f"{'replay json':>18} | {(time.perf_counter() - started) / len(played) * 1e6:>8.2f}")
+
+
+def main():
+    ttt = int(sys.argv[1]) if len(sys.argv) > 1 else TTT_GAMES
+    chess = int(sys.argv[2]) if len(sys.argv) > 2 else CHESS_GAMES
+    rng = random.Random(21)
+    started = time.perf_counter()
+    played = list(games(rng, ttt, chess))
+    print(f"played {ttt} TicTacToe and {chess} chess games in {time.perf_counter() - started:.1f}s")
+    with tempfile.TemporaryDirectory() as directory:
+        packed_rows, json_rows = bench_size(played, directory)
+    bench_codec(played, packed_rows, json_rows)
+
+
+if __name__ == "__main__":
+    main()
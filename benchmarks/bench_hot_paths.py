@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+Microbenchmarks for the server hot paths, with machine-readable output.
+
+  win_check   TicTacToe.play + undo (the bitmask win check that replaced
+              _check_winner) on 3x3 boards with 0..7 cells filled
+  bot_move    run._bot_move per level and board fill
+  room_state  _create_room_state as handle_join builds it: fresh, and
+              rebuilt from a move log of 3 / 9 entries; the room metadata
+              lookup from the database and from the room cache
+  join_room   the full join_room Socket.IO handler into a room not yet in memory
+  dashboard   _lobby_listing, GET /dashboard and GET /api/rooms (first page, and
+              the 304 for an unchanged lobby) for lobbies of 10 / 1k / 10k rooms
+  payload     ttt_update / ttt_init encoded as Socket.IO packets
+
+Every case reports the best and median time per call (microseconds).
+Results go to a JSON file; --compare prints the change against the file
+written by another commit:
+
+    python benchmarks/bench_hot_paths.py --out before.json
+    git checkout <other commit>
+    python benchmarks/bench_hot_paths.py --out after.json --compare before.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import timeit
+import uuid
+
+DB_PATH = os.path.join(tempfile.mkdtemp(), 'bench_hot_paths.db')
+os.environ.setdefault('DATABASE_URL', f'sqlite:///{DB_PATH}')
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import run  # noqa: E402
+from run import app, db, socketio, Room, User  # noqa: E402
+from tictactoe import TicTacToe  # noqa: E402
+
+FILLS = (0, 2, 4, 7)  # cells already played on the 3x3 board
+LOBBY_SIZES = (10, 1000, 10000)
+REPEAT = 5
+JOIN_NUMBER = 200  # join_room calls per repeat, each into a fresh room
+
+
+def position(fill, rng):
+    """A 3x3 game with `fill` cells played and no winner yet, plus the side to move"""
+    while True:
+        game = TicTacToe()
+        mark = 'X'
+        for index in rng.sample(range(9), fill):
+            if game.play(index, mark):
+                break
+            mark = 'O' if mark == 'X' else 'X'
+        else:
+            return game, mark
+
+
+def measure(fn, number=None, repeat=REPEAT):
+    """(best, median) seconds per call"""
+    timer = timeit.Timer(fn)
+    if number is None:
+        number, _ = timer.autorange()
+    times = [t / number for t in timer.repeat(repeat=repeat, number=number)]
+    return min(times), statistics.median(times)
+
+
+def bench_win_check(rng):
+    for fill in FILLS:
+        game, mark = position(fill, rng)
+        index = game.empties()[0]
+
+        def play():
+            game.play(index, mark)
+            game.undo(index, mark)
+        yield f"win_check fill={fill}", play, None
+
+
+def bench_bot_move(rng):
+    for level in ('easy', 'medium', 'perfect'):
+        for fill in FILLS:
+            game, mark = position(fill, rng)
+            yield f"bot_move {level} fill={fill}", lambda: run._bot_move(game, mark, level), None
+
+
+def seed_user(name):
+    with app.app_context():
+        user = User.query.filter_by(username=name).first()
+        if not user:
+            user = User(username=name, password_hash='x')
+            db.session.add(user)
+            db.session.commit()
+        return user.id
+
+
+def seed_rooms(count, creator_id, name='Room'):
+    rows = [Room(id=str(uuid.uuid4()), name=f"{name} {i}", type='public', mode='pvp',
+                 created_by=creator_id) for i in range(count)]
+    with app.app_context():
+        db.session.add_all(rows)
+        db.session.commit()
+        return [row.id for row in rows]
+
+
+def bench_room_state(rng):
+    creator_id = seed_user('bench')
+    for moves in (0, 3, 9):
+        (room_id,) = seed_rooms(1, creator_id, name='Replay')
+        game = TicTacToe()
+        mark = 'X'
+        run.move_log.append(room_id, 'seat', 'X', 'bench')
+        run.move_log.append(room_id, 'seat', 'O', 'other')
+        for index in rng.sample(range(9), 9)[:moves]:
+            run.move_log.append(room_id, 'move', mark, index)
+            if game.play(index, mark):
+                break
+            mark = 'O' if mark == 'X' else 'X'
+        run.move_log.flush()
+        with app.app_context():
+            room = run._load_room_info(room_id)
+        if moves == 0:
+            yield "room_state new", lambda: run._create_room_state(room, 'bench', replay=False), None
+        yield f"room_state replay={moves}", lambda: run._create_room_state(room), None
+
+    # the metadata lookup in front of it: a database query, or the room cache
+    run._lobby_add(room, room.creator_name)
+    run.room_cache.invalidate(room_id)
+
+    def load():
+        with app.app_context():
+            return run._load_room_info(room_id)
+    yield "room_info database", load, None
+    yield "room_info cached", lambda: run._room_info(room_id), None
+
+
+def bench_join_room(rng):
+    creator_id = seed_user('bench')
+    room_ids = iter(seed_rooms(JOIN_NUMBER * (REPEAT + 1), creator_id, name='Join'))
+    http = app.test_client()
+    with http.session_transaction() as session:
+        session['username'] = 'bench'
+        session['user_id'] = creator_id
+    client = socketio.test_client(app, flask_test_client=http)
+
+    def join():
+        client.emit('join_room', {'room_id': next(room_ids)})
+        client.get_received()
+    join()  # first join warms up the handler
+    yield "join_room new state", join, JOIN_NUMBER
+
+
+def bench_dashboard(rng):
+    creator_id = seed_user('bench')
+    http = app.test_client()
+    with http.session_transaction() as session:
+        session['username'] = 'bench'
+        session['user_id'] = creator_id
+    with app.app_context():
+        # exactly `size` rooms, whatever the other suites created
+        Room.query.delete()
+        db.session.commit()
+    existing = 0
+    for size in LOBBY_SIZES:
+        seed_rooms(size - existing, creator_id)
+        existing = size
+        run.load_lobby_index()
+        yield f"dashboard listing rooms={size}", run._lobby_listing, None
+        yield f"dashboard GET rooms={size}", lambda: http.get('/dashboard'), None
+        page = http.get('/api/rooms')
+        yield f"api/rooms page rooms={size}", lambda: http.get('/api/rooms'), None
+        etag = {'If-None-Match': page.headers['ETag']}
+        yield f"api/rooms 304 rooms={size}", lambda: http.get('/api/rooms', headers=etag), None
+
+
+def bench_payload(rng):
+    encode = socketio.server.packet_class
+    game, mark = position(4, rng)
+    index = game.empties()[0]
+    delta = {'turn': 'O', 'winner': None, 'last': {'index': index, 'mark': mark}, 'seq': 5}
+    full = dict(delta, board=game.to_list())
+    init = {'seq': 5, 'turn': 'X', 'winner': None, 'you': 'X',
+            'players': {'X': 'alice', 'O': 'bob'}, 'mode': 'pvp', 'room_creator': 'alice',
+            'is_creator': True, 'board': game.to_list()}
+    for name, event, data in (('ttt_update delta', 'ttt_update', delta),
+                              ('ttt_update full', 'ttt_update', full),
+                              ('ttt_init snapshot', 'ttt_init', init)):
+        yield f"payload {name}", lambda: encode(data=[event, data], namespace='/').encode(), None
+
+
+SUITES = {
+    'win_check': bench_win_check,
+    'bot_move': bench_bot_move,
+    'room_state': bench_room_state,
+    'join_room': bench_join_room,
+    'dashboard': bench_dashboard,
+    'payload': bench_payload,
+}
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('suites', nargs='*', metavar='suite',
+                        help=f"subset to run ({', '.join(SUITES)}); all by default")
+    parser.add_argument('--out', default='bench_hot_paths.json', help='JSON results file')
+    parser.add_argument('--compare', help='results file of another run to compare against')
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+    unknown = set(args.suites) - set(SUITES)
+    if unknown:
+        parser.error(f"unknown suite: {', '.join(sorted(unknown))}")
+
+    rng = random.Random(args.seed)
+    baseline = {}
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)['results']
+
+    results = {}
+    print(f"{'case':<36} | {'best us':>10} | {'median us':>10} | {'vs base':>7}")
+    with app.app_context():  # room_state reads the creator and move log like handle_join
+        for suite in args.suites or SUITES:
+            for name, fn, number in SUITES[suite](rng):
+                best, median = measure(fn, number)
+                results[name] = {'suite': suite, 'best_us': round(best * 1e6, 3),
+                                 'median_us': round(median * 1e6, 3)}
+                change = ''
+                if name in baseline:
+                    change = f"{best * 1e6 / baseline[name]['best_us']:.2f}x"
+                print(f"{name:<36} | {best * 1e6:>10.2f} | {median * 1e6:>10.2f} | {change:>7}")
+
+    meta = {
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'protocol': app.config['GAME_PROTOCOL'],
+    }
+    with open(args.out, 'w') as f:
+        json.dump({'meta': meta, 'results': results}, f, indent=2)
+    print(f"results written to {args.out}")
+
+
+if __name__ == "__main__":
+    run.start_services()  # as the server entry point does
+    main()
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+ttt_move latency while the same worker handles a login storm.
+
+One pvp room plays a move every MOVE_INTERVAL while STORM greenlets post
+/login, each waiting STORM_INTERVAL after every response.  Move latency is
+measured from the moment the move was due, so a hub stalled by hashing
+shows up as latency instead of as fewer moves.  On a single core the hash
+threads still take CPU time from the hub; more cores shrink the pool's tail.
+Scenarios:
+
+  no storm        baseline
+  inline          valid logins from many IPs, scrypt on the hub (HASH_WORKERS=0)
+  pool            the same logins, scrypt in the HashService thread pool
+  brute force     wrong passwords for one user from one IP, pool + throttle
+
+    python benchmarks/bench_login_storm.py [seconds]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+DB_PATH = os.path.join(tempfile.mkdtemp(), 'bench_login_storm.db')
+os.environ.setdefault('DATABASE_URL', f'sqlite:///{DB_PATH}')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import eventlet  # noqa: E402
+from werkzeug.security import generate_password_hash  # noqa: E402
+
+import run  # noqa: E402
+from auth_service import HashService, Throttle  # noqa: E402
+from run import app, db, socketio, User  # noqa: E402
+
+DURATION = 3.0  # seconds per scenario
+MOVE_INTERVAL = 0.02
+STORM = 20  # concurrent login loops
+STORM_INTERVAL = 0.05  # pause between one loop's attempts: up to 400 logins/s in all
+PASSWORD = 'storm'
+UNLIMITED = 10 ** 9
+
+
+def percentile(samples, q):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))] if ordered else 0.0
+
+
+def logged_in(name, user_id):
+    http = app.test_client()
+    with http.session_transaction() as session:
+        session['username'] = name
+        session['user_id'] = user_id
+    return http
+
+
+def seed():
+    password_hash = generate_password_hash(PASSWORD)
+    names = ['alice', 'bob'] + [f"storm{i}" for i in range(STORM)]
+    with app.app_context():
+        db.session.add_all(User(username=name, password_hash=password_hash) for name in names)
+        db.session.commit()
+        return dict(db.session.query(User.username, User.id))
+
+
+def play(ids, deadline, latency):
+    """Move every MOVE_INTERVAL until `deadline`; latency measured from when each move was due"""
+    a, b = logged_in('alice', ids['alice']), logged_in('bob', ids['bob'])
+    r = a.post('/dashboard', data={'room_name': 'storm', 'room_type': 'public', 'room_mode': 'pvp'})
+    room_id = r.headers['Location'].rsplit('/', 1)[-1]
+    sockets = {}
+    for name, http in (('alice', a), ('bob', b)):
+        sock = socketio.test_client(app, flask_test_client=http)
+        sock.emit('join_room', {'room_id': room_id})
+        mark = next(m['args'][0]['you'] for m in sock.get_received() if m['name'] == 'ttt_init')
+        sockets[mark] = sock
+    turn, free = 'X', list(range(9))
+    due = time.perf_counter()
+    while due < deadline:
+        due += MOVE_INTERVAL
+        eventlet.sleep(max(0.0, due - time.perf_counter()))
+        mover, opponent = sockets[turn], sockets['O' if turn == 'X' else 'X']
+        mover.emit('ttt_move', {'room_id': room_id, 'index': free[0]})
+        updates = [m['args'][0] for m in opponent.get_received() if m['name'] == 'ttt_update']
+        latency.append(time.perf_counter() - due)
+        mover.get_received()
+        free.pop(0)
+        turn, winner = updates[-1]['turn'], updates[-1]['winner']
+        if winner:
+            sockets['X'].emit('ttt_rematch_request', {'room_id': room_id})
+            sockets['O'].emit('ttt_rematch_response', {'room_id': room_id, 'response': 'accept'})
+            sockets['O'].get_received()
+            reset = [m['args'][0] for m in sockets['X'].get_received() if m['name'] == 'ttt_reset']
+            turn, free = reset[-1]['turn'], list(range(9))
+    for sock in sockets.values():
+        sock.emit('leave_room', {'room_id': room_id})
+        sock.disconnect()
+
+
+def storm(n, deadline, brute_force, counts):
+    http = app.test_client()
+    attempt = 0
+    while time.perf_counter() < deadline:
+        attempt += 1
+        if brute_force:
+            address, form = '203.0.113.7', {'username': 'alice', 'password': f"guess{attempt}"}
+        else:
+            # a crowd of legitimate users, one address per attempt
+            address = f"10.{n}.{attempt >> 8 & 255}.{attempt & 255}"
+            form = {'username': f"storm{n}", 'password': PASSWORD}
+        r = http.post('/login', data=form, environ_base={'REMOTE_ADDR': address})
+        counts[r.status_code] = counts.get(r.status_code, 0) + 1
+        eventlet.sleep(STORM_INTERVAL)
+
+
+def scenario(ids, name, workers, storming, brute_force, seconds):
+    run.hash_service = HashService(workers=workers, sleep=socketio.sleep)
+    limit = app.config['LOGIN_IP_LIMIT'] if brute_force else UNLIMITED
+    run.ip_throttle = Throttle(limit, app.config['LOGIN_WINDOW'])
+    run.user_throttle = Throttle(app.config['LOGIN_USER_LIMIT'] if brute_force else UNLIMITED,
+                                 app.config['LOGIN_WINDOW'])
+    deadline = time.perf_counter() + seconds
+    latency, counts = [], {}
+    pool = eventlet.GreenPool()
+    game = pool.spawn(play, ids, deadline, latency)
+    for n in range(STORM if storming else 0):
+        pool.spawn(storm, n, deadline, brute_force, counts)
+    game.wait()
+    pool.waitall()
+    run.hash_service.shutdown()
+    responses = ' '.join(f"{status}:{count}" for status, count in sorted(counts.items())) or '-'
+    print(f"{name:>12} | {len(latency):>5} | {percentile(latency, 0.5) * 1000:>7.1f} | "
+          f"{percentile(latency, 0.95) * 1000:>7.1f} | {percentile(latency, 0.99) * 1000:>7.1f} | "
+          f"{max(latency, default=0) * 1000:>7.1f} | {responses}")
+
+
+def main():
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else DURATION
+    ids = seed()
+    print(f"{seconds:.0f}s per scenario, a move due every {MOVE_INTERVAL * 1000:.0f} ms, "
+          f"{STORM} login loops, {app.config['HASH_WORKERS']} hash threads")
+    print(f"{'scenario':>12} | {'moves':>5} | {'p50 ms':>7} | {'p95 ms':>7} | {'p99 ms':>7} | "
+          f"{'max ms':>7} | login responses")
+    scenario(ids, 'no storm', app.config['HASH_WORKERS'], False, False, seconds)
+    scenario(ids, 'inline', 0, True, False, seconds)
+    scenario(ids, 'pool', app.config['HASH_WORKERS'], True, False, seconds)
+    scenario(ids, 'brute force', app.config['HASH_WORKERS'], True, True, seconds)
+
+
+if __name__ == "__main__":
+    run.start_services()  # as the server entry point does
+    main()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+MatchQueue with up to 100k players waiting.
+
+  enqueue     enqueue() of a player near the crowd (pairs at once) and of one
+              no one is near (searches its whole window), with 1k / 10k /
+              100k players queued: the cost should not grow with the queue
+  drain       100k players queued at once (and a sparse 100), then a sweep
+              every MATCH_INTERVAL of simulated time, windows widening, until
+              no pair is left: time per sweep, pairs made, rating gap and
+              simulated wait
+
+Ratings are normally distributed (mean 1500, sd 300), uniform 0..3000 for
+the sparse queue, on a simulated clock.
+
+    python benchmarks/bench_matchmaking.py [players]
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from matchmaking import MATCH_INTERVAL, MatchQueue  # noqa: E402
+
+PLAYERS = 100000
+SPARSE_PLAYERS = 100
+QUEUE_SIZES = (1000, 10000, 100000)
+OPERATIONS = 20000
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def rating(rng):
+    return max(0, min(3000, int(rng.gauss(1500, 300))))
+
+
+def sparse_rating(rng):
+    return rng.randrange(3001)
+
+
+def filled(size, rng, rating=rating):
+    queue = MatchQueue(clock=Clock())
+    for i in range(size):
+        queue.add(f"p{i}", rating(rng))
+    return queue
+
+
+def bench_enqueue(rng):
+    print(f"{'queued':>8} | {'add us':>7} | {'match us':>8} | {'no partner us':>13}")
+    for size in QUEUE_SIZES:
+        started = time.perf_counter()
+        queue = filled(size, rng)
+        add = (time.perf_counter() - started) / size
+
+        # each enqueue pairs with a waiting player, who is queued again to keep the size
+        started = time.perf_counter()
+        for i in range(OPERATIONS):
+            pair = queue.enqueue(f"n{i}", rating(rng))
+            if pair:
+                queue.add(pair[0].username, pair[0].rating)
+            else:
+                queue.cancel(f"n{i}")
+        match = (time.perf_counter() - started) / OPERATIONS
+
+        # far above everyone: the whole window is searched, then the player waits
+        started = time.perf_counter()
+        for i in range(OPERATIONS):
+            queue.enqueue('outlier', 4000)
+        alone = (time.perf_counter() - started) / OPERATIONS
+        print(f"{size:>8} | {add * 1e6:>7.2f} | {match * 1e6:>8.2f} | {alone * 1e6:>13.2f}")
+
+
+def bench_drain(rng, players, rating=rating, label='normal'):
+    queue = filled(players, rng, rating)
+    clock = queue.clock
+    print(f"\n{players} players ({label}) queued at once, a sweep every {MATCH_INTERVAL:.0f}s (simulated)")
+    print(f"{'t':>4} | {'sweep ms':>8} | {'pairs':>6} | {'left':>6} | {'gap avg':>7} | {'gap max':>7}")
+    while True:
+        started = time.perf_counter()
+        pairs = queue.sweep(limit=len(queue))
+        elapsed = time.perf_counter() - started
+        gaps = [abs(a.rating - b.rating) for a, b in pairs]
+        if pairs:
+            print(f"{clock.now:>4.0f} | {elapsed * 1000:>8.1f} | {len(pairs):>6} | {len(queue):>6} | "
+                  f"{sum(gaps) / len(gaps):>7.1f} | {max(gaps):>7}")
+        # everyone was queued at t=0, so all windows reach max_window together
+        if not len(queue) or (not pairs and queue.base_window + queue.widen_rate * clock.now
+                              >= queue.max_window):
+            break
+        clock.now += MATCH_INTERVAL
+    stats = queue.stats()
+    print(f"matched {stats['matched']} pairs, {stats['queued']} left unmatched, "
+          f"rating gap {stats['rating_gap_avg']:.1f} avg, simulated wait {stats['wait_s_avg']:.2f}s avg")
+
+
+def main():
+    players = int(sys.argv[1]) if len(sys.argv) > 1 else PLAYERS
+    rng = random.Random(1)
+    bench_enqueue(rng)
+    bench_drain(rng, players)
+    bench_drain(rng, SPARSE_PLAYERS, sparse_rating, 'sparse')
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Perft benchmark for chess_engine.py against known node counts, plus the
+cost of validating one socket move (parse + make + outcome).
+
+    python benchmarks/bench_perft.py [max_depth]
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from chess_engine import START_FEN, ChessGame, Position, move_uci, perft  # noqa: E402
+
+SUITE = [
+    ('startpos', START_FEN, [20, 400, 8902, 197281, 4865609]),
+    ('kiwipete', "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1",
+     [48, 2039, 97862, 4085603]),
+    ('position3', "8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1", [14, 191, 2812, 43238, 674624]),
+    ('position4', "r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 w kq - 0 1",
+     [6, 264, 9467, 422333]),
+    ('position5', "rnbq1k1r/pp1Pbppp/2p5/8/2B5/8/PPP1NnPP/RNBQK2R w KQ - 1 8", [44, 1486, 62379, 2103487]),
+]
+
+
+def bench_perft(max_depth):
+    print(f"{'position':>10} | {'depth':>5} | {'nodes':>9} | {'ok':>3} | {'seconds':>8} | {'nodes/s':>9}")
+    for name, fen, counts in SUITE:
+        pos = Position(fen)
+        for depth, expected in enumerate(counts[:max_depth], 1):
+            t0 = time.perf_counter()
+            nodes = perft(pos, depth)
+            dt = time.perf_counter() - t0
+            ok = 'yes' if nodes == expected else 'NO'
+            print(f"{name:>10} | {depth:>5} | {nodes:>9} | {ok:>3} | {dt:>8.3f} | {nodes / dt:>9.0f}")
+
+
+def bench_validation(games=200):
+    """Replay random games move by move through ChessGame.play, like chess_move does"""
+    rng = random.Random(1)
+    scripts = []
+    for _ in range(games):
+        pos = Position()
+        line = []
+        for _ in range(80):
+            moves = pos.legal_moves()
+            if not moves:
+                break
+            move = rng.choice(moves)
+            line.append(move_uci(move))
+            pos.make(move)
+        scripts.append(line)
+
+    total = sum(len(s) for s in scripts)
+    t0 = time.perf_counter()
+    for line in scripts:
+        game = ChessGame()
+        for uci in line:
+            if game.play(uci)[0]:
+                break
+    dt = time.perf_counter() - t0
+    print(f"\nvalidated {total} moves in {dt:.2f}s: {total / dt:.0f} moves/s, "
+          f"{dt / total * 1e6:.0f} us per chess_move")
+
+
+def main():
+    max_depth = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    bench_perft(max_depth)
+    bench_validation()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Position file against per-worker in-memory tables.
+
+  startup     fresh interpreter until the bot can answer a 3x3 position:
+              building perfect_table() against mapping the position file
+  lookup      perfect_move() from the dict and from the mapped file
+  memory      WORKERS processes each holding a book of N positions, as a
+              dict loaded into its heap or as the mapped file, every entry
+              read once; proportional set size (Pss, shared pages split
+              between the processes that map them) per worker from
+              /proc/self/smaps_rollup (Linux)
+
+    python benchmarks/bench_position_db.py [book entries] [workers]
+"""
+
+import multiprocessing
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import bot  # noqa: E402
+from position_db import PositionDB, position_key, write  # noqa: E402
+
+BOOK_ENTRIES = 1000000
+WORKERS = 4
+LOOKUPS = 100000
+STARTUP_RUNS = 5
+
+
+def startup(code):
+    best = None
+    for _ in range(STARTUP_RUNS):
+        started = time.perf_counter()
+        subprocess.run([sys.executable, '-c', code], cwd=ROOT, check=True)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def bench_startup(path):
+    baseline = startup("import bot")
+    table = startup("import bot; bot.perfect_table(); bot.perfect_move(0, 0)")
+    mapped = startup(f"import bot; bot.open_position_db({path!r}); bot.perfect_move(0, 0)")
+    print(f"{'startup':>12} | {'ms':>7} | {'over import':>11}")
+    for name, seconds in (('import only', baseline), ('build table', table), ('map file', mapped)):
+        print(f"{name:>12} | {seconds * 1000:>7.1f} | {(seconds - baseline) * 1000:>11.1f}")
+
+
+def bench_lookup(path):
+    positions = [(key & 0o777, key >> 9) for key in bot.perfect_table()]
+    rounds = LOOKUPS // len(positions) + 1
+    print(f"{'lookup':>12} | {'us/op':>7}")
+    for name in ('dict', 'mapped'):
+        if name == 'mapped':
+            bot.open_position_db(path)
+        started = time.perf_counter()
+        for _ in range(rounds):
+            for mine, theirs in positions:
+                bot.perfect_move(mine, theirs)
+        print(f"{name:>12} | {(time.perf_counter() - started) / (rounds * len(positions)) * 1e6:>7.2f}")
+    bot._position_db = None
+
+
+def pss_kb():
+    with open('/proc/self/smaps_rollup') as f:
+        for line in f:
+            if line.startswith('Pss:'):
+                return int(line.split()[1])
+    return 0
+
+
+def worker(kind, path, keys, ready, results):
+    before = pss_kb()
+    if kind == 'dict':
+        source = PositionDB(path)
+        book = {key: source.get(key) for key in keys}
+        source.close()
+        touched = sum(book[key] for key in keys)
+    else:
+        book = PositionDB(path)
+        touched = sum(book.get(key) for key in keys)
+    ready.wait()  # every worker holds its book: shared pages are split between all of them
+    results.put((pss_kb() - before, touched))
+    ready.wait()
+
+
+def bench_memory(path, keys, workers):
+    ctx = multiprocessing.get_context('spawn')
+    print(f"{'book':>12} | {'workers':>7} | {'Pss MB/worker':>13}")
+    for kind in ('dict', 'mapped'):
+        ready, results = ctx.Barrier(workers + 1), ctx.Queue()
+        procs = [ctx.Process(target=worker, args=(kind, path, keys, ready, results))
+                 for _ in range(workers)]
+        for proc in procs:
+            proc.start()
+        ready.wait()
+        grown = [results.get()[0] for _ in procs]
+        ready.wait()
+        for proc in procs:
+            proc.join()
+        print(f"{kind:>12} | {workers:>7} | {sum(grown) / len(grown) / 1024:>13.1f}")
+
+
+def main():
+    entries = int(sys.argv[1]) if len(sys.argv) > 1 else BOOK_ENTRIES
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else WORKERS
+    directory = tempfile.mkdtemp()
+    path = os.path.join(directory, 'positions.bin')
+    size = write(path, bot.position_entries())
+    print(f"3x3 position file: {len(bot.perfect_table())} positions, {size} bytes")
+    bench_startup(path)
+    bench_lookup(path)
+    if not os.path.exists('/proc/self/smaps_rollup'):
+        print("memory: needs /proc/self/smaps_rollup")
+        return
+    book_path = os.path.join(directory, 'book.bin')
+    keys = [position_key(15, 5, i, i * 31) for i in range(entries)]
+    size = write(book_path, {key: i % 225 for i, key in enumerate(keys)})
+    print(f"book: {entries} positions, {size / 1e6:.1f} MB file")
+    bench_memory(book_path, keys, workers)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Concurrent room-create throughput, commit per request against the writer.
+
+WORKERS server processes share one SQLite file, as the workers of one
+deployment do, and each POSTs /dashboard (create a room) from CLIENTS
+greenlets for DURATION seconds.  Configurations:
+
+  before   SQLITE_SYNCHRONOUS=FULL, DB_WRITE_INTERVAL=0: every create
+           commits (and fsyncs) inside the request, as dashboard() did
+  pragmas  synchronous=NORMAL, still one commit per request
+  writer   synchronous=NORMAL and the write queue: creates are committed
+           by the background writer, many per transaction
+
+Reported: rooms created per second over all workers, request latency, and
+the rooms found in the database afterwards (every create must land).
+
+    python benchmarks/bench_room_create.py [workers] [clients] [seconds]
+"""
+
+import json
+import os
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+WORKERS = 4
+CLIENTS = 8  # greenlets per worker
+DURATION = 5.0
+CONFIGS = (
+    ('before', {'SQLITE_SYNCHRONOUS': 'FULL', 'DB_WRITE_INTERVAL': '0'}),
+    ('pragmas', {'SQLITE_SYNCHRONOUS': 'NORMAL', 'DB_WRITE_INTERVAL': '0'}),
+    ('writer', {'SQLITE_SYNCHRONOUS': 'NORMAL'}),
+)
+
+
+def percentile(samples, q):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))] if ordered else 0.0
+
+
+def worker(start_at, seconds, clients):
+    """One server process: CLIENTS greenlets creating rooms until the deadline"""
+    import eventlet
+
+    import run
+    from run import app, socketio, write_queue
+
+    run.start_services()
+
+    latency, errors = [], [0]
+
+    def client(n):
+        http = app.test_client()
+        with http.session_transaction() as session:
+            session['username'] = f"bench{os.getpid()}-{n}"
+            session['user_id'] = None
+        while time.time() < start_at + seconds:
+            started = time.perf_counter()
+            r = http.post('/dashboard', data={'room_name': 'bench', 'room_type': 'public',
+                                              'room_mode': 'pvp'})
+            latency.append(time.perf_counter() - started)
+            if r.status_code != 302:
+                errors[0] += 1
+            socketio.sleep(0)  # let the other clients and the writer run
+
+    time.sleep(max(0.0, start_at - time.time()))
+    pool = eventlet.GreenPool()
+    for n in range(clients):
+        pool.spawn(client, n)
+    pool.waitall()
+    write_queue.flush()
+    print(json.dumps({'latency': latency, 'errors': errors[0]}))
+
+
+def run_config(name, env, workers, clients, seconds):
+    db_path = os.path.join(tempfile.mkdtemp(), 'bench_room_create.db')
+    env = dict(os.environ, DATABASE_URL=f"sqlite:///{db_path}", **env)
+    subprocess.run([sys.executable, '-c', 'import run; run.init_database()'], cwd=ROOT, env=env, check=True,
+                   stdout=subprocess.DEVNULL)  # schema first, so workers start on a migrated file
+    start_at = time.time() + 3.0  # after every worker has imported run
+    procs = [subprocess.Popen([sys.executable, __file__, '--worker', str(start_at), str(seconds),
+                               str(clients)], cwd=ROOT, env=env, stdout=subprocess.PIPE, text=True)
+             for _ in range(workers)]
+    latency, errors = [], 0
+    for proc in procs:
+        out, _ = proc.communicate()
+        result = json.loads(out.strip().splitlines()[-1])
+        latency += result['latency']
+        errors += result['errors']
+    conn = sqlite3.connect(db_path)
+    stored = conn.execute("SELECT count(*) FROM room").fetchone()[0]
+    conn.close()
+    print(f"{name:>8} | {len(latency) / seconds:>8.0f} | {percentile(latency, 0.5) * 1000:>7.2f} | "
+          f"{percentile(latency, 0.99) * 1000:>7.2f} | {errors:>6} | {stored:>7}")
+
+
+def main():
+    if sys.argv[1:2] == ['--worker']:
+        worker(float(sys.argv[2]), float(sys.argv[3]), int(sys.argv[4]))
+        return
+    workers = int(sys.argv[1]) if len(sys.argv) > 1 else WORKERS
+    clients = int(sys.argv[2]) if len(sys.argv) > 2 else CLIENTS
+    seconds = float(sys.argv[3]) if len(sys.argv) > 3 else DURATION
+    print(f"{workers} workers x {clients} clients creating rooms for {seconds:.0f}s")
+    print(f"{'config':>8} | {'rooms/s':>8} | {'p50 ms':>7} | {'p99 ms':>7} | {'errors':>6} | {'stored':>7}")
+    for name, env in CONFIGS:
+        run_config(name, env, workers, clients, seconds)
+
+
+if __name__ == "__main__":
+    main()
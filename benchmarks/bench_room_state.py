@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Memory per idle room, measured with tracemalloc over 100k rooms:
+
+  legacy dict  the original per-room dict: sets, nine-string board list
+  dict         the same dict with the bitmask TicTacToe game and delta deque
+  RoomState    room_state.RoomState (__slots__, tuples, vote bitmask)
+
+Each room has two members seated, as a typical idle pvp room does.
+
+    python benchmarks/bench_room_state.py [rooms]
+"""
+
+import os
+import sys
+import tracemalloc
+from collections import deque
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from room_state import DELTA_BUFFER, RoomState  # noqa: E402
+from tictactoe import TicTacToe  # noqa: E402
+
+ROOMS = 100000
+
+
+def legacy_dict(i):
+    """The literal run.py used before the rules engine and delta protocol"""
+    players = (f"alice{i}", f"bob{i}")
+    return {
+        'members': set(players),
+        'mode': 'pvp',
+        'players': {'X': players[0], 'O': players[1]},
+        'board': ['', '', '', '', '', '', '', '', ''],
+        'turn': 'X',
+        'winner': None,
+        'rematch_votes': set(),
+        'rematch_requested': False,
+        'rematch_pending': set(),
+        'room_creator': players[0]
+    }
+
+
+def state_dict(i):
+    """The literal run.py used just before RoomState"""
+    players = (f"alice{i}", f"bob{i}")
+    return {
+        'members': set(players),
+        'mode': 'pvp',
+        'bot_level': 'medium',
+        'players': {'X': players[0], 'O': players[1]},
+        'game': TicTacToe(),
+        'turn': 'X',
+        'winner': None,
+        'rematch_votes': set(),
+        'rematch_requested': False,
+        'rematch_pending': set(),
+        'room_creator': players[0],
+        'seq': 0,
+        'deltas': deque(maxlen=DELTA_BUFFER)
+    }
+
+
+def room_state(i):
+    players = (f"alice{i}", f"bob{i}")
+    state = RoomState('pvp', 'medium', players[0])
+    for mark, player in zip(state.marks, players):
+        state.add_member(player)
+        state.seat(mark, player)
+    return state
+
+
+def usernames(i):
+    # allocated by every layout alike, subtracted so only the room itself is counted
+    return (f"alice{i}", f"bob{i}")
+
+
+def bytes_per_room(factory, rooms):
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    active = {f"room-{i}": factory(i) for i in range(rooms)}
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    size = sum(stat.size_diff for stat in after.compare_to(before, 'filename'))
+    del active
+    return size / rooms
+
+
+def main():
+    rooms = int(sys.argv[1]) if len(sys.argv) > 1 else ROOMS
+    baseline = bytes_per_room(usernames, rooms)  # room ids, usernames and the dict slot
+    print(f"{rooms} idle rooms, 2 members each (room ids and usernames excluded)")
+    print(f"{'layout':>12} | {'bytes/room':>10} | {'total MB':>8}")
+    results = {}
+    for name, factory in (('legacy dict', legacy_dict), ('dict', state_dict), ('RoomState', room_state)):
+        per_room = bytes_per_room(factory, rooms) - baseline
+        results[name] = per_room
+        print(f"{name:>12} | {per_room:>10,.0f} | {per_room * rooms / 1e6:>8.1f}")
+    print(f"RoomState uses {results['RoomState'] / results['dict']:.0%} of the dict layout")
+
+
+if __name__ == "__main__":
+    main()
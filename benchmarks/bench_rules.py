@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Win detection microbenchmark: the old list-based _check_winner against
+the bitmask engine in tictactoe.py, on 3x3 and larger boards.
+
+    python benchmarks/bench_rules.py
+"""
+
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tictactoe import TicTacToe, get_rules  # noqa: E402
+
+NUMBER = 20000
+
+
+def legacy_check_winner(board):
+    """_check_winner as it was in run.py"""
+    wins = [
+        (0,1,2),(3,4,5),(6,7,8),
+        (0,3,6),(1,4,7),(2,5,8),
+        (0,4,8),(2,4,6)
+    ]
+    for a,b,c in wins:
+        if board[a] and board[a] == board[b] == board[c]:
+            return board[a]
+    if all(cell for cell in board):
+        return 'draw'
+    return None
+
+
+def legacy_lines(size, k):
+    return [tuple(i for i in range(size * size) if (mask >> i) & 1)
+            for mask in get_rules(size, k).win_masks]
+
+
+def legacy_scan(board, lines):
+    """Same full-board scan as _check_winner, generalised to N x N / k"""
+    for squares in lines:
+        first = board[squares[0]]
+        if first and all(board[sq] == first for sq in squares):
+            return first
+    if all(cell for cell in board):
+        return 'draw'
+    return None
+
+
+def random_position(size, fill, rng):
+    cells = size * size
+    order = rng.sample(range(cells), int(cells * fill))
+    board = [''] * cells
+    for n, i in enumerate(order):
+        board[i] = 'X' if n % 2 == 0 else 'O'
+    return board, order[-1]
+
+
+def per_call_us(stmt, number):
+    return min(timeit.repeat(stmt, number=number, repeat=5)) / number * 1e6
+
+
+def main():
+    rng = random.Random(7)
+    print(f"{'board':>10} | {'legacy us':>10} | {'bitmask us':>10} | {'speedup':>7}")
+
+    board, last = random_position(3, 0.6, rng)
+    game = TicTacToe.from_cells(board)
+    mark = board[last]
+    game.undo(last, mark)
+    legacy = per_call_us(lambda: legacy_check_winner(board), NUMBER)
+    bitmask = per_call_us(lambda: (game.play(last, mark), game.undo(last, mark)), NUMBER)
+    print(f"{'3x3 k=3':>10} | {legacy:>10.3f} | {bitmask:>10.3f} | {legacy / bitmask:>6.1f}x")
+
+    for size, k in ((7, 4), (15, 5)):
+        board, last = random_position(size, 0.3, rng)
+        game = TicTacToe.from_cells(board, size, k)
+        mark = board[last]
+        game.undo(last, mark)
+        lines = legacy_lines(size, k)
+        number = 200
+        legacy = per_call_us(lambda: legacy_scan(board, lines), number)
+        bitmask = per_call_us(lambda: (game.play(last, mark), game.undo(last, mark)), number * 50)
+        label = f"{size}x{size} k={k}"
+        print(f"{label:>10} | {legacy:>10.3f} | {bitmask:>10.3f} | {legacy / bitmask:>6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
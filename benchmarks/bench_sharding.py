@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Moves per second against the number of worker processes, for two layouts:
+
+  shared   every move loads the room from a shared store, under its lock,
+           and writes it back (ROOM_STORE_URL=redis://... without sharding)
+  sharded  rooms are split across workers by sharding.HashRing and each
+           worker plays its own rooms on hot in-process state
+
+A multiprocessing.Manager server stands in for Redis: like Redis it is a
+separate process and every access is a pickled round trip.  Also reports
+how many rooms change owner when a worker is added.
+
+    python benchmarks/bench_sharding.py [seconds per run]
+"""
+
+import multiprocessing
+import os
+import pickle
+import random
+import sys
+import time
+from collections import deque
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sharding import HashRing  # noqa: E402
+from tictactoe import TicTacToe  # noqa: E402
+
+ROOMS = 2000
+WORKER_COUNTS = (1, 2, 4)
+
+
+def new_state():
+    return {'game': TicTacToe(), 'turn': 'X', 'winner': None, 'seq': 0, 'deltas': deque(maxlen=32)}
+
+
+def play_move(state, rng):
+    """One ttt_move as run.py applies it; a finished game is reset"""
+    game = state['game']
+    if state['winner']:
+        game.reset()
+        state['winner'] = None
+    index = rng.choice(game.empties())
+    mark = state['turn']
+    state['winner'] = game.play(index, mark)
+    if not state['winner']:
+        state['turn'] = 'O' if mark == 'X' else 'X'
+    state['seq'] += 1
+    state['deltas'].append({'seq': state['seq'], 'last': {'index': index, 'mark': mark}})
+
+
+def shared_worker(rooms, locks, seconds, results):
+    rng = random.Random(os.getpid())
+    room_ids = list(range(ROOMS))
+    moves = 0
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        room_id = rng.choice(room_ids)
+        with locks[room_id % len(locks)]:
+            state = pickle.loads(rooms[room_id])
+            play_move(state, rng)
+            rooms[room_id] = pickle.dumps(state)
+        moves += 1
+    results.put(moves)
+
+
+def sharded_worker(node, nodes, seconds, results):
+    rng = random.Random(os.getpid())
+    ring = HashRing(nodes)
+    hot = {room_id: new_state() for room_id in range(ROOMS) if ring.owner(str(room_id)) == node}
+    room_ids = list(hot)
+    moves = 0
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        play_move(hot[rng.choice(room_ids)], rng)
+        moves += 1
+    results.put(moves)
+
+
+def run(workers, layout, seconds, manager):
+    results = multiprocessing.Queue()
+    if layout == 'shared':
+        rooms = manager.dict({room_id: pickle.dumps(new_state()) for room_id in range(ROOMS)})
+        locks = [manager.Lock() for _ in range(64)]
+        procs = [multiprocessing.Process(target=shared_worker, args=(rooms, locks, seconds, results))
+                 for _ in range(workers)]
+    else:
+        nodes = [f"worker-{i}" for i in range(workers)]
+        procs = [multiprocessing.Process(target=sharded_worker, args=(node, nodes, seconds, results))
+                 for node in nodes]
+    for p in procs:
+        p.start()
+    moves = sum(results.get() for _ in procs)
+    for p in procs:
+        p.join()
+    return moves / seconds
+
+
+def main():
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 2.0
+    print(f"{ROOMS} rooms, {seconds:.1f}s per run, {os.cpu_count()} CPUs")
+    print(f"{'workers':>7} | {'shared moves/s':>14} | {'sharded moves/s':>15} | {'speedup':>7}")
+    with multiprocessing.Manager() as manager:
+        for workers in WORKER_COUNTS:
+            shared = run(workers, 'shared', seconds, manager)
+            sharded = run(workers, 'sharded', seconds, manager)
+            print(f"{workers:>7} | {shared:>14,.0f} | {sharded:>15,.0f} | {sharded / shared:>6.1f}x")
+
+    print()
+    print(f"{'workers':>7} | {'rooms moved on +1':>17} | {'ideal':>6}")
+    for workers in WORKER_COUNTS:
+        before = HashRing([f"worker-{i}" for i in range(workers)])
+        after = HashRing([f"worker-{i}" for i in range(workers + 1)])
+        moved = sum(before.owner(str(r)) != after.owner(str(r)) for r in range(ROOMS))
+        print(f"{workers:>7} | {moved / ROOMS:>16.1%} | {1 / (workers + 1):>5.1%}")
+
+
+if __name__ == "__main__":
+    main()
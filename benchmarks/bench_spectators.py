@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+ttt_move latency of two players while thousands of sockets watch the game.
+
+One pvp room plays a move every MOVE_INTERVAL; move latency is measured
+from the moment the move was due, so a hub busy fanning out to spectators
+shows up as latency.  Scenarios:
+
+  no spectators   baseline
+  tiered          N spectators through join_room(spectate): coalesced
+                  snapshots every SPECTATOR_INTERVAL, tier by tier
+  same room       N sockets put in the players' own Socket.IO room, every
+                  ttt_update fanned out to all of them (the naive way)
+
+The spectators are Flask-SocketIO test clients, which decode every packet
+they receive: a fan-out costs more per socket here than over the network,
+the same in every scenario.  Objects alive when a scenario starts are
+frozen out of the cyclic GC, whose full passes over 10k sockets would
+otherwise show up as 100+ ms pauses in any scenario.
+
+    python benchmarks/bench_spectators.py [spectators] [seconds]
+"""
+
+import gc
+import os
+import sys
+import tempfile
+import time
+
+DB_PATH = os.path.join(tempfile.mkdtemp(), 'bench_spectators.db')
+os.environ.setdefault('DATABASE_URL', f'sqlite:///{DB_PATH}')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import eventlet  # noqa: E402
+from werkzeug.security import generate_password_hash  # noqa: E402
+
+import run  # noqa: E402
+from run import app, db, socketio, User  # noqa: E402
+
+SPECTATORS = 10000
+DURATION = 3.0  # seconds per scenario
+MOVE_INTERVAL = 0.02
+DRAIN_INTERVAL = 0.2  # seconds between emptying the spectators' receive queues
+
+
+def percentile(samples, q):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))] if ordered else 0.0
+
+
+def sid(sock):
+    return socketio.server.manager.sid_from_eio_sid(sock.eio_sid, '/')
+
+
+def logged_in(name, user_id):
+    http = app.test_client()
+    with http.session_transaction() as session:
+        session['username'] = name
+        session['user_id'] = user_id
+    return http
+
+
+def seed():
+    password_hash = generate_password_hash('watch')
+    with app.app_context():
+        db.session.add_all(User(username=name, password_hash=password_hash)
+                           for name in ('alice', 'bob', 'watcher'))
+        db.session.commit()
+        return dict(db.session.query(User.username, User.id))
+
+
+def new_game(ids):
+    a, b = logged_in('alice', ids['alice']), logged_in('bob', ids['bob'])
+    r = a.post('/dashboard', data={'room_name': 'watched', 'room_type': 'public', 'room_mode': 'pvp'})
+    room_id = r.headers['Location'].rsplit('/', 1)[-1]
+    sockets = {}
+    for http in (a, b):
+        sock = socketio.test_client(app, flask_test_client=http)
+        sock.emit('join_room', {'room_id': room_id})
+        mark = next(m['args'][0]['you'] for m in sock.get_received() if m['name'] == 'ttt_init')
+        sockets[mark] = sock
+    return room_id, sockets
+
+
+def play(room_id, sockets, deadline, latency):
+    """Move every MOVE_INTERVAL until `deadline`; latency measured from when each move was due"""
+    turn, free = 'X', list(range(9))
+    due = time.perf_counter()
+    while due < deadline:
+        due += MOVE_INTERVAL
+        eventlet.sleep(max(0.0, due - time.perf_counter()))
+        mover, opponent = sockets[turn], sockets['O' if turn == 'X' else 'X']
+        mover.emit('ttt_move', {'room_id': room_id, 'index': free[0]})
+        updates = [m['args'][0] for m in opponent.get_received() if m['name'] == 'ttt_update']
+        latency.append(time.perf_counter() - due)
+        mover.get_received()
+        free.pop(0)
+        turn, winner = updates[-1]['turn'], updates[-1]['winner']
+        if winner:
+            sockets['X'].emit('ttt_rematch_request', {'room_id': room_id})
+            sockets['O'].emit('ttt_rematch_response', {'room_id': room_id, 'response': 'accept'})
+            sockets['O'].get_received()
+            reset = [m['args'][0] for m in sockets['X'].get_received() if m['name'] == 'ttt_reset']
+            turn, free = reset[-1]['turn'], list(range(9))
+
+
+def drain(watchers, deadline, received):
+    while time.perf_counter() < deadline:
+        eventlet.sleep(DRAIN_INTERVAL)
+        for sock in watchers:
+            received[0] += len(sock.queue)
+            sock.queue.clear()
+
+
+def scenario(ids, name, watchers, mode, seconds):
+    room_id, sockets = new_game(ids)
+    for sock in watchers:
+        if mode == 'tiered':
+            sock.emit('join_room', {'room_id': room_id, 'spectate': True})
+        elif mode == 'same room':
+            socketio.server.enter_room(sid(sock), room_id, namespace='/')
+        sock.queue.clear()
+    # 10k long-lived sockets: keep full GC passes over them out of the measured moves
+    gc.collect()
+    gc.freeze()
+    deadline = time.perf_counter() + seconds
+    latency, received = [], [0]
+    pool = eventlet.GreenPool()
+    game = pool.spawn(play, room_id, sockets, deadline, latency)
+    pool.spawn(drain, watchers if mode else [], deadline, received)
+    game.wait()
+    pool.waitall()
+    for sock in sockets.values():
+        sock.emit('dissolve_room', {'room_id': room_id})
+        sock.disconnect()
+    eventlet.sleep(app.config['SPECTATOR_INTERVAL'])  # tiered: the hub notices the dissolved room
+    for sock in watchers:
+        sock.emit('leave_room', {'room_id': room_id})
+        socketio.server.leave_room(sid(sock), room_id, namespace='/')
+        sock.queue.clear()
+    print(f"{name:>14} | {len(latency):>5} | {percentile(latency, 0.5) * 1000:>7.2f} | "
+          f"{percentile(latency, 0.95) * 1000:>7.2f} | {percentile(latency, 0.99) * 1000:>7.2f} | "
+          f"{max(latency, default=0) * 1000:>7.2f} | {received[0]:>9}")
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else SPECTATORS
+    seconds = float(sys.argv[2]) if len(sys.argv) > 2 else DURATION
+    ids = seed()
+    watcher = logged_in('watcher', ids['watcher'])
+    started = time.perf_counter()
+    watchers = [socketio.test_client(app, flask_test_client=watcher) for _ in range(count)]
+    print(f"{count} spectator sockets connected in {time.perf_counter() - started:.1f}s; "
+          f"{seconds:.0f}s per scenario, a move due every {MOVE_INTERVAL * 1000:.0f} ms, "
+          f"snapshots every {app.config['SPECTATOR_INTERVAL'] * 1000:.0f} ms in tiers of "
+          f"{app.config['SPECTATOR_TIER_SIZE']}")
+    print(f"{'scenario':>14} | {'moves':>5} | {'p50 ms':>7} | {'p95 ms':>7} | {'p99 ms':>7} | "
+          f"{'max ms':>7} | {'delivered':>9}")
+    scenario(ids, 'no spectators', watchers, None, seconds)
+    scenario(ids, 'tiered', watchers, 'tiered', seconds)
+    scenario(ids, 'same room', watchers, 'same room', seconds)
+    print(run.spectator_hub.stats())
+
+
+if __name__ == "__main__":
+    run.start_services()  # as the server entry point does
+    main()
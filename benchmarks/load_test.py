@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+"""
+Socket.IO load harness: thousands of clients playing pvp TicTacToe at once.
+
+Every pair of clients creates a room from the dashboard, joins it over
+Socket.IO, plays `--games` full games (random legal moves) with a rematch
+between them, then leaves.  All clients stay connected for the whole run,
+their games interleaved on the eventlet hub like concurrent browsers.
+
+Reported: ttt_move -> ttt_update latency as seen by the opponent
+(p50/p95/p99/max), socket events per second both ways and the server's
+resident memory (the clients are in-process, so this includes them).
+
+The clients are Flask-SocketIO test clients (no network, no extra
+packages); users are seeded in the database with one shared password hash
+unless --register is given, so a run measures the game path and not
+scrypt.  --max-p99 turns the run into a regression check (exit code 1).
+
+    python benchmarks/load_test.py [--clients 2000] [--games 3] [--json out.json]
+"""
+
+import argparse
+import json
+import os
+import random
+import resource
+import sys
+import tempfile
+import time
+
+DB_PATH = os.path.join(tempfile.mkdtemp(), 'load_test.db')
+os.environ.setdefault('DATABASE_URL', f'sqlite:///{DB_PATH}')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import eventlet  # noqa: E402
+from werkzeug.security import generate_password_hash  # noqa: E402
+
+import run  # noqa: E402
+from run import app, db, socketio, User  # noqa: E402
+
+CLIENTS = 2000
+GAMES = 3
+PASSWORD = 'load-test'
+
+
+def rss_mb():
+    """(current, peak) resident set size of this process in MB"""
+    try:
+        with open('/proc/self/status') as f:
+            fields = dict(line.split(':', 1) for line in f)
+        return int(fields['VmRSS'].split()[0]) / 1024, int(fields['VmHWM'].split()[0]) / 1024
+    except (OSError, KeyError):
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        return peak, peak
+
+
+def percentile(samples, q):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+
+class Player:
+    def __init__(self, username):
+        self.username = username
+        self.http = app.test_client()
+        self.sock = None
+        self.mark = None
+
+    def connect(self):
+        self.sock = socketio.test_client(app, flask_test_client=self.http)
+
+    def emit(self, stats, event, data):
+        stats['sent'] += 1
+        self.sock.emit(event, data)
+
+    def drain(self, stats):
+        received = self.sock.get_received()
+        stats['received'] += len(received)
+        return received
+
+
+def seed_users(names):
+    """Insert the users directly, all sharing one password hash"""
+    password_hash = generate_password_hash(PASSWORD)
+    with app.app_context():
+        db.session.add_all(User(username=name, password_hash=password_hash) for name in names)
+        db.session.commit()
+        ids = dict(db.session.query(User.username, User.id))
+    players = []
+    for name in names:
+        player = Player(name)
+        with player.http.session_transaction() as session:
+            session['username'] = name
+            session['user_id'] = ids[name]
+        players.append(player)
+    return players
+
+
+def register_users(names):
+    players = []
+    for i, name in enumerate(names):
+        player = Player(name)
+        # one address per client, as real sign-ups come from many (see the login throttle)
+        address = f"10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}"
+        player.http.post('/register', data={'username': name, 'password': PASSWORD},
+                         environ_base={'REMOTE_ADDR': address})
+        players.append(player)
+        eventlet.sleep(0)
+    return players
+
+
+def play_pair(creator, joiner, games, rng, stats):
+    r = creator.http.post('/dashboard', data={
+        'room_name': f"load {creator.username}", 'room_type': 'public', 'room_mode': 'pvp'})
+    room_id = r.headers['Location'].rsplit('/', 1)[-1]
+    turn = 'X'
+    for player in (creator, joiner):
+        player.emit(stats, 'join_room', {'room_id': room_id})
+        for message in player.drain(stats):
+            if message['name'] == 'ttt_init':
+                player.mark = message['args'][0]['you']
+                turn = message['args'][0]['turn']
+    by_mark = {creator.mark: creator, joiner.mark: joiner}
+    if None in by_mark:
+        stats['errors'] += 1
+        return
+
+    for game in range(games):
+        free = list(range(9))
+        winner = None
+        while not winner:
+            mover = by_mark[turn]
+            opponent = joiner if mover is creator else creator
+            index = rng.choice(free)
+            started = time.perf_counter()
+            mover.emit(stats, 'ttt_move', {'room_id': room_id, 'index': index})
+            update = None
+            for message in opponent.drain(stats):
+                if message['name'] == 'ttt_update' and message['args'][0]['last']['index'] == index:
+                    update = message['args'][0]
+            stats['latency'].append(time.perf_counter() - started)
+            mover.drain(stats)
+            if update is None:
+                stats['errors'] += 1
+                return
+            free.remove(index)
+            turn, winner = update['turn'], update['winner']
+            stats['moves'] += 1
+            eventlet.sleep(0)  # let the other games (and background tasks) run
+        stats['games'] += 1
+
+        if game + 1 < games:
+            creator.emit(stats, 'ttt_rematch_request', {'room_id': room_id})
+            joiner.emit(stats, 'ttt_rematch_response', {'room_id': room_id, 'response': 'accept'})
+            reset = [m for m in creator.drain(stats) if m['name'] == 'ttt_reset']
+            joiner.drain(stats)
+            if not reset:
+                stats['errors'] += 1
+                return
+            turn = reset[-1]['args'][0]['turn']
+            stats['rematches'] += 1
+            eventlet.sleep(0)
+
+    for player in (creator, joiner):
+        player.emit(stats, 'leave_room', {'room_id': room_id})
+        player.drain(stats)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--clients', type=int, default=CLIENTS, help='connected clients (even)')
+    parser.add_argument('--games', type=int, default=GAMES, help='games per room, rematch in between')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--register', action='store_true', help='sign up through /register (slow: scrypt)')
+    parser.add_argument('--json', help='also write the results to this file')
+    parser.add_argument('--max-p99', type=float, help='fail (exit 1) if p99 latency exceeds this many ms')
+    args = parser.parse_args()
+
+    pairs = max(1, args.clients // 2)
+    names = [f"load{i}" for i in range(pairs * 2)]
+    rss_start, _ = rss_mb()
+
+    started = time.perf_counter()
+    players = register_users(names) if args.register else seed_users(names)
+    signup = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for player in players:
+        player.connect()
+    connect = time.perf_counter() - started
+    rss_connected, _ = rss_mb()
+
+    stats = {'sent': 0, 'received': 0, 'moves': 0, 'games': 0, 'rematches': 0,
+             'errors': 0, 'latency': []}
+    rng = random.Random(args.seed)
+    pool = eventlet.GreenPool(pairs)
+    started = time.perf_counter()
+    for i in range(pairs):
+        pool.spawn(play_pair, players[2 * i], players[2 * i + 1], args.games,
+                   random.Random(rng.random()), stats)
+    pool.waitall()
+    elapsed = time.perf_counter() - started
+    rss_end, rss_peak = rss_mb()
+
+    for player in players:
+        player.sock.disconnect()
+    run.move_log.flush()
+
+    latency = stats.pop('latency')
+    results = dict(stats, **{
+        'clients': pairs * 2,
+        'rooms': pairs,
+        'signup_s': round(signup, 3),
+        'connect_s': round(connect, 3),
+        'play_s': round(elapsed, 3),
+        'events_per_s': round((stats['sent'] + stats['received']) / elapsed, 1),
+        'moves_per_s': round(stats['moves'] / elapsed, 1),
+        'latency_ms': {name: round(value * 1000, 3) for name, value in (
+            ('p50', percentile(latency, 0.50)),
+            ('p95', percentile(latency, 0.95)),
+            ('p99', percentile(latency, 0.99)),
+            ('max', max(latency, default=0.0)))},
+        'rss_mb': {'start': round(rss_start, 1), 'connected': round(rss_connected, 1),
+                   'end': round(rss_end, 1), 'peak': round(rss_peak, 1)},
+        'protocol': app.config['GAME_PROTOCOL'],
+    })
+
+    lat = results['latency_ms']
+    print(f"{results['clients']} clients, {pairs} rooms, {args.games} games per room")
+    print(f"signup {signup:.2f}s ({'register' if args.register else 'seeded'}), connect {connect:.2f}s")
+    print(f"played {stats['games']} games / {stats['moves']} moves / {stats['rematches']} rematches "
+          f"in {elapsed:.2f}s, {stats['errors']} errors")
+    print(f"events {stats['sent']} sent + {stats['received']} received = {results['events_per_s']:,.0f}/s, "
+          f"{results['moves_per_s']:,.0f} moves/s")
+    print(f"ttt_move -> ttt_update  p50 {lat['p50']:.2f} ms  p95 {lat['p95']:.2f} ms  "
+          f"p99 {lat['p99']:.2f} ms  max {lat['max']:.2f} ms")
+    rss = results['rss_mb']
+    print(f"RSS {rss['start']:.0f} MB at start, {rss['connected']:.0f} MB connected, "
+          f"{rss['peak']:.0f} MB peak")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+    if stats['errors'] or (args.max_p99 is not None and lat['p99'] > args.max_p99):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    run.start_services()  # as the server entry point does
+    main()
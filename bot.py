@@ -0,0 +1,390 @@
+"""
+TicTacToe bot engine for `mode == 'bot'` rooms.
+
+Levels:
+  easy    - random empty cell
+  medium  - take a winning cell, otherwise block the opponent, otherwise random
+  perfect - 3x3: O(1) lookup in a precomputed table of every reachable
+            position (symmetry reduced); larger boards: the opening book,
+            then iterative deepening alpha-beta with a shared transposition
+            table and a time budget
+
+Both tables can come from a position file (position_db.py) that every
+worker maps instead of building the 3x3 table in its own heap.
+"""
+
+import random
+import time
+from functools import lru_cache
+
+from position_db import PositionDB, position_key
+from tictactoe import TicTacToe
+
+BOT_LEVELS = ('easy', 'medium', 'perfect')
+DEFAULT_BOT_LEVEL = 'medium'
+SEARCH_BUDGET = 0.5  # seconds per move for the alpha-beta fallback
+TT_MAX_ENTRIES = 500000
+
+_WIN = 1000000
+
+
+def choose_move(game, mark, level=DEFAULT_BOT_LEVEL, budget=SEARCH_BUDGET, rng=random):
+    """Pick a cell for `mark` on `game` (a tictactoe.TicTacToe), or None if full"""
+    empties = game.empties()
+    if not empties:
+        return None
+    if level == 'easy':
+        return rng.choice(empties)
+    if level == 'medium':
+        move = _tactical_move(game, mark, empties)
+        return move if move is not None else rng.choice(empties)
+    if game.size == 3 and game.rules.k == 3:
+        move = perfect_move(game.bits(mark), game.bits(_other(mark)))
+        if move is None:  # a position the table does not have, e.g. already won
+            move = _tactical_move(game, mark, empties)
+        return move if move is not None else rng.choice(empties)
+    move = book_move(game, mark)
+    return move if move is not None else search_move(game, mark, budget)
+
+
+def _other(mark):
+    return 'O' if mark == 'X' else 'X'
+
+
+def _tactical_move(game, mark, empties):
+    """A cell that wins now, else one that blocks the opponent's win, else None"""
+    rules = game.rules
+    mine, theirs = game.bits(mark), game.bits(_other(mark))
+    for bits in (mine, theirs):
+        for i in empties:
+            if rules.wins_through(bits | (1 << i), i):
+                return i
+    return None
+
+
+# ---------------------------------------------------------------------------
+# 3x3 perfect-play table
+# ---------------------------------------------------------------------------
+
+# the 8 symmetries of the 3x3 square as cell permutations: new[i] = old[perm[i]]
+_SYMMETRIES = [
+    (0, 1, 2, 3, 4, 5, 6, 7, 8),  # identity
+    (6, 3, 0, 7, 4, 1, 8, 5, 2),  # rotate 90
+    (8, 7, 6, 5, 4, 3, 2, 1, 0),  # rotate 180
+    (2, 5, 8, 1, 4, 7, 0, 3, 6),  # rotate 270
+    (2, 1, 0, 5, 4, 3, 8, 7, 6),  # mirror left/right
+    (6, 7, 8, 3, 4, 5, 0, 1, 2),  # mirror top/bottom
+    (0, 3, 6, 1, 4, 7, 2, 5, 8),  # transpose
+    (8, 5, 2, 7, 4, 1, 6, 3, 0),  # anti-transpose
+]
+_WIN_MASKS_3 = (0o007, 0o070, 0o700, 0o111, 0o222, 0o444, 0o421, 0o124)
+
+
+def _build_sym_masks():
+    tables = []
+    for perm in _SYMMETRIES:
+        table = []
+        for mask in range(512):
+            out = 0
+            for new, old in enumerate(perm):
+                if (mask >> old) & 1:
+                    out |= 1 << new
+            table.append(out)
+        tables.append(table)
+    return tables
+
+
+_SYM_MASKS = _build_sym_masks()
+
+
+def _canonical(mine, theirs):
+    """Smallest (key, symmetry) over the 8 symmetries of (mine, theirs)"""
+    best_key, best_sym = None, 0
+    for s, table in enumerate(_SYM_MASKS):
+        key = table[mine] | (table[theirs] << 9)
+        if best_key is None or key < best_key:
+            best_key, best_sym = key, s
+    return best_key, best_sym
+
+
+def _is_win3(bits):
+    for mask in _WIN_MASKS_3:
+        if bits & mask == mask:
+            return True
+    return False
+
+
+@lru_cache(maxsize=1)
+def perfect_table():
+    """
+    {canonical key: best cell in the canonical frame} for every reachable
+    3x3 position, from the point of view of the side to move.  Built once
+    (a few thousand negamax nodes) and shared by every room.
+    """
+    scores = {}
+    table = {}
+
+    def solve(mine, theirs):
+        key, sym = _canonical(mine, theirs)
+        if key in scores:
+            return scores[key]
+        cmine = _SYM_MASKS[sym][mine]
+        ctheirs = _SYM_MASKS[sym][theirs]
+        occupied = cmine | ctheirs
+        best_score, best_cell = None, None
+        for i in range(9):
+            if (occupied >> i) & 1:
+                continue
+            after = cmine | (1 << i)
+            if _is_win3(after):
+                score = 10 - bin(occupied).count('1')
+            elif occupied | (1 << i) == 0o777:
+                score = 0
+            else:
+                score = -solve(ctheirs, after)
+            if best_score is None or score > best_score:
+                best_score, best_cell = score, i
+        scores[key] = best_score
+        table[key] = best_cell
+        return best_score
+
+    solve(0, 0)
+    return table
+
+
+def perfect_move(mine, theirs):
+    """O(1) perfect reply for the side owning `mine` on a 3x3 board, from the
+    position file when one is mapped and has it, else from the table"""
+    if _position_db is not None:
+        move = _mapped_perfect_move(mine, theirs)
+        if move is not None:
+            return move
+    key, sym = _canonical(mine, theirs)
+    cell = perfect_table().get(key)
+    if cell is None:
+        return None
+    return _SYMMETRIES[sym][cell]
+
+
+# ---------------------------------------------------------------------------
+# position file
+# ---------------------------------------------------------------------------
+
+_position_db = None
+
+
+def open_position_db(path):
+    """Answer from the position file at `path` from now on; False if there is none"""
+    global _position_db
+    try:
+        _position_db = PositionDB(path)
+    except FileNotFoundError:
+        return False
+    except ValueError as e:
+        print(f"Position file ignored: {e}")
+        return False
+    return True
+
+
+def position_db():
+    return _position_db
+
+
+def _mapped_perfect_move(mine, theirs):
+    """The 3x3 table's reply from the position file (stored in the canonical frame),
+    None when the file has no usable entry (missing, or not a free cell)"""
+    key, sym = _canonical(mine, theirs)
+    cell = _position_db.get(position_key(3, 3, key & 0o777, key >> 9))
+    if cell is None or cell >= 9:
+        return None
+    move = _SYMMETRIES[sym][cell]
+    return None if (mine | theirs) >> move & 1 else move
+
+
+def book_move(game, mark):
+    """Precomputed reply from the position file (3x3 table or opening books), or None"""
+    if _position_db is None:
+        return None
+    rules = game.rules
+    mine, theirs = game.bits(mark), game.bits(_other(mark))
+    if rules.size == 3 and rules.k == 3:
+        move = _mapped_perfect_move(mine, theirs)
+    else:
+        move = _position_db.get(position_key(rules.size, rules.k, mine, theirs))
+    return move if move is not None and game.is_free(move) else None
+
+
+def position_entries(books=(), budget=SEARCH_BUDGET):
+    """
+    {position key: move} for the position file: the 3x3 table in its
+    canonical frame, plus a searched reply for every position of each
+    (size, k, plies) book reachable in fewer than `plies` moves.
+    """
+    entries = {position_key(3, 3, key & 0o777, key >> 9): cell
+               for key, cell in perfect_table().items()}
+    for size, k, plies in books:
+        game, seen = TicTacToe(size, k), set()
+
+        def visit(depth):
+            if depth == plies or (game.x, game.o) in seen:
+                return
+            seen.add((game.x, game.o))
+            mark = 'X' if game.count % 2 == 0 else 'O'
+            move = search_move(game, mark, budget)
+            if move is not None:
+                entries[position_key(size, k, game.bits(mark), game.bits(_other(mark)))] = move
+            for i in game.empties():
+                if not game.play(i, mark):
+                    visit(depth + 1)
+                game.undo(i, mark)
+
+        visit(0)
+    return entries
+
+
+# ---------------------------------------------------------------------------
+# alpha-beta search for larger boards
+# ---------------------------------------------------------------------------
+
+# shared across rooms: {(size, k): {(mine, theirs): (depth, flag, score, move)}}
+_transpositions = {}
+_EXACT, _LOWER, _UPPER = 0, 1, 2
+# score of a line holding n of one side's stones and none of the other's
+_LINE_WEIGHTS = (0, 1, 8, 64, 512, 4096, 32768)
+
+
+class _Timeout(Exception):
+    pass
+
+
+@lru_cache(maxsize=None)
+def _neighbour_masks(rules):
+    size = rules.size
+    masks = []
+    for i in range(rules.cells):
+        r, c = divmod(i, size)
+        mask = 0
+        for dr in (-1, 0, 1):
+            for dc in (-1, 0, 1):
+                rr, cc = r + dr, c + dc
+                if (dr or dc) and 0 <= rr < size and 0 <= cc < size:
+                    mask |= 1 << (rr * size + cc)
+        masks.append(mask)
+    return masks
+
+
+def _candidates(rules, mine, theirs):
+    """Empty cells next to a stone (the whole board is rarely worth searching)"""
+    occupied = mine | theirs
+    if not occupied:
+        return [(rules.size // 2) * rules.size + rules.size // 2]
+    neighbours = _neighbour_masks(rules)
+    near = 0
+    bits = occupied
+    while bits:
+        low = bits & -bits
+        near |= neighbours[low.bit_length() - 1]
+        bits ^= low
+    near &= ~occupied
+    cells = []
+    while near:
+        low = near & -near
+        cells.append(low.bit_length() - 1)
+        near ^= low
+    return cells
+
+
+def _evaluate(rules, mine, theirs):
+    weights = _LINE_WEIGHTS
+    top = len(weights) - 1
+    score = 0
+    for mask in rules.win_masks:
+        a = mine & mask
+        b = theirs & mask
+        if a and not b:
+            score += weights[min(bin(a).count('1'), top)]
+        elif b and not a:
+            score -= weights[min(bin(b).count('1'), top)]
+    return score
+
+
+def search_move(game, mark, budget=SEARCH_BUDGET, max_depth=None):
+    """Iterative deepening negamax with alpha-beta, bounded by `budget` seconds"""
+    rules = game.rules
+    mine, theirs = game.bits(mark), game.bits(_other(mark))
+    table = _transpositions.setdefault((rules.size, rules.k), {})
+    if len(table) > TT_MAX_ENTRIES:
+        table.clear()
+    deadline = time.monotonic() + budget
+    full = rules.full
+    counter = [0]
+
+    def negamax(mine, theirs, depth, alpha, beta, ply):
+        counter[0] += 1
+        if counter[0] & 255 == 0 and time.monotonic() > deadline:
+            raise _Timeout()
+        key = (mine, theirs)
+        entry = table.get(key)
+        tt_move = None
+        if entry is not None:
+            e_depth, flag, e_score, tt_move = entry
+            if e_depth >= depth:
+                if flag == _EXACT:
+                    return e_score, tt_move
+                if flag == _LOWER and e_score >= beta:
+                    return e_score, tt_move
+                if flag == _UPPER and e_score <= alpha:
+                    return e_score, tt_move
+        if depth == 0:
+            return _evaluate(rules, mine, theirs), None
+
+        moves = _candidates(rules, mine, theirs)
+        if tt_move is not None and tt_move in moves:
+            moves.remove(tt_move)
+            moves.insert(0, tt_move)
+        alpha_orig = alpha
+        best_score, best_move = -_WIN * 2, moves[0]
+        for i in moves:
+            after = mine | (1 << i)
+            if rules.wins_through(after, i):
+                score = _WIN - ply
+            elif (after | theirs) == full:
+                score = 0
+            else:
+                score = -negamax(theirs, after, depth - 1, -beta, -alpha, ply + 1)[0]
+            if score > best_score:
+                best_score, best_move = score, i
+            if score > alpha:
+                alpha = score
+            if alpha >= beta:
+                break
+        flag = _EXACT
+        if best_score <= alpha_orig:
+            flag = _UPPER
+        elif best_score >= beta:
+            flag = _LOWER
+        table[key] = (depth, flag, best_score, best_move)
+        return best_score, best_move
+
+    empties = game.empties()
+    if not empties:
+        return None
+    # forced moves first: they are cheap and the search may not reach them in time
+    forced = _tactical_move(game, mark, empties)
+    if forced is not None:
+        return forced
+
+    best = _candidates(rules, mine, theirs)[0]
+    limit = max_depth or len(empties)
+    depth = 1
+    while depth <= limit:
+        try:
+            score, move = negamax(mine, theirs, depth, -_WIN * 2, _WIN * 2, 0)
+        except _Timeout:
+            break
+        if move is not None:
+            best = move
+        if abs(score) >= _WIN - len(empties):
+            break
+        depth += 1
+    return best
@@ -0,0 +1,151 @@
+"""
+Bot move execution off the eventlet hub.
+
+Cheap replies are answered inline: easy/medium, every 3x3 'perfect' reply
+(an O(1) lookup in the perfect-play table, built once by warm() at startup
+in a few milliseconds) and opening-book hits.  Only searches of larger
+boards run in a process pool.  The calling greenlet polls the future with
+a cooperative sleep, so other rooms keep playing while the worker thinks.
+The pool has a bounded number of in-flight requests and every request has
+a deadline; when either is hit the bot falls back to a cheap tactical move
+instead of stalling the game.
+"""
+
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import bot
+from tictactoe import TicTacToe
+
+POLL_INTERVAL = 0.005  # seconds between future.done() checks
+
+
+def _worker_move(size, k, x, o, mark, level, budget):
+    """Runs in a pool process: rebuild the board and search it"""
+    started = time.perf_counter()
+    game = TicTacToe(size, k)
+    game.x, game.o = x, o
+    game.count = bin(x | o).count('1')
+    move = bot.choose_move(game, mark, level, budget)
+    return move, time.perf_counter() - started
+
+
+def _warm_worker():
+    """Runs in a pool process: nothing to build, starting the process is the point"""
+    return True
+
+
+def is_cheap(level):
+    """True when the reply is a single pass over the board"""
+    return level != 'perfect'
+
+
+def is_lookup(game):
+    """True for a 3x3 board, whose perfect reply is a table lookup"""
+    return game.rules.size == 3 and game.rules.k == 3
+
+
+class BotService:
+    def __init__(self, workers=2, queue_limit=64, budget=bot.SEARCH_BUDGET,
+                 deadline=None, sleep=time.sleep):
+        self.workers = workers
+        self.queue_limit = queue_limit
+        self.budget = budget
+        # time allowed on top of the search budget for queueing and IPC
+        self.deadline = deadline if deadline is not None else budget + 1.0
+        self._sleep = sleep
+        self._pool = None
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.submitted = 0
+        self.completed = 0
+        self.inline = 0
+        self.book_hits = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self.failed = 0
+        self.compute_seconds = 0.0
+        self.compute_max = 0.0
+        self.wait_seconds = 0.0
+
+    def _get_pool(self):
+        if self._pool is None:
+            # spawn: forking a process that runs an eventlet hub is not safe
+            ctx = multiprocessing.get_context('spawn')
+            self._pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=ctx)
+        return self._pool
+
+    def warm(self):
+        """Build the 3x3 table and start the workers now, so the first bot reply
+        waits for neither"""
+        bot.perfect_table()
+        pool = self._get_pool()
+        for _ in range(self.workers):
+            pool.submit(_warm_worker)
+
+    def compute(self, game, mark, level):
+        """Bot reply for `mark`; blocks only the calling greenlet"""
+        if is_cheap(level) or is_lookup(game):
+            self.inline += 1
+            return bot.choose_move(game, mark, level)
+        move = bot.book_move(game, mark)
+        if move is not None:
+            self.book_hits += 1
+            return move
+        if self.in_flight >= self.queue_limit:
+            self.rejected += 1
+            return bot.choose_move(game, mark, 'medium')
+
+        rules = game.rules
+        started = time.monotonic()
+        future = self._get_pool().submit(_worker_move, rules.size, rules.k,
+                                         game.x, game.o, mark, level, self.budget)
+        self.submitted += 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            while not future.done():
+                if time.monotonic() - started > self.deadline:
+                    future.cancel()
+                    self.timed_out += 1
+                    return bot.choose_move(game, mark, 'medium')
+                self._sleep(POLL_INTERVAL)
+            try:
+                move, elapsed = future.result()
+            except Exception as e:
+                print(f"Bot worker failed: {e}")
+                self.failed += 1
+                return bot.choose_move(game, mark, 'medium')
+        finally:
+            self.in_flight -= 1
+        self.completed += 1
+        self.compute_seconds += elapsed
+        self.compute_max = max(self.compute_max, elapsed)
+        self.wait_seconds += max(0.0, time.monotonic() - started - elapsed)
+        return move
+
+    def stats(self):
+        done = self.completed or 1
+        return {
+            'workers': self.workers,
+            'queue_limit': self.queue_limit,
+            'queue_depth': self.in_flight,
+            'max_queue_depth': self.max_in_flight,
+            'submitted': self.submitted,
+            'completed': self.completed,
+            'inline': self.inline,
+            'book_hits': self.book_hits,
+            'rejected': self.rejected,
+            'timed_out': self.timed_out,
+            'failed': self.failed,
+            'compute_ms_avg': self.compute_seconds / done * 1000,
+            'compute_ms_max': self.compute_max * 1000,
+            'queue_wait_ms_avg': self.wait_seconds / done * 1000,
+            'position_db': bot.position_db().stats() if bot.position_db() else None,
+        }
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
@@ -0,0 +1,544 @@
+"""
+Bitboard chess move generator for `mode == 'chess'` rooms.
+
+Squares are numbered a1=0 .. h8=63 and every piece type/colour has its own
+64-bit bitboard, with a mailbox alongside for O(1) "what is on this
+square" lookups.  Knight, king and pawn attacks and the sliding rays are
+precomputed once at import.  make()/unmake() update the position in place
+(no board copies) and keep a Zobrist hash up to date incrementally, which
+is also what repetition detection runs on.
+"""
+
+import random
+
+WHITE, BLACK = 0, 1
+PAWN, KNIGHT, BISHOP, ROOK, QUEEN, KING = range(6)
+PIECE_CHARS = 'PNBRQKpnbrqk'
+PROMO_CHARS = {KNIGHT: 'n', BISHOP: 'b', ROOK: 'r', QUEEN: 'q'}
+PROMO_PIECES = {ch: piece for piece, ch in PROMO_CHARS.items()}
+
+START_FEN = 'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1'
+
+# move flags
+NORMAL, EN_PASSANT, CASTLE, DOUBLE_PUSH = 0, 1, 2, 3
+
+# castling rights bits
+WK, WQ, BK, BQ = 1, 2, 4, 8
+
+FILE_A = 0x0101010101010101
+FILE_H = FILE_A << 7
+FULL = (1 << 64) - 1
+
+
+def square(name):
+    return (ord(name[0]) - 97) + 8 * (int(name[1]) - 1)
+
+
+def square_name(sq):
+    return 'abcdefgh'[sq & 7] + str((sq >> 3) + 1)
+
+
+def encode_move(frm, to, promo=0, flag=NORMAL):
+    return frm | (to << 6) | (promo << 12) | (flag << 15)
+
+
+def move_from(move):
+    return move & 63
+
+
+def move_to(move):
+    return (move >> 6) & 63
+
+
+def move_promo(move):
+    return (move >> 12) & 7
+
+
+def move_flag(move):
+    return move >> 15
+
+
+def move_uci(move):
+    promo = move_promo(move)
+    return square_name(move_from(move)) + square_name(move_to(move)) + (PROMO_CHARS[promo] if promo else '')
+
+
+# ---------------------------------------------------------------------------
+# precomputed attack tables
+# ---------------------------------------------------------------------------
+
+def _leaper_table(offsets):
+    table = []
+    for sq in range(64):
+        r, f = divmod(sq, 8)
+        mask = 0
+        for dr, df in offsets:
+            rr, ff = r + dr, f + df
+            if 0 <= rr < 8 and 0 <= ff < 8:
+                mask |= 1 << (rr * 8 + ff)
+        table.append(mask)
+    return table
+
+
+KNIGHT_ATTACKS = _leaper_table([(1, 2), (2, 1), (2, -1), (1, -2), (-1, -2), (-2, -1), (-2, 1), (-1, 2)])
+KING_ATTACKS = _leaper_table([(1, 0), (1, 1), (0, 1), (-1, 1), (-1, 0), (-1, -1), (0, -1), (1, -1)])
+PAWN_ATTACKS = [_leaper_table([(1, -1), (1, 1)]), _leaper_table([(-1, -1), (-1, 1)])]
+
+# (rank step, file step, ray grows towards higher squares)
+_DIRECTIONS = [(1, 0, True), (0, 1, True), (1, 1, True), (1, -1, True),
+               (-1, 0, False), (0, -1, False), (-1, -1, False), (-1, 1, False)]
+ROOK_DIRS = (0, 1, 4, 5)
+BISHOP_DIRS = (2, 3, 6, 7)
+
+
+def _ray_table():
+    rays = []
+    for dr, df, _ in _DIRECTIONS:
+        table = []
+        for sq in range(64):
+            r, f = divmod(sq, 8)
+            mask = 0
+            r, f = r + dr, f + df
+            while 0 <= r < 8 and 0 <= f < 8:
+                mask |= 1 << (r * 8 + f)
+                r, f = r + dr, f + df
+            table.append(mask)
+        rays.append(table)
+    return rays
+
+
+RAYS = _ray_table()
+_POSITIVE = [d[2] for d in _DIRECTIONS]
+
+
+def _slider_attacks(sq, occ, dirs):
+    attacks = 0
+    for d in dirs:
+        ray = RAYS[d][sq]
+        blockers = ray & occ
+        if blockers:
+            if _POSITIVE[d]:
+                first = (blockers & -blockers).bit_length() - 1
+            else:
+                first = blockers.bit_length() - 1
+            ray ^= RAYS[d][first]
+        attacks |= ray
+    return attacks
+
+
+def rook_attacks(sq, occ):
+    return _slider_attacks(sq, occ, ROOK_DIRS)
+
+
+def bishop_attacks(sq, occ):
+    return _slider_attacks(sq, occ, BISHOP_DIRS)
+
+
+# castling rights that survive a move touching each square
+CASTLE_MASK = [15] * 64
+CASTLE_MASK[0] &= ~WQ
+CASTLE_MASK[7] &= ~WK
+CASTLE_MASK[4] &= ~(WK | WQ)
+CASTLE_MASK[56] &= ~BQ
+CASTLE_MASK[63] &= ~BK
+CASTLE_MASK[60] &= ~(BK | BQ)
+
+# ---------------------------------------------------------------------------
+# Zobrist keys (fixed seed so every worker process hashes positions the same)
+# ---------------------------------------------------------------------------
+
+_rng = random.Random(0x5EED_C4E55)
+Z_PIECE = [[_rng.getrandbits(64) for _ in range(64)] for _ in range(12)]
+Z_SIDE = _rng.getrandbits(64)
+Z_CASTLE = [_rng.getrandbits(64) for _ in range(16)]
+Z_EP = [_rng.getrandbits(64) for _ in range(8)]
+del _rng
+
+
+def _bits(bb):
+    while bb:
+        low = bb & -bb
+        yield low.bit_length() - 1
+        bb ^= low
+
+
+class Position:
+    """Mutable chess position; make()/unmake() work in place"""
+
+    def __init__(self, fen=START_FEN):
+        self.set_fen(fen)
+
+    # -- setup ---------------------------------------------------------------
+
+    def set_fen(self, fen):
+        parts = fen.split()
+        self.bb = [0] * 12
+        self.mailbox = [-1] * 64
+        rank, file = 7, 0
+        for ch in parts[0]:
+            if ch == '/':
+                rank, file = rank - 1, 0
+            elif ch.isdigit():
+                file += int(ch)
+            else:
+                piece = PIECE_CHARS.index(ch)
+                sq = rank * 8 + file
+                self.bb[piece] |= 1 << sq
+                self.mailbox[sq] = piece
+                file += 1
+        self.side = WHITE if parts[1] == 'w' else BLACK
+        self.castling = 0
+        for ch, right in (('K', WK), ('Q', WQ), ('k', BK), ('q', BQ)):
+            if ch in parts[2]:
+                self.castling |= right
+        self.ep = square(parts[3]) if parts[3] != '-' else -1
+        self.halfmove = int(parts[4]) if len(parts) > 4 else 0
+        self.fullmove = int(parts[5]) if len(parts) > 5 else 1
+        self.occ = [0, 0]
+        for p in range(6):
+            self.occ[WHITE] |= self.bb[p]
+            self.occ[BLACK] |= self.bb[p + 6]
+        self.hash = self._full_hash()
+        self.history = []  # hashes of earlier positions, for repetition checks
+        self._undo = []
+
+    def _full_hash(self):
+        h = 0
+        for piece in range(12):
+            for sq in _bits(self.bb[piece]):
+                h ^= Z_PIECE[piece][sq]
+        if self.side == BLACK:
+            h ^= Z_SIDE
+        h ^= Z_CASTLE[self.castling]
+        if self.ep >= 0:
+            h ^= Z_EP[self.ep & 7]
+        return h
+
+    def fen(self):
+        rows = []
+        for rank in range(7, -1, -1):
+            row, empty = '', 0
+            for file in range(8):
+                piece = self.mailbox[rank * 8 + file]
+                if piece < 0:
+                    empty += 1
+                    continue
+                if empty:
+                    row, empty = row + str(empty), 0
+                row += PIECE_CHARS[piece]
+            rows.append(row + (str(empty) if empty else ''))
+        castling = ''.join(ch for ch, right in (('K', WK), ('Q', WQ), ('k', BK), ('q', BQ))
+                           if self.castling & right) or '-'
+        ep = square_name(self.ep) if self.ep >= 0 else '-'
+        side = 'w' if self.side == WHITE else 'b'
+        return f"{'/'.join(rows)} {side} {castling} {ep} {self.halfmove} {self.fullmove}"
+
+    # -- attacks -------------------------------------------------------------
+
+    def is_attacked(self, sq, by):
+        bb = self.bb
+        base = 6 * by
+        if PAWN_ATTACKS[by ^ 1][sq] & bb[base + PAWN]:
+            return True
+        if KNIGHT_ATTACKS[sq] & bb[base + KNIGHT]:
+            return True
+        if KING_ATTACKS[sq] & bb[base + KING]:
+            return True
+        occ = self.occ[0] | self.occ[1]
+        queens = bb[base + QUEEN]
+        if bishop_attacks(sq, occ) & (bb[base + BISHOP] | queens):
+            return True
+        if rook_attacks(sq, occ) & (bb[base + ROOK] | queens):
+            return True
+        return False
+
+    def king_square(self, side):
+        return self.bb[6 * side + KING].bit_length() - 1
+
+    def in_check(self, side=None):
+        side = self.side if side is None else side
+        return self.is_attacked(self.king_square(side), side ^ 1)
+
+    # -- move generation -----------------------------------------------------
+
+    def pseudo_legal_moves(self):
+        us = self.side
+        them = us ^ 1
+        base = 6 * us
+        bb = self.bb
+        own = self.occ[us]
+        enemy = self.occ[them]
+        occ = own | enemy
+        empty = ~occ & FULL
+        moves = []
+        append = moves.append
+
+        # pawns
+        forward = 8 if us == WHITE else -8
+        start_rank = 1 if us == WHITE else 6
+        promo_rank = 7 if us == WHITE else 0
+        for frm in _bits(bb[base + PAWN]):
+            to = frm + forward
+            if (empty >> to) & 1:
+                if to >> 3 == promo_rank:
+                    for promo in (QUEEN, ROOK, BISHOP, KNIGHT):
+                        append(encode_move(frm, to, promo))
+                else:
+                    append(encode_move(frm, to))
+                    if frm >> 3 == start_rank and (empty >> (to + forward)) & 1:
+                        append(encode_move(frm, to + forward, 0, DOUBLE_PUSH))
+            attacks = PAWN_ATTACKS[us][frm]
+            for to in _bits(attacks & enemy):
+                if to >> 3 == promo_rank:
+                    for promo in (QUEEN, ROOK, BISHOP, KNIGHT):
+                        append(encode_move(frm, to, promo))
+                else:
+                    append(encode_move(frm, to))
+            if self.ep >= 0 and (attacks >> self.ep) & 1:
+                append(encode_move(frm, self.ep, 0, EN_PASSANT))
+
+        targets = ~own & FULL
+        for frm in _bits(bb[base + KNIGHT]):
+            for to in _bits(KNIGHT_ATTACKS[frm] & targets):
+                append(encode_move(frm, to))
+        for frm in _bits(bb[base + BISHOP] | bb[base + QUEEN]):
+            for to in _bits(bishop_attacks(frm, occ) & targets):
+                append(encode_move(frm, to))
+        for frm in _bits(bb[base + ROOK] | bb[base + QUEEN]):
+            for to in _bits(rook_attacks(frm, occ) & targets):
+                append(encode_move(frm, to))
+        king = self.king_square(us)
+        for to in _bits(KING_ATTACKS[king] & targets):
+            append(encode_move(king, to))
+
+        # castling: squares between king and rook empty, king path not attacked
+        if self.castling:
+            if us == WHITE:
+                if self.castling & WK and not occ & 0x60 and not self._any_attacked((4, 5, 6), them):
+                    append(encode_move(4, 6, 0, CASTLE))
+                if self.castling & WQ and not occ & 0x0E and not self._any_attacked((4, 3, 2), them):
+                    append(encode_move(4, 2, 0, CASTLE))
+            else:
+                if self.castling & BK and not occ & (0x60 << 56) and not self._any_attacked((60, 61, 62), them):
+                    append(encode_move(60, 62, 0, CASTLE))
+                if self.castling & BQ and not occ & (0x0E << 56) and not self._any_attacked((60, 59, 58), them):
+                    append(encode_move(60, 58, 0, CASTLE))
+        return moves
+
+    def _any_attacked(self, squares, by):
+        for sq in squares:
+            if self.is_attacked(sq, by):
+                return True
+        return False
+
+    def legal_moves(self):
+        moves = []
+        us = self.side
+        for move in self.pseudo_legal_moves():
+            self.make(move)
+            if not self.in_check(us):
+                moves.append(move)
+            self.unmake()
+        return moves
+
+    def has_legal_move(self):
+        us = self.side
+        for move in self.pseudo_legal_moves():
+            self.make(move)
+            legal = not self.in_check(us)
+            self.unmake()
+            if legal:
+                return True
+        return False
+
+    # -- make / unmake -------------------------------------------------------
+
+    def _put(self, piece, sq):
+        bit = 1 << sq
+        self.bb[piece] |= bit
+        self.occ[piece // 6] |= bit
+        self.mailbox[sq] = piece
+        self.hash ^= Z_PIECE[piece][sq]
+
+    def _remove(self, piece, sq):
+        bit = ~(1 << sq)
+        self.bb[piece] &= bit
+        self.occ[piece // 6] &= bit
+        self.mailbox[sq] = -1
+        self.hash ^= Z_PIECE[piece][sq]
+
+    def make(self, move):
+        frm, to = move & 63, (move >> 6) & 63
+        promo, flag = (move >> 12) & 7, move >> 15
+        us = self.side
+        piece = self.mailbox[frm]
+        captured = self.mailbox[to]
+        self._undo.append((move, piece, captured, self.castling, self.ep, self.halfmove, self.hash))
+        self.history.append(self.hash)
+
+        if self.ep >= 0:
+            self.hash ^= Z_EP[self.ep & 7]
+        self.ep = -1
+        self.hash ^= Z_CASTLE[self.castling]
+
+        if captured >= 0:
+            self._remove(captured, to)
+        self._remove(piece, frm)
+        self._put(piece if not promo else 6 * us + promo, to)
+
+        if flag == EN_PASSANT:
+            victim_sq = to - 8 if us == WHITE else to + 8
+            self._remove(6 * (us ^ 1) + PAWN, victim_sq)
+        elif flag == DOUBLE_PUSH:
+            self.ep = (frm + to) >> 1
+            self.hash ^= Z_EP[self.ep & 7]
+        elif flag == CASTLE:
+            rook = 6 * us + ROOK
+            if to & 7 == 6:
+                self._remove(rook, to + 1)
+                self._put(rook, to - 1)
+            else:
+                self._remove(rook, to - 2)
+                self._put(rook, to + 1)
+
+        self.castling &= CASTLE_MASK[frm] & CASTLE_MASK[to]
+        self.hash ^= Z_CASTLE[self.castling]
+
+        if piece % 6 == PAWN or captured >= 0:
+            self.halfmove = 0
+        else:
+            self.halfmove += 1
+        if us == BLACK:
+            self.fullmove += 1
+        self.side = us ^ 1
+        self.hash ^= Z_SIDE
+
+    def unmake(self):
+        move, piece, captured, castling, ep, halfmove, h = self._undo.pop()
+        self.history.pop()
+        self.side ^= 1
+        us = self.side
+        if us == BLACK:
+            self.fullmove -= 1
+        frm, to = move & 63, (move >> 6) & 63
+        flag = move >> 15
+
+        self._remove(self.mailbox[to], to)
+        self._put(piece, frm)
+        if captured >= 0:
+            self._put(captured, to)
+        if flag == EN_PASSANT:
+            self._put(6 * (us ^ 1) + PAWN, to - 8 if us == WHITE else to + 8)
+        elif flag == CASTLE:
+            rook = 6 * us + ROOK
+            if to & 7 == 6:
+                self._remove(rook, to - 1)
+                self._put(rook, to + 1)
+            else:
+                self._remove(rook, to + 1)
+                self._put(rook, to - 2)
+
+        self.castling, self.ep, self.halfmove, self.hash = castling, ep, halfmove, h
+
+    # -- game state ----------------------------------------------------------
+
+    def parse_uci(self, text):
+        """Legal move matching a UCI string such as 'e2e4' or 'e7e8q', or None"""
+        if not isinstance(text, str) or len(text) not in (4, 5):
+            return None
+        try:
+            frm, to = square(text[:2]), square(text[2:4])
+        except (ValueError, IndexError):
+            return None
+        if not (0 <= frm < 64 and 0 <= to < 64):
+            return None
+        promo = 0
+        if len(text) == 5:
+            promo = PROMO_PIECES.get(text[4].lower())
+            if promo is None:
+                return None
+        if (self.occ[self.side] >> frm) & 1 == 0:
+            return None
+        us = self.side
+        for move in self.pseudo_legal_moves():
+            if move & 63 == frm and (move >> 6) & 63 == to and (move >> 12) & 7 == promo:
+                self.make(move)
+                legal = not self.in_check(us)
+                self.unmake()
+                return move if legal else None
+        return None
+
+    def repetitions(self):
+        """How many times the current position occurred (reversible window only)"""
+        count = 1
+        history = self.history
+        lower = max(0, len(history) - self.halfmove)
+        for i in range(len(history) - 2, lower - 1, -2):
+            if history[i] == self.hash:
+                count += 1
+        return count
+
+    def insufficient_material(self):
+        bb = self.bb
+        if bb[PAWN] | bb[ROOK] | bb[QUEEN] | bb[PAWN + 6] | bb[ROOK + 6] | bb[QUEEN + 6]:
+            return False
+        minors = bb[KNIGHT] | bb[BISHOP] | bb[KNIGHT + 6] | bb[BISHOP + 6]
+        return bin(minors).count('1') <= 1
+
+    def outcome(self):
+        """(winner, reason): winner is 'white' | 'black' | 'draw' | None"""
+        if not self.has_legal_move():
+            if self.in_check():
+                return ('black' if self.side == WHITE else 'white'), 'checkmate'
+            return 'draw', 'stalemate'
+        if self.halfmove >= 100:
+            return 'draw', 'fifty_move'
+        if self.repetitions() >= 3:
+            return 'draw', 'threefold'
+        if self.insufficient_material():
+            return 'draw', 'insufficient_material'
+        return None, None
+
+
+def perft(pos, depth):
+    """Leaf node count of the legal move tree, the standard movegen check"""
+    if depth == 0:
+        return 1
+    us = pos.side
+    nodes = 0
+    for move in pos.pseudo_legal_moves():
+        pos.make(move)
+        if not pos.in_check(us):
+            nodes += 1 if depth == 1 else perft(pos, depth - 1)
+        pos.unmake()
+    return nodes
+
+
+class ChessGame:
+    """Room-level wrapper: a Position plus the move list in UCI notation"""
+
+    __slots__ = ('position', 'moves')
+
+    def __init__(self, fen=START_FEN):
+        self.position = Position(fen)
+        self.moves = []
+
+    def reset(self):
+        self.position.set_fen(START_FEN)
+        self.moves = []
+
+    @property
+    def turn(self):
+        return 'white' if self.position.side == WHITE else 'black'
+
+    def play(self, uci):
+        """Apply a UCI move; returns (winner, reason) or raises ValueError if illegal"""
+        move = self.position.parse_uci(uci)
+        if move is None:
+            raise ValueError(f"illegal move {uci!r}")
+        self.position.make(move)
+        self.moves.append(move_uci(move))
+        return self.position.outcome()
+
+    def fen(self):
+        return self.position.fen()
@@ -0,0 +1,184 @@
+"""
+Database settings for the eventlet server and the single writer queue.
+
+SQLite calls are blocking C calls that run on the eventlet hub, so every
+statement a handler runs stalls every other room for its duration, and a
+commit costs an fsync.  Three things keep that short:
+
+  pragmas      WAL (readers never wait for the writer), synchronous=NORMAL
+               (no fsync per commit in WAL mode; a power loss can drop the
+               last commits, never corrupt the file), a busy timeout so
+               workers sharing the file wait for the lock instead of
+               failing, and a larger page cache
+  pool         one connection per greenlet holding a session: the pool is
+               sized for many concurrent greenlets, and a greenlet waiting
+               on an exhausted pool would block the whole hub
+  DbWriter     the one write-behind queue: handlers queue their writes
+               (room create/delete, move log entries, archived games) and
+               a background greenlet commits everything queued in one
+               transaction every WRITE_INTERVAL; the in-memory lobby
+               index, room cache and room state already serve the new
+               state meanwhile
+"""
+
+import time
+from collections import deque
+
+from sqlalchemy import event
+from sqlalchemy.exc import OperationalError
+
+WRITE_INTERVAL = 0.05  # seconds between writer flushes (0: write inline)
+MAX_BATCH = 5000  # queued writes per transaction
+POOL_SIZE = 20  # connections kept open
+POOL_OVERFLOW = 80  # extra connections under a burst of greenlets
+POOL_TIMEOUT = 5  # seconds before a checkout fails instead of waiting longer
+BUSY_TIMEOUT_MS = 5000
+CACHE_SIZE_KB = 16000
+
+SYNCHRONOUS = 'NORMAL'  # FULL: fsync on every commit, for deployments that want it
+
+
+def engine_options(uri, pool_size=POOL_SIZE, overflow=POOL_OVERFLOW):
+    """SQLALCHEMY_ENGINE_OPTIONS for `uri`; in-memory SQLite keeps its single static connection"""
+    if uri.startswith('sqlite') and (uri in ('sqlite://', 'sqlite:///') or ':memory:' in uri):
+        return {}
+    return {
+        'pool_size': pool_size,
+        'max_overflow': overflow,
+        'pool_timeout': POOL_TIMEOUT,
+        'pool_pre_ping': not uri.startswith('sqlite'),
+    }
+
+
+def sqlite_pragmas(synchronous=SYNCHRONOUS):
+    return (
+        "PRAGMA journal_mode=WAL",
+        f"PRAGMA synchronous={synchronous}",
+        f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}",
+        f"PRAGMA cache_size=-{CACHE_SIZE_KB}",
+        "PRAGMA temp_store=MEMORY",
+    )
+
+
+def apply_sqlite_pragmas(engine, synchronous=SYNCHRONOUS):
+    """Run the pragmas on every new connection of a SQLite engine"""
+    if engine.dialect.name != 'sqlite':
+        return
+    pragmas = sqlite_pragmas(synchronous)
+
+    @event.listens_for(engine, 'connect')
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for pragma in pragmas:
+            cursor.execute(pragma)
+        cursor.close()
+
+
+class DbWriter:
+    def __init__(self, engine, interval=WRITE_INTERVAL, after_commit=None):
+        self.engine = engine
+        self.interval = interval
+        self.after_commit = after_commit  # called with each committed batch [(statement, params), ...]
+        self._queue = deque()  # (statement, params or None)
+        self._batch = ()  # the entries being committed
+        self.written = 0
+        self.batches = 0
+        self.failures = 0
+        self.dropped = 0
+        self.max_pending = 0
+        self.flush_seconds = 0.0
+
+    def submit(self, statement, params=None):
+        """
+        Queue a Core statement (insert/update/delete) with its parameters;
+        interval 0 writes it now.  Consecutive entries of the same statement
+        object are written as one executemany, so callers queueing rows
+        reuse one statement (see MoveLog, GameArchive).
+        """
+        self._queue.append((statement, params))
+        self.max_pending = max(self.max_pending, len(self._queue))
+        if not self.interval:
+            self.flush()
+
+    def pending(self):
+        """Writes not committed yet, queued or being written"""
+        return len(self._queue) + len(self._batch)
+
+    def queued(self, *statements):
+        """(statement, params) of the writes of `statements` not committed yet, oldest first"""
+        return [entry for entry in (*self._batch, *self._queue) if entry[0] in statements]
+
+    def flush(self):
+        """Commit everything queued so far, MAX_BATCH writes per transaction"""
+        total = 0
+        while self._queue:
+            batch = [self._queue.popleft() for _ in range(min(MAX_BATCH, len(self._queue)))]
+            started = time.perf_counter()
+            self._batch = batch
+            try:
+                self._write(batch)
+            except OperationalError as e:
+                # locked or unavailable: keep the writes, in order, for the next flush
+                self._queue.extendleft(reversed(batch))
+                self.failures += 1
+                print(f"Database writer flush failed: {e}")
+                break
+            except Exception:
+                # one bad write must not take the batch down: retry one by one
+                self.failures += 1
+                self._write_each(batch)
+            finally:
+                self._batch = ()
+            if self.after_commit:
+                self._notify(batch)
+            self.flush_seconds += time.perf_counter() - started
+            self.batches += 1
+            self.written += len(batch)
+            total += len(batch)
+        return total
+
+    def _write(self, batch):
+        with self.engine.begin() as conn:
+            rows = []
+            for i, (statement, params) in enumerate(batch):
+                if params is None:
+                    conn.execute(statement)
+                    continue
+                rows.append(params)
+                following = batch[i + 1] if i + 1 < len(batch) else (None, None)
+                if following[0] is not statement or following[1] is None:
+                    conn.execute(statement, rows)
+                    rows = []
+
+    def _notify(self, batch):
+        # the batch is committed whatever the callback does: never retried for it
+        try:
+            self.after_commit(batch)
+        except Exception as e:
+            print(f"Database writer commit callback failed: {e}")
+
+    def _write_each(self, batch):
+        for entry in batch:
+            try:
+                self._write([entry])
+            except Exception as e:
+                self.dropped += 1
+                print(f"Database writer dropped a write: {e}")
+
+    def run(self, sleep):
+        """Background loop flushing every `interval` seconds"""
+        while True:
+            sleep(self.interval or WRITE_INTERVAL)
+            self.flush()
+
+    def stats(self):
+        return {
+            'interval': self.interval,
+            'pending': len(self._queue),
+            'max_pending': self.max_pending,
+            'written': self.written,
+            'batches': self.batches,
+            'failures': self.failures,
+            'dropped': self.dropped,
+            'flush_ms_avg': self.flush_seconds / (self.batches or 1) * 1000,
+        }
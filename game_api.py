@@ -0,0 +1,244 @@
+"""
+HTTP game API for the serverless deployment (api/), which has no Socket.IO.
+
+    POST /api/game/<room_id>/join    take a free seat (X, then O)
+    POST /api/game/<room_id>/move    {"index": 0-8, "version": <seen>}
+    POST /api/game/<room_id>/reset   new game once the current one is over
+    GET  /api/game/<room_id>/state   ?wait=<seconds>
+
+Every change bumps the room's version, which is the (weak) ETag of the
+state.  A client polls with If-None-Match: an unchanged room answers 304
+after reading the version column alone, and with ?wait=N the request is
+held, re-reading only the version every POLL_STEP, until the room changes
+or N seconds (at most LONG_POLL_MAX, under the platform's function
+timeout) have passed.
+
+State lives in one row per room (version, JSON state) in GAME_STATE_URL,
+any SQLAlchemy URL, so it outlives the function instance serving a
+request.  The /tmp SQLite default only lasts as long as a warm instance:
+point GAME_STATE_URL (or DATABASE_URL) at a shared database in production.
+Writes are compare-and-set on the version, so two instances taking a
+move for the same room at once cannot both win.
+"""
+
+import json
+import os
+import time
+
+from flask import Blueprint, current_app, jsonify, request, session
+
+from tictactoe import TicTacToe
+
+POLL_STEP = 0.25  # seconds between version reads of a held request
+LONG_POLL_MAX = 8.0  # seconds a request may be held (Vercel functions stop at 10)
+CAS_RETRIES = 5  # compare-and-set attempts before a write gives up with 409
+DEFAULT_STATE_URL = 'sqlite:////tmp/game_state.db'
+MARKS = ('X', 'O')
+
+game_api = Blueprint('game_api', __name__, url_prefix='/api/game')
+
+
+class GameError(Exception):
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+def new_state():
+    return {'board': [''] * 9, 'turn': 'X', 'opener': 'X', 'winner': None,
+            'players': {'X': None, 'O': None}}
+
+
+class GameStateStore:
+    """(version, state) per room in a SQL table, created on first use"""
+
+    def __init__(self, url):
+        self.url = url
+        self._engine = None
+        self._table = None
+
+    def _bind(self):
+        if self._engine is None:
+            # imported here: routes that never touch a game do not pay for SQLAlchemy
+            from sqlalchemy import Column, Integer, MetaData, String, Table, Text, create_engine
+
+            metadata = MetaData()
+            self._table = Table('game_state', metadata,
+                                Column('room_id', String(64), primary_key=True),
+                                Column('version', Integer, nullable=False),
+                                Column('state', Text, nullable=False))
+            engine = create_engine(self.url)
+            metadata.create_all(engine)
+            self._engine = engine
+        return self._engine, self._table
+
+    def version(self, room_id):
+        """Version of a room, or None: the only column a poll reads"""
+        engine, table = self._bind()
+        with engine.connect() as conn:
+            return conn.execute(table.select().with_only_columns(table.c.version)
+                                .where(table.c.room_id == room_id)).scalar()
+
+    def load(self, room_id):
+        """(version, state) of a room, or (None, None)"""
+        engine, table = self._bind()
+        with engine.connect() as conn:
+            row = conn.execute(table.select().where(table.c.room_id == room_id)).first()
+        return (row.version, json.loads(row.state)) if row else (None, None)
+
+    def save(self, room_id, version, state):
+        """Write `state` as version + 1 if the room is still at `version` (None: a new room)"""
+        from sqlalchemy.exc import IntegrityError
+
+        engine, table = self._bind()
+        data = json.dumps(state, separators=(',', ':'))
+        with engine.begin() as conn:
+            if version is None:
+                try:
+                    conn.execute(table.insert().values(room_id=room_id, version=1, state=data))
+                except IntegrityError:
+                    return False
+                return True
+            result = conn.execute(table.update()
+                                  .where(table.c.room_id == room_id, table.c.version == version)
+                                  .values(version=version + 1, state=data))
+            return result.rowcount == 1
+
+    def change(self, room_id, apply):
+        """
+        Run apply(state) (GameError to refuse, False for nothing to change)
+        and store it; (version, state) after
+        """
+        for _ in range(CAS_RETRIES):
+            version, state = self.load(room_id)
+            state = state or new_state()
+            if apply(state) is False and version is not None:
+                return version, state
+            if self.save(room_id, version, state):
+                return (version or 0) + 1, state
+        raise GameError('Room is busy, try again', 409)
+
+
+def init_game_api(app, room_exists=None, sleep=time.sleep):
+    """Register the API on `app`; room_exists(room_id) rejects unknown rooms when given"""
+    url = os.environ.get('GAME_STATE_URL') or os.environ.get('DATABASE_URL') or DEFAULT_STATE_URL
+    app.extensions['game_api'] = {
+        'store': GameStateStore(url),
+        'room_exists': room_exists,
+        'sleep': sleep,
+    }
+    app.register_blueprint(game_api)
+
+
+def _config():
+    return current_app.extensions['game_api']
+
+
+def _payload(room_id, version, state):
+    mark = next((m for m in MARKS if state['players'][m] == session['username']), None)
+    return dict(state, room_id=room_id, version=version, you=mark)
+
+
+def _state_response(room_id, version, state):
+    response = jsonify(_payload(room_id, version, state))
+    response.set_etag(f"game-{version}", weak=True)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
+
+
+@game_api.before_request
+def _require_room():
+    if 'username' not in session:
+        return jsonify({'error': 'Not authenticated'}), 401
+    room_exists = _config()['room_exists']
+    room_id = (request.view_args or {}).get('room_id')
+    if room_exists is not None and room_id and not room_exists(room_id):
+        return jsonify({'error': 'Room not found'}), 404
+
+
+@game_api.errorhandler(GameError)
+def _game_error(e):
+    return jsonify({'error': str(e)}), e.status
+
+
+@game_api.route('/<room_id>/state')
+def game_state(room_id):
+    store, sleep = _config()['store'], _config()['sleep']
+    try:
+        wait = min(max(float(request.args.get('wait', 0)), 0.0), LONG_POLL_MAX)
+    except ValueError:
+        return jsonify({'error': 'invalid wait'}), 400
+    deadline = time.monotonic() + wait
+    version = store.version(room_id) or 0
+    while request.if_none_match.contains_weak(f"game-{version}"):
+        if time.monotonic() >= deadline:
+            response = current_app.response_class(status=304)
+            response.set_etag(f"game-{version}", weak=True)
+            return response
+        sleep(POLL_STEP)
+        version = store.version(room_id) or 0
+    version, state = store.load(room_id)
+    return _state_response(room_id, version or 0, state or new_state())
+
+
+@game_api.route('/<room_id>/join', methods=['POST'])
+def join(room_id):
+    username = session['username']
+
+    def take_seat(state):
+        players = state['players']
+        if username in players.values():
+            return False
+        free = next((m for m in MARKS if players[m] is None), None)
+        if free is None:
+            raise GameError('Room is full', 409)
+        players[free] = username
+
+    return _state_response(room_id, *_config()['store'].change(room_id, take_seat))
+
+
+@game_api.route('/<room_id>/move', methods=['POST'])
+def move(room_id):
+    data = request.get_json(silent=True) or {}
+    index, seen = data.get('index'), data.get('version')
+    username = session['username']
+    if not isinstance(index, int) or not 0 <= index < 9:
+        return jsonify({'error': 'index must be 0..8'}), 400
+
+    def play(state):
+        mark = next((m for m in MARKS if state['players'][m] == username), None)
+        if mark is None:
+            raise GameError('You are not seated in this room', 403)
+        if state['winner']:
+            raise GameError('Game is over')
+        if state['turn'] != mark:
+            raise GameError('Not your turn', 409)
+        if state['board'][index]:
+            raise GameError('Cell already taken', 409)
+        game = TicTacToe.from_cells(state['board'])
+        state['winner'] = game.play(index, mark)
+        state['board'] = game.to_list()
+        if not state['winner']:
+            state['turn'] = 'O' if mark == 'X' else 'X'
+
+    if seen is not None and seen != _config()['store'].version(room_id):
+        return jsonify({'error': 'State changed, reload it', 'stale': True}), 409
+    return _state_response(room_id, *_config()['store'].change(room_id, play))
+
+
+@game_api.route('/<room_id>/reset', methods=['POST'])
+def reset(room_id):
+    username = session['username']
+
+    def restart(state):
+        if username not in state['players'].values():
+            raise GameError('You are not seated in this room', 403)
+        if not state['winner']:
+            raise GameError('Game is still running')
+        # the side that did not open this game opens the next one
+        opener = 'O' if state['opener'] == 'X' else 'X'
+        players = state['players']
+        state.clear()
+        state.update(new_state(), players=players, turn=opener, opener=opener)
+
+    return _state_response(room_id, *_config()['store'].change(room_id, restart))
@@ -0,0 +1,121 @@
+"""
+Compact binary game records and their write-behind archive.
+
+A record is a 2-byte header followed by the moves, each one varint:
+
+    byte 0   format version
+    byte 1   bits 0-1 mode (pvp, bot, chess), bit 2 set if the second mark
+             opened, bits 3-4 result (unfinished, first mark won, second
+             mark won, draw)
+    moves    TicTacToe: the cell index (one byte up to 127 cells);
+             chess: the engine's move encoding without the flag bits,
+             from | to << 6 | promotion << 12 (chess_engine.encode_move)
+             (two bytes, three for a promotion)
+
+Marks alternate, so a move needs no mark.  A 3x3 game is 2 + at most 9
+bytes.  Room state keeps the packed moves of the game in progress
+(RoomState.packed); GameArchive queues finished games (and unfinished ones
+whose room goes away) on the database writer, like MoveLog.  iter_moves() decodes any byte range of the
+moves, so a replay can read a record chunk by chunk.
+"""
+
+import time
+
+from chess_engine import PROMO_PIECES, encode_move, move_uci, square
+from room_state import marks_for
+
+VERSION = 1
+HEADER_SIZE = 2
+MODES = ('pvp', 'bot', 'chess')
+
+_RESULT_CODES = {None: 0, 'draw': 3}
+
+
+def _varint(value):
+    out = bytearray()
+    while value >= 0x80:
+        out.append(value & 0x7f | 0x80)
+        value >>= 7
+    out.append(value)
+    return bytes(out)
+
+
+def pack_move(mode, move):
+    """One move as record bytes: a cell index, or a UCI move for chess"""
+    if mode != 'chess':
+        return _varint(move)
+    return _varint(encode_move(square(move[:2]), square(move[2:4]), PROMO_PIECES.get(move[4:5], 0)))
+
+
+def iter_moves(mode, data):
+    """(bytes consumed so far, move) for every complete move in `data`"""
+    value = shift = 0
+    for position, byte in enumerate(data):
+        value |= (byte & 0x7f) << shift
+        if byte & 0x80:
+            shift += 7
+            continue
+        if mode == 'chess':
+            value = move_uci(value)
+        yield position + 1, value
+        value = shift = 0
+
+
+def encode(mode, opener, result, packed):
+    """Header + packed moves; opener is the mark that moved first, result None/mark/'draw'"""
+    first, second = marks_for(mode)
+    code = _RESULT_CODES.get(result, 1 if result == first else 2)
+    return bytes((VERSION, MODES.index(mode) | (opener == second) << 2 | code << 3)) + packed
+
+
+def decode_header(header):
+    """(mode, opener, result) from the first HEADER_SIZE bytes of a record"""
+    if len(header) < HEADER_SIZE or header[0] != VERSION:
+        raise ValueError("unknown game record format")
+    mode = MODES[header[1] & 3]
+    first, second = marks_for(mode)
+    opener = second if header[1] & 4 else first
+    result = (None, first, second, 'draw')[header[1] >> 3 & 3]
+    return mode, opener, result
+
+
+class GameArchive:
+    def __init__(self, writer, table, clock=time.time):
+        self.writer = writer
+        self.table = table
+        self.clock = clock
+        self._insert = table.insert()  # one statement object, batched by the writer
+        self.archived = 0
+        self.bytes_archived = 0
+
+    def append(self, room_id, mode, players, opener, result, packed):
+        """Queue one game; players are the usernames on the (first, second) marks"""
+        row = {
+            'room_id': room_id,
+            'first_player': players[0],
+            'second_player': players[1],
+            'plies': sum(1 for _ in iter_moves(mode, packed)),
+            'record': encode(mode, opener, result, packed),
+            'ended_at': int(self.clock()),
+        }
+        self.writer.submit(self._insert, row)
+        self.archived += 1
+        self.bytes_archived += len(row['record'])
+
+    def pending(self):
+        return len(self.writer.queued(self._insert))
+
+    def queued(self, room_id):
+        """Rows of a room's games still queued on the writer, oldest first"""
+        return [row for _, row in self.writer.queued(self._insert) if row['room_id'] == room_id]
+
+    def flush(self):
+        """Commit everything queued on the writer"""
+        return self.writer.flush()
+
+    def stats(self):
+        return {
+            'pending': self.pending(),
+            'archived': self.archived,
+            'record_bytes_avg': self.bytes_archived / (self.archived or 1),
+        }
@@ -0,0 +1,81 @@
+"""
+Lobby feed for dashboard clients.
+
+Dashboards join the LOBBY_ROOM socket room; game pages never do, so they
+get no lobby traffic.  Room and user changes are not emitted one by one:
+they are coalesced here and flushed as a single 'lobby_diff' every
+FLUSH_INTERVAL, where the latest player count per room wins and a room
+created and dissolved within the same window is never sent at all.
+
+    {'created': [entry, ...], 'updated': {room_id: players},
+     'dissolved': [room_id, ...], 'online': [...], 'offline': [...]}
+"""
+
+LOBBY_ROOM = 'lobby'
+FLUSH_INTERVAL = 0.25  # seconds between lobby_diff broadcasts
+
+
+class LobbyFeed:
+    def __init__(self):
+        self._created = {}  # room_id -> lobby entry
+        self._updated = {}  # room_id -> player count
+        self._dissolved = set()
+        self._presence = {}  # username -> True (online) / False (offline)
+        self.events = 0
+        self.flushes = 0
+
+    def room_created(self, entry):
+        self.events += 1
+        self._dissolved.discard(entry['id'])
+        self._updated.pop(entry['id'], None)
+        self._created[entry['id']] = dict(entry)
+
+    def room_updated(self, room_id, players):
+        self.events += 1
+        if room_id in self._created:
+            self._created[room_id]['players'] = players
+        else:
+            self._updated[room_id] = players
+
+    def room_dissolved(self, room_id):
+        self.events += 1
+        self._updated.pop(room_id, None)
+        if self._created.pop(room_id, None) is None:
+            self._dissolved.add(room_id)
+
+    def user_connected(self, username):
+        self.events += 1
+        self._presence[username] = True
+
+    def user_disconnected(self, username):
+        self.events += 1
+        self._presence[username] = False
+
+    def pending(self):
+        return bool(self._created or self._updated or self._dissolved or self._presence)
+
+    def take(self):
+        """The coalesced diff since the last call, or None if nothing changed"""
+        if not self.pending():
+            return None
+        diff = {
+            'created': list(self._created.values()),
+            'updated': self._updated,
+            'dissolved': list(self._dissolved),
+            'online': [u for u, online in self._presence.items() if online],
+            'offline': [u for u, online in self._presence.items() if not online],
+        }
+        self._created, self._updated, self._dissolved, self._presence = {}, {}, set(), {}
+        self.flushes += 1
+        return diff
+
+    def run(self, emit, sleep, interval=FLUSH_INTERVAL):
+        """Background loop: emit(diff) for every non-empty window"""
+        while True:
+            sleep(interval)
+            diff = self.take()
+            if diff is not None:
+                try:
+                    emit(diff)
+                except Exception as e:
+                    print(f"Lobby flush failed: {e}")
@@ -0,0 +1,183 @@
+"""
+Rating-based matchmaking queue and Elo updates.
+
+Players wait in buckets of BUCKET_WIDTH rating points: a dict per bucket,
+in enqueue order, so the oldest player of a bucket (the one with the
+widest window) is its first entry, and a list of the bucket's ratings kept
+sorted with bisect.  A partner is searched bucket by bucket outwards from
+the player's own, only as far as the search window reaches, in the
+nearest bucket that has one in reach: its oldest player when the whole
+bucket is in reach, otherwise (a bucket at the edge of the window) its
+oldest player if in reach, else its player nearest in rating.  Each bucket
+is an O(1) or O(log n) look, never a scan, so a match costs about
+O(window / BUCKET_WIDTH * log n) however crowded the buckets are.
+
+The window starts at BASE_WINDOW rating points and widens by WIDEN_RATE
+per second waited, up to MAX_WINDOW; two players are paired when their
+ratings differ by no more than the wider of their two windows.  enqueue()
+pairs the newcomer right away when it can; sweep(), run every
+MATCH_INTERVAL, retries the oldest player of every bucket as the windows
+grow.  The queue lives in one worker (the players' sockets are there).
+"""
+
+import time
+from bisect import bisect_left, insort
+from collections import namedtuple
+
+DEFAULT_RATING = 1200
+K_FACTOR = 32
+
+BUCKET_WIDTH = 25  # rating points per bucket
+BASE_WINDOW = 50  # rating points either way, on enqueue
+WIDEN_RATE = 25  # rating points added to the window per second waited
+MAX_WINDOW = 400
+MATCH_INTERVAL = 1.0  # seconds between sweeps
+MATCH_BATCH = 100  # pairs started per sweep at most, so one sweep never stalls the hub
+
+Ticket = namedtuple('Ticket', 'username rating since data')
+
+
+def expected_score(rating, opponent):
+    return 1 / (1 + 10 ** ((opponent - rating) / 400))
+
+
+def elo_update(rating_a, rating_b, score_a, k=K_FACTOR):
+    """New (rating_a, rating_b) after a game; score_a is 1 (a won), 0.5 (draw) or 0"""
+    change = k * (score_a - expected_score(rating_a, rating_b))
+    return round(rating_a + change), round(rating_b - change)
+
+
+class MatchQueue:
+    def __init__(self, base_window=BASE_WINDOW, widen_rate=WIDEN_RATE, max_window=MAX_WINDOW,
+                 bucket_width=BUCKET_WIDTH, clock=time.monotonic):
+        self.base_window = base_window
+        self.widen_rate = widen_rate
+        self.max_window = max_window
+        self.bucket_width = bucket_width
+        self.clock = clock
+        self._buckets = {}  # rating // bucket_width -> {username: Ticket}, oldest first
+        self._ratings = {}  # rating // bucket_width -> [(rating, username), ...], sorted
+        self._tickets = {}  # username -> Ticket
+        self.matched = 0
+        self.wait_seconds = 0.0
+        self.rating_gap = 0
+
+    def __len__(self):
+        return len(self._tickets)
+
+    def __contains__(self, username):
+        return username in self._tickets
+
+    def get(self, username):
+        return self._tickets.get(username)
+
+    def window(self, ticket, now):
+        return min(self.max_window, self.base_window + self.widen_rate * (now - ticket.since))
+
+    def add(self, username, rating, data=None):
+        """Queue a player without looking for a partner; re-adding moves them to the back"""
+        self.cancel(username)
+        ticket = Ticket(username, rating, self.clock(), data)
+        self._tickets[username] = ticket
+        key = rating // self.bucket_width
+        self._buckets.setdefault(key, {})[username] = ticket
+        insort(self._ratings.setdefault(key, []), (rating, username))
+        return ticket
+
+    def enqueue(self, username, rating, data=None):
+        """Queue a player; returns (waiting ticket, new ticket) if a partner is there already"""
+        ticket = self.add(username, rating, data)
+        partner = self._partner(ticket, ticket.since)
+        return self._pair(partner, ticket) if partner else None
+
+    def cancel(self, username):
+        ticket = self._tickets.pop(username, None)
+        if ticket is None:
+            return None
+        key = ticket.rating // self.bucket_width
+        bucket, ratings = self._buckets[key], self._ratings[key]
+        del bucket[username]
+        del ratings[bisect_left(ratings, (ticket.rating, username))]
+        if not bucket:
+            del self._buckets[key]
+            del self._ratings[key]
+        return ticket
+
+    def sweep(self, limit=MATCH_BATCH):
+        """Pairs the widened windows allow now, oldest player of each bucket first"""
+        now = self.clock()
+        pairs = []
+        for key in sorted(self._buckets):
+            while len(pairs) < limit:
+                bucket = self._buckets.get(key)
+                if not bucket:
+                    break
+                ticket = next(iter(bucket.values()))
+                partner = self._partner(ticket, now)
+                if partner is None:
+                    break
+                pairs.append(self._pair(ticket, partner))
+        return pairs
+
+    def _partner(self, ticket, now):
+        """A player within reach in the nearest bucket that has one (see the module docstring), or None"""
+        window = self.window(ticket, now)
+        home = ticket.rating // self.bucket_width
+        for distance in range(int(window // self.bucket_width) + 2):
+            for key in ((home,) if distance == 0 else (home - distance, home + distance)):
+                if key in self._buckets:
+                    other = self._partner_in(key, ticket, window, now)
+                    if other is not None:
+                        return other
+        return None
+
+    def _partner_in(self, key, ticket, window, now):
+        bucket = self._buckets[key]
+        oldest = next((other for other in bucket.values() if other.username != ticket.username), None)
+        if oldest is None:
+            return None
+        lowest, highest = key * self.bucket_width, (key + 1) * self.bucket_width - 1
+        if ticket.rating - window <= lowest and highest <= ticket.rating + window:
+            return oldest
+        if self._in_reach(ticket, oldest, window, now):
+            return oldest
+        # the players nearest in rating on either side of the ticket
+        ratings = self._ratings[key]
+        i = bisect_left(ratings, (ticket.rating, ticket.username))
+        for rating, username in ratings[max(0, i - 1):i + 2]:
+            other = bucket[username]
+            if username != ticket.username and self._in_reach(ticket, other, window, now):
+                return other
+        return None
+
+    def _in_reach(self, ticket, other, window, now):
+        return abs(other.rating - ticket.rating) <= max(window, self.window(other, now))
+
+    def _pair(self, first, second):
+        self.cancel(first.username)
+        self.cancel(second.username)
+        now = self.clock()
+        self.matched += 1
+        self.wait_seconds += (now - first.since) + (now - second.since)
+        self.rating_gap += abs(first.rating - second.rating)
+        return first, second
+
+    def stats(self):
+        matched = self.matched or 1
+        return {
+            'queued': len(self._tickets),
+            'buckets': len(self._buckets),
+            'matched': self.matched,
+            'wait_s_avg': self.wait_seconds / (2 * matched),
+            'rating_gap_avg': self.rating_gap / matched,
+        }
+
+    def run(self, on_match, sleep, interval=MATCH_INTERVAL):
+        """Background loop: sweep and hand every pair to on_match(first, second)"""
+        while True:
+            sleep(interval)
+            try:
+                for first, second in self.sweep():
+                    on_match(first, second)
+            except Exception as e:
+                print(f"Matchmaking sweep failed: {e}")
@@ -0,0 +1,276 @@
+"""
+Prometheus-style metrics, rendered in the text exposition format on /metrics.
+
+Metrics is a small registry (no prometheus_client dependency): counters and
+histograms updated in place, plus gauges and distributions read from a
+callback at scrape time.  Instrumentation hooks it into the server:
+
+  - every @socketio.on handler and Flask route: a latency histogram and an
+    error counter per event name / endpoint
+  - every emit: a counter per event and the number of sockets it reached
+  - every SQL statement: counted against the handler that ran it, observed
+    as queries per request
+
+An update is a dict lookup and a bisect, so it stays on in production.
+"""
+
+import functools
+import inspect
+import time
+from bisect import bisect_left
+
+from flask import g, has_app_context, has_request_context, request
+from sqlalchemy import event
+
+# seconds
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+QUERY_BUCKETS = (0, 1, 2, 4, 8, 16, 32, 64)
+ROOM_SIZE_BUCKETS = (1, 2, 3, 5, 10, 100, 1000)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def _escape(value):
+    return str(value).replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n')
+
+
+def _labels(names, values, extra=''):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _number(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    kind = 'counter'
+
+    def __init__(self, name, help, labels=()):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.values = {}  # label values tuple -> count
+
+    def inc(self, labels=(), amount=1):
+        self.values[labels] = self.values.get(labels, 0) + amount
+
+    def samples(self):
+        for values, count in self.values.items():
+            yield self.name + _labels(self.labels, values), count
+
+
+class Histogram:
+    kind = 'histogram'
+
+    def __init__(self, name, help, labels=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = tuple(buckets)
+        self.values = {}  # label values tuple -> [count per bucket (last is +Inf), sum]
+
+    def observe(self, value, labels=()):
+        series = self.values.get(labels)
+        if series is None:
+            series = self.values[labels] = [[0] * (len(self.buckets) + 1), 0]
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += value
+
+    def samples(self):
+        for values, (counts, total) in self.values.items():
+            yield from _histogram_samples(self.name, self.labels, values, self.buckets, counts, total)
+
+
+def _histogram_samples(name, names, values, buckets, counts, total):
+    running = 0
+    for bound, count in zip(buckets + (float('inf'),), counts):
+        running += count
+        yield name + '_bucket' + _labels(names, values, f'le="{_number(bound)}"'), running
+    yield name + '_sum' + _labels(names, values), total
+    yield name + '_count' + _labels(names, values), running
+
+
+class Gauge:
+    kind = 'gauge'
+
+    def __init__(self, name, help, read, labels=()):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.read = read  # () -> number, or {label values tuple: number} when labelled
+
+    def samples(self):
+        value = self.read()
+        if not self.labels:
+            yield self.name, value
+            return
+        for values, number in value.items():
+            yield self.name + _labels(self.labels, values), number
+
+
+class Distribution:
+    """Histogram of values collected at scrape time, e.g. sockets per room"""
+    kind = 'histogram'
+
+    def __init__(self, name, help, read, buckets):
+        self.name = name
+        self.help = help
+        self.read = read  # () -> iterable of numbers
+        self.buckets = tuple(buckets)
+
+    def samples(self):
+        counts = [0] * (len(self.buckets) + 1)
+        total = 0
+        for value in self.read():
+            counts[bisect_left(self.buckets, value)] += 1
+            total += value
+        yield from _histogram_samples(self.name, (), (), self.buckets, counts, total)
+
+
+class Metrics:
+    def __init__(self):
+        self._metrics = []
+
+    def _add(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name, help, labels=()):
+        return self._add(Counter(name, help, labels))
+
+    def histogram(self, name, help, labels=(), buckets=LATENCY_BUCKETS):
+        return self._add(Histogram(name, help, labels, buckets))
+
+    def gauge(self, name, help, read, labels=()):
+        return self._add(Gauge(name, help, read, labels))
+
+    def distribution(self, name, help, read, buckets):
+        return self._add(Distribution(name, help, read, buckets))
+
+    def render(self):
+        lines = []
+        for metric in self._metrics:
+            try:
+                samples = list(metric.samples())
+            except Exception as e:
+                # one broken gauge must not take the whole scrape down
+                print(f"Metric {metric.name} failed: {e}")
+                continue
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(f"{name} {_number(value)}" for name, value in samples)
+        return '\n'.join(lines) + '\n'
+
+
+class Instrumentation:
+    def __init__(self, metrics, clock=time.perf_counter):
+        self.clock = clock
+        self.handler_seconds = metrics.histogram(
+            'chess_handler_seconds', 'Socket.IO handler and HTTP route latency',
+            ('kind', 'name'))
+        self.handler_errors = metrics.counter(
+            'chess_handler_errors_total', 'Handlers that raised', ('kind', 'name'))
+        self.emits = metrics.counter(
+            'chess_emits_total', 'Socket.IO events emitted', ('event',))
+        self.emit_recipients = metrics.counter(
+            'chess_emit_recipients_total', 'Sockets reached by emits (this worker)', ('event',))
+        self.db_queries = metrics.histogram(
+            'chess_db_queries_per_request', 'SQL statements per handler call',
+            ('kind', 'name'), QUERY_BUCKETS)
+        self.background_queries = metrics.counter(
+            'chess_db_background_queries_total', 'SQL statements outside any handler')
+
+    def _queries(self):
+        return g.get('db_queries', 0) if has_app_context() else 0
+
+    def _observe(self, labels, started, queries, error):
+        self.handler_seconds.observe(self.clock() - started, labels)
+        self.db_queries.observe(self._queries() - queries, labels)
+        if error:
+            self.handler_errors.inc(labels)
+
+    def timed(self, kind, name, handler):
+        """`handler` wrapped to record its latency, errors and queries"""
+        labels = (kind, name)
+
+        def call(*args):
+            started = self.clock()
+            queries = self._queries()
+            error = True
+            try:
+                result = handler(*args)
+                error = False
+                return result
+            finally:
+                self._observe(labels, started, queries, error)
+
+        if inspect.signature(handler).parameters:
+            return functools.wraps(handler)(call)
+
+        # Flask-SocketIO retries connect without arguments on TypeError,
+        # so a handler taking none must get a wrapper taking none
+        @functools.wraps(handler)
+        def call_bare():
+            return call()
+        return call_bare
+
+    def instrument_socketio(self, socketio):
+        """Time every handler registered with socketio.on() from now on and count emits"""
+        on = socketio.on
+        emit = socketio.emit
+
+        def instrumented_on(message, namespace=None):
+            register = on(message, namespace)
+
+            def decorator(handler):
+                register(self.timed('socket', message, handler))
+                return handler
+            return decorator
+
+        def instrumented_emit(event, *args, **kwargs):
+            self.emits.inc((event,))
+            self.emit_recipients.inc((event,), self._recipients(socketio, kwargs))
+            return emit(event, *args, **kwargs)
+
+        socketio.on = instrumented_on
+        socketio.emit = instrumented_emit
+
+    def _recipients(self, socketio, kwargs):
+        namespace = kwargs.get('namespace') or '/'
+        to = kwargs.get('to') or kwargs.get('room')
+        skip = kwargs.get('skip_sid')
+        if not kwargs.get('include_self', True) and not skip and has_request_context():
+            skip = getattr(request, 'sid', None)
+        rooms = socketio.server.manager.rooms.get(namespace, {})
+        count = len(rooms.get(to, ()))  # to=None is everyone on the namespace
+        if skip:
+            count -= len(skip) if isinstance(skip, list) else 1
+        return max(count, 0)
+
+    def instrument_flask(self, app):
+        """Time every Flask route by endpoint"""
+        @app.before_request
+        def start_timer():
+            g.metrics_started = self.clock()
+            g.metrics_queries = self._queries()
+
+        @app.teardown_request
+        def stop_timer(exc=None):
+            started = g.pop('metrics_started', None)
+            if started is not None:
+                labels = ('http', request.endpoint or 'unmatched')
+                self._observe(labels, started, g.pop('metrics_queries', 0), exc is not None)
+
+    def instrument_engine(self, engine):
+        """Count SQL statements against the app context (handler) running them"""
+        @event.listens_for(engine, 'before_cursor_execute')
+        def count_query(*args):
+            if has_app_context():
+                g.db_queries = g.get('db_queries', 0) + 1
+            else:
+                self.background_queries.inc()
@@ -0,0 +1,81 @@
+"""
+Durable per-room move log with write-behind persistence.
+
+Handlers call append(), which only queues the entry on the database
+writer (db_writer.DbWriter), committed with every other queued write on
+its next pass, so a move never waits for a commit.  replay()
+returns a room's entries in order so its state can be rebuilt after a
+restart.  When a new game starts the room's log is compacted to a
+checkpoint, so replay only covers the current game.
+
+Entries are (kind, mark, value):
+    seat        a player took `mark`; value is the username
+    move        `mark` played value (a TicTacToe cell index or a UCI chess move)
+    reset       rematch started (logs written before checkpoints)
+    checkpoint  a new game started with `mark` to move; value is the room's
+                update sequence number
+"""
+
+from datetime import datetime
+
+from sqlalchemy import bindparam, select
+
+
+class MoveLog:
+    def __init__(self, writer, table):
+        self.writer = writer
+        self.table = table
+        # one statement object each, so the writer batches consecutive entries
+        self._insert = table.insert()
+        self._delete = table.delete().where(table.c.room_id == bindparam('room'))
+
+    def append(self, room_id, kind, mark=None, value=None):
+        self.writer.submit(self._insert, {
+            'room_id': room_id,
+            'kind': kind,
+            'mark': mark,
+            'value': None if value is None else str(value),
+            'created_at': datetime.utcnow(),
+        })
+
+    def discard(self, room_id):
+        """Drop a room's log (queued, so it lands after the room's last moves)"""
+        self.writer.submit(self._delete, {'room': room_id})
+
+    def compact(self, room_id, entries):
+        """Replace a room's log with `entries` [(kind, mark, value), ...], queued after its earlier ones"""
+        self.discard(room_id)
+        for kind, mark, value in entries:
+            self.append(room_id, kind, mark, value)
+
+    def pending(self):
+        return len(self.writer.queued(self._insert, self._delete))
+
+    def flush(self):
+        """Commit everything queued on the writer"""
+        return self.writer.flush()
+
+    def replay(self, room_id):
+        """
+        [(kind, mark, value), ...] for `room_id`, oldest first: its committed
+        rows, then its writes still queued on the writer, read from memory so
+        a rehydration never waits for a commit
+        """
+        table = self.table
+        while True:
+            written = self.writer.written
+            queued = self.writer.queued(self._insert, self._delete)
+            with self.writer.engine.connect() as conn:
+                rows = conn.execute(select(table.c.kind, table.c.mark, table.c.value)
+                                    .where(table.c.room_id == room_id)
+                                    .order_by(table.c.id)).all()
+            if self.writer.written == written:  # no pass committed part of `queued` meanwhile
+                break
+        entries = [tuple(row) for row in rows]
+        for statement, params in queued:
+            if statement is self._delete:
+                if params['room'] == room_id:
+                    entries = []
+            elif params['room_id'] == room_id:
+                entries.append((params['kind'], params['mark'], params['value']))
+        return entries
@@ -0,0 +1,136 @@
+"""
+Read-only position database, memory-mapped and shared by every worker.
+
+Precomputed bot answers (the solved 3x3 table, opening books for larger
+boards) are written once by the builder below into a flat file that each
+worker process maps with mmap: opening it costs a header read, and the
+pages are the OS page cache, one copy however many workers map it.
+
+Layout, little-endian:
+
+    header   magic b'CSPOSDB\\0', version u32, entries u32, slots u32
+    slots    `slots` records of (key u64, value u16), open addressing with
+             linear probing from key % slots; key 0 marks an empty slot
+
+Keys are 64-bit hashes of a position (position_key), values are the move
+to play there.  Build with:
+
+    python position_db.py positions.bin [--book SIZE:K:PLIES ...]
+"""
+
+import argparse
+import hashlib
+import mmap
+import os
+import struct
+import sys
+import time
+
+MAGIC = b'CSPOSDB\0'
+VERSION = 1
+HEADER = struct.Struct('<8sIII')
+SLOT = struct.Struct('<QH')
+LOAD_FACTOR = 0.5  # at most half the slots used: probes stay short
+
+
+def position_key(size, k, mine, theirs):
+    """Non-zero 64-bit key of a TicTacToe position, side to move owns `mine`"""
+    digest = hashlib.blake2b(f"{size}:{k}:{mine}:{theirs}".encode(), digest_size=8).digest()
+    return int.from_bytes(digest, 'little') or 1
+
+
+def write(path, entries):
+    """Write {key: value} to `path`, atomically replacing any previous file"""
+    slots = 1
+    while slots * LOAD_FACTOR < max(len(entries), 1):
+        slots *= 2
+    table = bytearray(HEADER.size + slots * SLOT.size)
+    HEADER.pack_into(table, 0, MAGIC, VERSION, len(entries), slots)
+    occupied = bytearray(slots)
+    for key, value in entries.items():
+        slot = key % slots
+        while occupied[slot]:
+            slot = (slot + 1) % slots
+        occupied[slot] = 1
+        SLOT.pack_into(table, HEADER.size + slot * SLOT.size, key, value)
+    tmp = f"{path}.tmp"
+    with open(tmp, 'wb') as f:
+        f.write(table)
+    os.replace(tmp, path)  # workers holding the old map keep reading the old file
+    return len(table)
+
+
+class PositionDB:
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._map) < HEADER.size:
+            self._map.close()
+            raise ValueError(f"{path}: not a position database")
+        magic, version, self.entries, self.slots = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version != VERSION or \
+                len(self._map) != HEADER.size + self.slots * SLOT.size:
+            self._map.close()
+            raise ValueError(f"{path}: not a version {VERSION} position database, or truncated")
+        self.lookups = 0
+        self.hits = 0
+
+    def __len__(self):
+        return self.entries
+
+    def get(self, key):
+        """Value stored for `key`, or None"""
+        self.lookups += 1
+        slot = key % self.slots
+        while True:
+            found, value = SLOT.unpack_from(self._map, HEADER.size + slot * SLOT.size)
+            if found == key:
+                self.hits += 1
+                return value
+            if found == 0:
+                return None
+            slot = (slot + 1) % self.slots
+
+    def close(self):
+        self._map.close()
+
+    def stats(self):
+        return {
+            'path': self.path,
+            'entries': self.entries,
+            'bytes': len(self._map),
+            'lookups': self.lookups,
+            'hits': self.hits,
+        }
+
+
+def _parse_book(text):
+    try:
+        size, k, plies = (int(part) for part in text.split(':'))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected SIZE:K:PLIES, got {text!r}")
+    return size, k, plies
+
+
+def main(argv=None):
+    import bot  # the builder needs the engines, readers only this module
+
+    parser = argparse.ArgumentParser(description="Build the bot position database")
+    parser.add_argument('path', help="output file, e.g. positions.bin")
+    parser.add_argument('--book', type=_parse_book, action='append', default=[],
+                        metavar='SIZE:K:PLIES',
+                        help="also store searched replies for every position of a SIZE board "
+                             "with K in a row up to PLIES moves in (repeatable)")
+    parser.add_argument('--budget', type=float, default=bot.SEARCH_BUDGET,
+                        help="search seconds per book position")
+    args = parser.parse_args(argv)
+    started = time.perf_counter()
+    entries = bot.position_entries(args.book, args.budget)
+    size = write(args.path, entries)
+    print(f"{args.path}: {len(entries)} positions, {size} bytes in "
+          f"{time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
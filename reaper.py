@@ -0,0 +1,80 @@
+"""
+Idle-room reaper.
+
+Rooms stay in the Room table until they are dissolved, but their live
+state only needs to be in memory while someone plays.  The reaper runs
+every REAP_INTERVAL seconds and evicts:
+
+  - rooms with no members (no live sockets) that have not been used for
+    `ttl` seconds
+  - the least recently used memberless rooms beyond `max_rooms`
+
+An evicted room is rebuilt from its move log the next time it is needed
+(see _create_room_state in run.py).  The log has the seats but not the
+members, so a room with members is never evicted and `max_rooms` is a
+soft cap.
+"""
+
+IDLE_TTL = 600  # seconds a memberless room stays in memory
+MAX_ROOMS = 10000  # rooms kept in memory at most
+REAP_INTERVAL = 30  # seconds between reaper passes
+
+
+def pick_evictions(lru, is_idle, ttl=IDLE_TTL, max_rooms=MAX_ROOMS):
+    """
+    Room ids to evict from `lru` ([(room_id, idle seconds), ...], least
+    recently used first); `is_idle(room_id)` is true for rooms without members.
+    """
+    evict = [room_id for room_id, age in lru if age >= ttl and is_idle(room_id)]
+    over = len(lru) - len(evict) - max_rooms
+    chosen = set(evict)
+    for room_id, _ in lru:
+        if over <= 0:
+            break
+        if room_id in chosen or not is_idle(room_id):
+            continue
+        evict.append(room_id)
+        over -= 1
+    return evict
+
+
+class RoomReaper:
+    def __init__(self, store, evict, ttl=IDLE_TTL, max_rooms=MAX_ROOMS):
+        self.store = store
+        self._evict = evict  # evict(room_id) -> bool, also updates the lobby
+        self.ttl = ttl
+        self.max_rooms = max_rooms
+        self.passes = 0
+        self.evicted = 0
+
+    def _is_idle(self, room_id):
+        state = self.store.peek(room_id)
+        return state is None or not state.members
+
+    def reap(self):
+        """One pass; returns the number of rooms evicted"""
+        self.passes += 1
+        count = 0
+        for room_id in pick_evictions(self.store.lru(), self._is_idle, self.ttl, self.max_rooms):
+            if self._evict(room_id):
+                count += 1
+        self.evicted += count
+        return count
+
+    def run(self, sleep, interval=REAP_INTERVAL):
+        """Background loop: one reaper pass every `interval` seconds"""
+        while True:
+            sleep(interval)
+            try:
+                self.reap()
+            except Exception as e:
+                print(f"Room reaper failed: {e}")
+
+    def stats(self):
+        return {
+            'rooms': len(self.store.lru()),
+            'max_rooms': self.max_rooms,
+            'ttl': self.ttl,
+            'passes': self.passes,
+            'evicted': self.evicted,
+        }
@@ -0,0 +1,67 @@
+"""
+Bounded cache of room metadata for the join path.
+
+game() and handle_join need a room's type, mode, password and creator on
+every page load and join; RoomCache keeps them in memory (least recently
+used dropped past `max_entries`) so neither waits on the database.  Room
+metadata never changes after creation, so the only invalidation is the
+room going away: on_dissolve_room and the empty-room cleanup in on_leave
+call invalidate(), and `valid(room_id)` (the room is still in the lobby
+index, which is shared between workers) catches rooms another worker
+deleted.  Missing rooms are not cached.
+"""
+
+from collections import OrderedDict, namedtuple
+
+CACHE_SIZE = 10000  # rooms
+
+RoomInfo = namedtuple('RoomInfo', 'id name type mode bot_level password created_by creator_name')
+
+
+class RoomCache:
+    def __init__(self, load, valid=None, max_entries=CACHE_SIZE):
+        self._load = load  # load(room_id) -> RoomInfo | None, from the database
+        self._valid = valid  # valid(room_id) -> bool, checked on every hit
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, room_id):
+        info = self._entries.get(room_id)
+        if info is not None:
+            if self._valid is None or self._valid(room_id):
+                self._entries.move_to_end(room_id)
+                self.hits += 1
+                return info
+            del self._entries[room_id]
+        self.misses += 1
+        info = self._load(room_id)
+        if info is not None:
+            self.put(info)
+        return info
+
+    def put(self, info):
+        self._entries[info.id] = info
+        self._entries.move_to_end(info.id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, room_id):
+        self._entries.pop(room_id, None)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'max_entries': self.max_entries,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'evictions': self.evictions,
+        }
@@ -0,0 +1,134 @@
+"""
+Live state of one room, kept compact for servers holding many idle rooms.
+
+RoomState replaces the per-room dict of sets: no instance __dict__, the
+members, their sockets and the pending rematch players as tuples, the
+rematch votes as a two-bit mask, the seats as a (first, second) tuple and
+the delta buffer allocated on the first update.  The board is the game
+object itself (two bitmasks for TicTacToe, see tictactoe.py); the moves of
+the current game are also kept packed, a byte or two each, for the game
+archive (game_record.py).
+"""
+
+import sys
+from collections import deque
+
+from chess_engine import ChessGame
+from tictactoe import TicTacToe
+
+# Recent ttt deltas kept per room so clients that missed some can catch up
+DELTA_BUFFER = 32
+
+# Player marks per room mode, first mark moves first
+GAME_MARKS = {'chess': ('white', 'black')}
+DEFAULT_MARKS = ('X', 'O')
+
+
+def marks_for(mode):
+    return GAME_MARKS.get(mode, DEFAULT_MARKS)
+
+
+def new_game(mode):
+    return ChessGame() if mode == 'chess' else TicTacToe()
+
+
+class RoomState:
+    __slots__ = ('mode', 'bot_level', 'room_creator', 'game', 'turn', 'winner',
+                 'members', 'sockets', 'seats', 'votes', 'rematch_requested', 'rematch_pending',
+                 'seq', 'deltas', 'packed', 'opener')
+
+    def __init__(self, mode, bot_level, room_creator):
+        # interned: thousands of rooms share the same few mode/level strings
+        self.mode = sys.intern(mode)
+        self.bot_level = sys.intern(bot_level)
+        self.room_creator = room_creator
+        self.game = new_game(mode)  # TicTacToe() | ChessGame()
+        self.turn = marks_for(mode)[0]  # 'X'/'O' ('white'/'black' for chess)
+        self.winner = None  # None | mark | 'draw'
+        self.members = ()  # usernames in the room
+        self.sockets = ()  # (sid, username) of every member socket in the room
+        self.seats = (None, None)  # username (or 'COMPUTER') per mark, in marks order
+        self.votes = 0  # bit i set: the player on seat i wants a rematch
+        self.rematch_requested = False
+        self.rematch_pending = ()  # usernames that accepted the rematch
+        self.seq = 0  # sequence number of the last ttt_update / ttt_reset
+        self.deltas = None  # deque of recent updates for resync, created on first use
+        self.packed = b''  # moves of the current game, packed (see game_record.py)
+        self.opener = self.turn  # mark that moved first in the current game
+
+    @property
+    def marks(self):
+        return marks_for(self.mode)
+
+    @property
+    def players(self):
+        """{mark: username} as sent to clients"""
+        return dict(zip(self.marks, self.seats))
+
+    def player(self, mark):
+        return self.seats[self.marks.index(mark)]
+
+    def seat(self, mark, username):
+        if mark == self.marks[0]:
+            self.seats = (username, self.seats[1])
+        else:
+            self.seats = (self.seats[0], username)
+
+    def swap_seats(self):
+        self.seats = (self.seats[1], self.seats[0])
+
+    def mark_of(self, username):
+        for mark, player in zip(self.marks, self.seats):
+            if player == username:
+                return mark
+        return None
+
+    def other_mark(self, mark):
+        first, second = self.marks
+        return second if mark == first else first
+
+    def add_member(self, username, sid=None):
+        if username not in self.members:
+            self.members += (username,)
+        if sid is not None and (sid, username) not in self.sockets:
+            self.sockets += ((sid, username),)
+
+    def remove_member(self, username):
+        self.members = tuple(m for m in self.members if m != username)
+        self.sockets = tuple(s for s in self.sockets if s[1] != username)
+
+    def drop_socket(self, sid):
+        """Forget a member socket; returns its username if that was the member's last socket here"""
+        username = next((name for s, name in self.sockets if s == sid), None)
+        if username is None:
+            return None
+        self.sockets = tuple(s for s in self.sockets if s[0] != sid)
+        if any(name == username for _, name in self.sockets):
+            return None
+        self.remove_member(username)
+        return username
+
+    def vote(self, mark):
+        self.votes |= 1 << self.marks.index(mark)
+
+    def voted(self):
+        """Marks that voted for a rematch"""
+        return [mark for i, mark in enumerate(self.marks) if (self.votes >> i) & 1]
+
+    def add_pending(self, username):
+        if username not in self.rematch_pending:
+            self.rematch_pending += (username,)
+
+    def clear_rematch(self):
+        self.votes = 0
+        self.rematch_requested = False
+        self.rematch_pending = ()
+
+    def record(self, delta):
+        """Stamp an update with the next sequence number and keep it for resync"""
+        self.seq += 1
+        delta['seq'] = self.seq
+        if self.deltas is None:
+            self.deltas = deque(maxlen=DELTA_BUFFER)
+        self.deltas.append(delta)
+        return delta
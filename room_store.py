@@ -0,0 +1,405 @@
+"""
+Pluggable storage for live room state, the lobby index and connected users.
+
+    memory://   plain dicts in this process (the default, single worker)
+    redis://... shared between worker processes through Redis; pair it with
+                SocketIO(message_queue=...) so broadcasts cross processes too
+    local://    in-process stand-in for the shared backend (LocalKV) so the
+                shared code path runs in tests; it has a single Socket.IO
+                server, so no message queue
+
+Handlers read with `get()` and change state inside `transaction()`, which
+for the shared backend loads the room under a per-room lock and writes it
+back on exit.  With the memory backend it simply yields the live dict.
+"""
+
+import pickle
+import queue
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+LOCK_TIMEOUT = 5  # seconds a room lock may be held before it expires
+
+
+class RecentlyUsed:
+    """Last-use time per room, least recently used first (for the idle-room reaper)"""
+
+    def __init__(self, clock=time.monotonic):
+        self._clock = clock
+        self._used = OrderedDict()
+
+    def touch(self, room_id):
+        self._used[room_id] = self._clock()
+        self._used.move_to_end(room_id)
+
+    def forget(self, room_id):
+        self._used.pop(room_id, None)
+
+    def ages(self):
+        """[(room_id, seconds since last use), ...], least recently used first"""
+        now = self._clock()
+        return [(room_id, now - used) for room_id, used in self._used.items()]
+
+
+class MemoryRoomStore:
+    """Room state held in this process (one server worker)"""
+
+    shared = False
+
+    def __init__(self):
+        self._rooms = {}
+        self._used = RecentlyUsed()
+        self.lobby = {}
+        self.users = set()
+        self._lobby_version = 0
+
+    def lobby_version(self):
+        """Counter bumped on every lobby change (ETag of the room listing)"""
+        return self._lobby_version
+
+    def bump_lobby_version(self):
+        self._lobby_version += 1
+
+    def __contains__(self, room_id):
+        return room_id in self._rooms
+
+    def __len__(self):
+        return len(self._rooms)
+
+    def __getitem__(self, room_id):
+        return self._rooms[room_id]
+
+    def __setitem__(self, room_id, state):
+        self._rooms[room_id] = state
+        self._used.touch(room_id)
+
+    def get(self, room_id, default=None):
+        state = self._rooms.get(room_id)
+        if state is None:
+            return default
+        self._used.touch(room_id)
+        return state
+
+    def pop(self, room_id, default=None):
+        self._used.forget(room_id)
+        return self._rooms.pop(room_id, default)
+
+    def setdefault(self, room_id, state):
+        self._used.touch(room_id)
+        return self._rooms.setdefault(room_id, state)
+
+    def keys(self):
+        return list(self._rooms)
+
+    def values(self):
+        return list(self._rooms.values())
+
+    def peek(self, room_id):
+        """get() without counting as a use"""
+        return self._rooms.get(room_id)
+
+    def lru(self):
+        """[(room_id, idle seconds), ...] for rooms in memory, least recently used first"""
+        return self._used.ages()
+
+    def evict(self, room_id):
+        """Drop a room from memory; it is rebuilt from the move log when needed"""
+        return self.pop(room_id)
+
+    @contextmanager
+    def transaction(self, room_id, create=None):
+        """Yield the room state (created with `create()` if missing, else None)"""
+        state = self.get(room_id)
+        if state is None and create is not None:
+            state = create()
+            if state is not None:
+                self[room_id] = state
+        yield state
+
+
+class SharedHash:
+    """dict-like view of a hash on the shared client, values pickled"""
+
+    def __init__(self, client, name):
+        self.client = client
+        self.name = name
+
+    def __setitem__(self, key, value):
+        self.client.hset(self.name, key, pickle.dumps(value))
+
+    def __getitem__(self, key):
+        raw = self.client.hget(self.name, key)
+        if raw is None:
+            raise KeyError(key)
+        return pickle.loads(raw)
+
+    def __contains__(self, key):
+        return self.client.hexists(self.name, key)
+
+    def __len__(self):
+        return self.client.hlen(self.name)
+
+    def get(self, key, default=None):
+        raw = self.client.hget(self.name, key)
+        return pickle.loads(raw) if raw is not None else default
+
+    def pop(self, key, default=None):
+        value = self.get(key, default)
+        self.client.hdel(self.name, key)
+        return value
+
+    def values(self):
+        return [pickle.loads(raw) for raw in self.client.hvals(self.name)]
+
+    def clear(self):
+        self.client.delete(self.name)
+
+
+class SharedSet:
+    """set-like view of a set on the shared client"""
+
+    def __init__(self, client, name):
+        self.client = client
+        self.name = name
+
+    def add(self, member):
+        self.client.sadd(self.name, member)
+
+    def discard(self, member):
+        self.client.srem(self.name, member)
+
+    def __contains__(self, member):
+        return self.client.sismember(self.name, member)
+
+    def __len__(self):
+        return self.client.scard(self.name)
+
+    def members(self):
+        return {m.decode() if isinstance(m, bytes) else m
+                for m in self.client.smembers(self.name)}
+
+
+class SharedRoomStore:
+    """Room state in a Redis-compatible store shared by all worker processes"""
+
+    shared = True
+
+    def __init__(self, client, prefix='chess-socket:'):
+        self.client = client
+        self.prefix = prefix
+        self._rooms = SharedHash(client, prefix + 'rooms')
+        self.lobby = SharedHash(client, prefix + 'lobby')
+        self.users = SharedSet(client, prefix + 'users')
+        self._version_key = prefix + 'lobby-version'
+        self._local = threading.local()
+
+    def lobby_version(self):
+        """Counter bumped on every lobby change, shared by all workers"""
+        return int(self.client.get(self._version_key) or 0)
+
+    def bump_lobby_version(self):
+        self.client.incr(self._version_key)
+
+    def __contains__(self, room_id):
+        return room_id in self._rooms
+
+    def __len__(self):
+        return len(self._rooms)
+
+    def __getitem__(self, room_id):
+        return self._rooms[room_id]
+
+    def __setitem__(self, room_id, state):
+        self._rooms[room_id] = state
+
+    def get(self, room_id, default=None):
+        return self._rooms.get(room_id, default)
+
+    def pop(self, room_id, default=None):
+        self._dropped().add(room_id)
+        return self._rooms.pop(room_id, default)
+
+    def setdefault(self, room_id, state):
+        with self._lock(room_id):
+            existing = self._rooms.get(room_id)
+            if existing is not None:
+                return existing
+            self._rooms[room_id] = state
+            return state
+
+    def keys(self):
+        return [k.decode() if isinstance(k, bytes) else k
+                for k in self.client.hkeys(self._rooms.name)]
+
+    def values(self):
+        return self._rooms.values()
+
+    def peek(self, room_id):
+        return self._rooms.get(room_id)
+
+    def lru(self):
+        """Nothing is held in this process's memory, so there is nothing to reap"""
+        return []
+
+    def evict(self, room_id):
+        return None
+
+    def _dropped(self):
+        # rooms popped inside a transaction must not be written back on exit
+        if not hasattr(self._local, 'dropped'):
+            self._local.dropped = set()
+        return self._local.dropped
+
+    def _lock(self, room_id):
+        return self.client.lock(f"{self.prefix}lock:{room_id}", timeout=LOCK_TIMEOUT,
+                                blocking_timeout=LOCK_TIMEOUT)
+
+    @contextmanager
+    def transaction(self, room_id, create=None):
+        """Load the room under its lock, yield it, then write it back"""
+        with self._lock(room_id):
+            dropped = self._dropped()
+            dropped.discard(room_id)
+            state = self._rooms.get(room_id)
+            if state is None and create is not None:
+                state = create()
+            yield state
+            if state is not None and room_id not in dropped:
+                self._rooms[room_id] = state
+            dropped.discard(room_id)
+
+
+class LocalKV:
+    """
+    In-process stand-in for the subset of the redis-py client that
+    SharedRoomStore uses.  Thread safe; values are stored as bytes.
+    """
+
+    def __init__(self):
+        self._data = {}
+        self._guard = threading.RLock()
+        self._locks = {}
+        self._subscribers = {}  # channel -> [queue.Queue, ...]
+
+    def get(self, name):
+        return self._data.get(name)
+
+    def incr(self, name):
+        with self._guard:
+            value = int(self._data.get(name, b'0')) + 1
+            self._data[name] = str(value).encode()
+            return value
+
+    def hset(self, name, key, value):
+        with self._guard:
+            self._data.setdefault(name, {})[key] = value
+
+    def hget(self, name, key):
+        return self._data.get(name, {}).get(key)
+
+    def hexists(self, name, key):
+        return key in self._data.get(name, {})
+
+    def hdel(self, name, key):
+        with self._guard:
+            self._data.get(name, {}).pop(key, None)
+
+    def hlen(self, name):
+        return len(self._data.get(name, {}))
+
+    def hkeys(self, name):
+        return list(self._data.get(name, {}))
+
+    def hvals(self, name):
+        return list(self._data.get(name, {}).values())
+
+    def sadd(self, name, member):
+        with self._guard:
+            self._data.setdefault(name, set()).add(member)
+
+    def srem(self, name, member):
+        with self._guard:
+            self._data.get(name, set()).discard(member)
+
+    def sismember(self, name, member):
+        return member in self._data.get(name, set())
+
+    def scard(self, name):
+        return len(self._data.get(name, set()))
+
+    def smembers(self, name):
+        return set(self._data.get(name, set()))
+
+    def delete(self, name):
+        with self._guard:
+            self._data.pop(name, None)
+
+    def lock(self, name, timeout=None, blocking_timeout=None):
+        with self._guard:
+            return self._locks.setdefault(name, threading.RLock())
+
+    def publish(self, channel, message):
+        with self._guard:
+            inboxes = list(self._subscribers.get(channel, ()))
+        for inbox in inboxes:
+            inbox.put((channel, message))
+        return len(inboxes)
+
+    def pubsub(self):
+        return LocalPubSub(self)
+
+
+class LocalPubSub:
+    """The get_message() polling subset of a redis-py PubSub"""
+
+    def __init__(self, kv):
+        self._kv = kv
+        self._inbox = queue.Queue()
+        self._channels = []
+
+    def subscribe(self, *channels):
+        with self._kv._guard:
+            for channel in channels:
+                self._kv._subscribers.setdefault(channel, []).append(self._inbox)
+                self._channels.append(channel)
+
+    def get_message(self, ignore_subscribe_messages=False, timeout=0.0):
+        try:
+            channel, data = self._inbox.get(timeout=timeout) if timeout else self._inbox.get_nowait()
+        except queue.Empty:
+            return None
+        return {'type': 'message', 'channel': channel, 'data': data}
+
+    def close(self):
+        with self._kv._guard:
+            for channel in self._channels:
+                self._kv._subscribers[channel].remove(self._inbox)
+        self._channels = []
+
+
+def create_room_store(url):
+    """Room store for ROOM_STORE_URL"""
+    if not url or url.startswith('memory://'):
+        return MemoryRoomStore()
+    if url.startswith('local://'):
+        return SharedRoomStore(LocalKV())
+    if url.startswith(('redis://', 'rediss://', 'unix://')):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("ROOM_STORE_URL is a redis URL but the 'redis' package is not installed")
+        return SharedRoomStore(redis.Redis.from_url(url))
+    raise ValueError(f"unsupported ROOM_STORE_URL: {url}")
+
+
+def socketio_queue_options(url):
+    """
+    Extra SocketIO() arguments so emits reach clients on every worker.
+    local:// has a single server (and the Flask-SocketIO test client refuses
+    pub/sub managers), so it gets none.
+    """
+    if url and url.startswith(('redis://', 'rediss://', 'unix://')):
+        return {'message_queue': url}
+    return {}
@@ -1,24 +1,126 @@
-from flask import Flask, render_template, request, redirect, session, url_for, flash, jsonify
-from flask_socketio import SocketIO, join_room, leave_room, emit
+from flask import Flask, render_template, request, redirect, session, url_for, flash, jsonify, stream_with_context
+from flask_socketio import SocketIO, join_room, leave_room, emit, rooms
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy.exc import IntegrityError
+from werkzeug.middleware.proxy_fix import ProxyFix
 from werkzeug.security import generate_password_hash, check_password_hash
+import base64
 import uuid
 import json
+import os
+import atexit
+import functools
+import zlib
+from collections import namedtuple
 from datetime import datetime
+from types import SimpleNamespace
+
+import auth_service
+import bot
+import db_writer
+import matchmaking
+import spectators
+from auth_service import HashService, PasswordBusy, Throttle
+from bot_service import BotService
+from db_writer import DbWriter, apply_sqlite_pragmas, engine_options
+from game_record import HEADER_SIZE, GameArchive, decode_header, iter_moves, pack_move
+from lobby import LOBBY_ROOM, LobbyFeed
+from matchmaking import DEFAULT_RATING, MatchQueue, elo_update
+from metrics import CONTENT_TYPE, ROOM_SIZE_BUCKETS, Instrumentation, Metrics
+from move_log import MoveLog
+from reaper import RoomReaper
+from room_cache import RoomCache, RoomInfo
+from room_state import RoomState, marks_for
+from room_store import create_room_store, socketio_queue_options
+from sharding import ShardRouter, ShardedRoomStore
+from spectators import SpectatorHub
 
 app = Flask(__name__)
 app.config['SECRET_KEY'] = 'secret!'
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///chess_game.db'
+app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('DATABASE_URL', 'sqlite:///chess_game.db')
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+app.config['BOT_WORKERS'] = int(os.environ.get('BOT_WORKERS', 2))
+app.config['BOT_QUEUE_LIMIT'] = int(os.environ.get('BOT_QUEUE_LIMIT', 64))
+app.config['BOT_SEARCH_BUDGET'] = float(os.environ.get('BOT_SEARCH_BUDGET', bot.SEARCH_BUDGET))
+# precomputed bot replies mapped by every worker, built with `python position_db.py positions.bin`
+app.config['POSITION_DB'] = os.environ.get('POSITION_DB',
+                                           os.path.join(os.path.dirname(os.path.abspath(__file__)), 'positions.bin'))
+# 'delta': ttt_update carries only the move + sequence number; 'full': board included too
+app.config['GAME_PROTOCOL'] = os.environ.get('GAME_PROTOCOL', 'delta')
+# memory:// (single worker), redis://host:6379/0 (shared by N workers) or local:// (test stand-in)
+app.config['ROOM_STORE_URL'] = os.environ.get('ROOM_STORE_URL', 'memory://')
+# idle-room reaper: memberless rooms leave memory after ROOM_IDLE_TTL seconds,
+# at most ROOM_MAX_ACTIVE rooms stay in memory (LRU), one pass every ROOM_REAP_INTERVAL
+app.config['ROOM_IDLE_TTL'] = float(os.environ.get('ROOM_IDLE_TTL', 600))
+app.config['ROOM_MAX_ACTIVE'] = int(os.environ.get('ROOM_MAX_ACTIVE', 10000))
+app.config['ROOM_REAP_INTERVAL'] = float(os.environ.get('ROOM_REAP_INTERVAL', 30))
+# rooms whose metadata (type, mode, password, creator) the join path keeps in memory
+app.config['ROOM_CACHE_SIZE'] = int(os.environ.get('ROOM_CACHE_SIZE', 10000))
+# seconds between coalesced lobby_diff broadcasts to dashboards
+app.config['LOBBY_FLUSH_INTERVAL'] = float(os.environ.get('LOBBY_FLUSH_INTERVAL', 0.25))
+# seconds between matchmaking sweeps (the rating window of waiting players widens meanwhile)
+app.config['MATCH_INTERVAL'] = float(os.environ.get('MATCH_INTERVAL', matchmaking.MATCH_INTERVAL))
+# spectators get a coalesced snapshot at most every SPECTATOR_INTERVAL seconds,
+# broadcast to tier rooms of SPECTATOR_TIER_SIZE sockets each
+app.config['SPECTATOR_INTERVAL'] = float(os.environ.get('SPECTATOR_INTERVAL', spectators.SNAPSHOT_INTERVAL))
+app.config['SPECTATOR_TIER_SIZE'] = int(os.environ.get('SPECTATOR_TIER_SIZE', spectators.TIER_SIZE))
+# password hashing threads and hashes in flight at most (0 workers hashes inline)
+app.config['HASH_WORKERS'] = int(os.environ.get('HASH_WORKERS', auth_service.HASH_WORKERS))
+app.config['HASH_QUEUE_LIMIT'] = int(os.environ.get('HASH_QUEUE_LIMIT', auth_service.HASH_QUEUE_LIMIT))
+# login/register attempts allowed per client IP and per username every LOGIN_WINDOW seconds
+app.config['LOGIN_WINDOW'] = float(os.environ.get('LOGIN_WINDOW', auth_service.LOGIN_WINDOW))
+app.config['LOGIN_IP_LIMIT'] = int(os.environ.get('LOGIN_IP_LIMIT', auth_service.LOGIN_IP_LIMIT))
+app.config['LOGIN_USER_LIMIT'] = int(os.environ.get('LOGIN_USER_LIMIT', auth_service.LOGIN_USER_LIMIT))
+# proxies in front of the app whose X-Forwarded-For/-Proto are trusted, so the
+# per-IP throttle sees the client and not the router (Heroku's router is one hop)
+app.config['TRUSTED_PROXIES'] = int(os.environ.get('TRUSTED_PROXIES', 1 if 'DYNO' in os.environ else 0))
+# name of this worker in the room shard ring; empty runs unsharded (needs a shared ROOM_STORE_URL)
+app.config['SHARD_NODE'] = os.environ.get('SHARD_NODE', '')
+# room creates/deletes, move log entries and archived games are committed by one
+# background writer every DB_WRITE_INTERVAL seconds (0 commits inline); the pool
+# is sized for many greenlets, see db_writer.py
+app.config['DB_WRITE_INTERVAL'] = float(os.environ.get('DB_WRITE_INTERVAL', db_writer.WRITE_INTERVAL))
+app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(
+    app.config['SQLALCHEMY_DATABASE_URI'],
+    pool_size=int(os.environ.get('DB_POOL_SIZE', db_writer.POOL_SIZE)),
+    overflow=int(os.environ.get('DB_POOL_OVERFLOW', db_writer.POOL_OVERFLOW)))
+# SQLite durability: NORMAL (WAL, no fsync per commit) or FULL
+app.config['SQLITE_SYNCHRONOUS'] = os.environ.get('SQLITE_SYNCHRONOUS', db_writer.SYNCHRONOUS)
 
 db = SQLAlchemy(app)
-socketio = SocketIO(app, async_mode='eventlet', manage_session=False, cors_allowed_origins="*")
+with app.app_context():
+    apply_sqlite_pragmas(db.engine, app.config['SQLITE_SYNCHRONOUS'])  # before the first connection
+socketio = SocketIO(app, async_mode='eventlet', manage_session=False, cors_allowed_origins="*",
+                    **socketio_queue_options(app.config['ROOM_STORE_URL']))
+# handler latency, errors, emit fan-out and queries per request, served on /metrics
+metrics = Metrics()
+instrumentation = Instrumentation(metrics)
+instrumentation.instrument_socketio(socketio)  # before any @socketio.on below
+instrumentation.instrument_flask(app)
+if app.config['TRUSTED_PROXIES']:
+    # around the Socket.IO middleware too
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=app.config['TRUSTED_PROXIES'],
+                            x_proto=app.config['TRUSTED_PROXIES'])
+# bot searches run in worker processes so they never block the eventlet hub
+bot_service = BotService(workers=app.config['BOT_WORKERS'],
+                         queue_limit=app.config['BOT_QUEUE_LIMIT'],
+                         budget=app.config['BOT_SEARCH_BUDGET'],
+                         sleep=socketio.sleep)
+# scrypt runs in threads so a login burst never stalls the games on this worker
+hash_service = HashService(workers=app.config['HASH_WORKERS'],
+                           queue_limit=app.config['HASH_QUEUE_LIMIT'],
+                           sleep=socketio.sleep)
+ip_throttle = Throttle(app.config['LOGIN_IP_LIMIT'], app.config['LOGIN_WINDOW'])
+user_throttle = Throttle(app.config['LOGIN_USER_LIMIT'], app.config['LOGIN_WINDOW'])
+login_throttled = metrics.counter('chess_login_throttled_total',
+                                  'Login/register attempts refused by the throttle', ('key',))
 
 
 class User(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     username = db.Column(db.String(80), unique=True, nullable=False)
     password_hash = db.Column(db.String(255), nullable=False)
+    rating = db.Column(db.Integer, nullable=False, default=DEFAULT_RATING)  # Elo, pvp TicTacToe
 
     def set_password(self, password: str):
         self.password_hash = generate_password_hash(password)
@@ -32,37 +134,513 @@ class Room(db.Model):
     name = db.Column(db.String(120), nullable=False)
     type = db.Column(db.String(20), nullable=False, default='public')  # public/private
     password = db.Column(db.String(255), nullable=True)  # store hashed or plain for demo
-    mode = db.Column(db.String(20), nullable=False, default='pvp')  # pvp / bot
+    mode = db.Column(db.String(20), nullable=False, default='pvp')  # pvp / bot / chess
+    bot_level = db.Column(db.String(20), nullable=True)  # easy / medium / perfect (bot rooms)
     created_by = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=True)
     created_at = db.Column(db.DateTime, nullable=True, default=datetime.utcnow)
 
+    __table_args__ = (
+        # keyset pagination of /api/rooms: one per filter combination, so each
+        # page is an index range scan with no sort
+        db.Index('ix_room_created', 'created_at', 'id'),
+        db.Index('ix_room_type_created', 'type', 'created_at', 'id'),
+        db.Index('ix_room_mode_created', 'mode', 'created_at', 'id'),
+        db.Index('ix_room_type_mode_created', 'type', 'mode', 'created_at', 'id'),
+    )
+
+
+class Move(db.Model):
+    """Per-room move log, queued on the database writer by move_log.MoveLog"""
+    id = db.Column(db.Integer, primary_key=True)
+    room_id = db.Column(db.String(64), nullable=False, index=True)
+    kind = db.Column(db.String(10), nullable=False)  # seat / move / reset / checkpoint
+    mark = db.Column(db.String(10), nullable=True)  # X/O or white/black
+    value = db.Column(db.String(80), nullable=True)  # username, cell index or UCI move
+    created_at = db.Column(db.DateTime, nullable=True, default=datetime.utcnow)
+
+
+class GameRecord(db.Model):
+    """One finished game (or unfinished, if its room went away), packed by game_record.py"""
+    id = db.Column(db.Integer, primary_key=True)
+    room_id = db.Column(db.String(64), nullable=False, index=True)
+    first_player = db.Column(db.String(80), nullable=True)  # X / white when the game started
+    second_player = db.Column(db.String(80), nullable=True)  # O / black
+    plies = db.Column(db.Integer, nullable=False)
+    record = db.Column(db.LargeBinary, nullable=False)  # 2-byte header + one varint per move
+    ended_at = db.Column(db.Integer, nullable=False)  # unix time: an int, not a 26-byte DATETIME
 
-# In-memory active room state for TicTacToe
-active_rooms = {}
-# active_rooms[room_id] = {
-#   'members': set([username,...]),
-#   'mode': 'pvp'|'bot',
-#   'players': {'X': username_or_COMPUTER, 'O': username_or_COMPUTER},
-#   'board': ['','','','','','','','',''],
-#   'turn': 'X' or 'O',
-#   'winner': None | 'X' | 'O' | 'draw',
-#   'rematch_votes': set(['X','O']),
-#   'rematch_requested': False,
-#   'rematch_pending': set(),
-#   'room_creator': username
-# }
+
+# Active room state for TicTacToe and chess, see room_store.py. Reads use
+# active_rooms.get(); changes go through `with active_rooms.transaction(room_id)`
+# so they are written back when the store is shared between workers.
+active_rooms = create_room_store(app.config['ROOM_STORE_URL'])
+# with SHARD_NODE set, each room is owned by one worker (see sharding.py)
+shard_router = None
+if app.config['SHARD_NODE']:
+    if not active_rooms.shared:
+        raise RuntimeError("SHARD_NODE needs a shared ROOM_STORE_URL (redis:// or local://)")
+    shard_router = ShardRouter(active_rooms.client, app.config['SHARD_NODE'], prefix=active_rooms.prefix)
+    active_rooms = ShardedRoomStore(active_rooms, shard_router)
+# active_rooms[room_id] = RoomState(...)  # see room_state.py
 
 # Store connected users for realtime updates
-connected_users = set()
+connected_users = active_rooms.users
+
+def _create_room_state(room, creator_name=None, replay=True):
+    """The one place room state is built: a fresh RoomState for a RoomInfo
+    (or a Room row with its creator_name), replaying its move log unless
+    the room was just created"""
+    if creator_name is None:
+        creator_name = room.creator_name
+    state = RoomState(room.mode, room.bot_level or bot.DEFAULT_BOT_LEVEL, creator_name)
+    return _replay_log(room.id, state) if replay else state
+
+def _rehydrate(room_id):
+    """State for a room the reaper evicted, rebuilt from its move log (None if the room is gone)"""
+    room = _room_info(room_id)
+    return _create_room_state(room) if room else None
+
+def _room_insert(room):
+    """INSERT for a new (transient) Room, for the write queue"""
+    return Room.__table__.insert().values({column.name: getattr(room, column.name)
+                                           for column in Room.__table__.columns})
+
+def _room_delete(room_id):
+    return Room.__table__.delete().where(Room.id == room_id)
+
+def _load_room_info(room_id):
+    """RoomInfo from the database, room and creator name in one query. Never
+    flushes the writer: a room whose insert is still queued was put in the
+    room cache when it was created, so it is not looked up here."""
+    row = (db.session.query(Room, User.username)
+           .outerjoin(User, Room.created_by == User.id)
+           .filter(Room.id == room_id)
+           .first())
+    if row is None:
+        return None
+    room, creator_name = row
+    return RoomInfo(room.id, room.name, room.type, room.mode, room.bot_level, room.password,
+                    room.created_by, creator_name or "Unknown")
+
+def _room_info(room_id):
+    """Metadata of a room for the join path (None if it does not exist), see room_cache.py"""
+    return room_cache.get(room_id)
+
+def _evict_room(room_id):
+    """Reaper callback: free a room's memory, keeping its Room row and move log.
+    Rooms with members stay: the move log does not have them."""
+    state = active_rooms.peek(room_id)
+    if state is None or state.members:
+        return False
+    return active_rooms.evict(room_id) is not None
+
+def _record_delta(state, delta):
+    """Stamp a ttt update with the next sequence number and keep it for resync"""
+    state.record(delta)
+    if app.config['GAME_PROTOCOL'] == 'full':
+        return dict(delta, board=state.game.to_list())
+    return delta
+
+def _apply_ttt_move(state, index, mark):
+    """Play a TicTacToe move and return its ttt_update delta"""
+    state.winner = state.game.play(index, mark)
+    state.packed += pack_move(state.mode, index)
+    if not state.winner:
+        state.turn = state.other_mark(state.turn)
+    return _record_delta(state, {
+        'turn': state.turn,
+        'winner': state.winner,
+        'last': {'index': index, 'mark': mark}
+    })
+
+def _apply_chess_move(state, move):
+    """Play a UCI move (ValueError if illegal) and return the game-over reason"""
+    game = state.game
+    state.winner, reason = game.play(move)
+    state.packed += pack_move(state.mode, game.moves[-1])
+    state.turn = game.turn
+    return reason
+
+def _apply_reset(state):
+    """Start the rematch; returns the ttt_reset delta (None for chess)"""
+    state.game.reset()
+    state.winner = None
+    state.clear_rematch()
+    state.packed = b''
+    if state.mode == 'chess':
+        # white always moves first, so players swap colours instead
+        state.swap_seats()
+        state.turn = state.opener = state.game.turn
+        return None
+    state.turn = state.opener = state.other_mark(state.turn)
+    return _record_delta(state, {
+        'reset': True,
+        'turn': state.turn
+    })
+
+def _checkpoint(room_id, state):
+    """Compact the move log of a room starting a new game: its seats, opener and seq"""
+    seats = [('seat', mark, player) for mark, player in state.players.items() if player is not None]
+    move_log.compact(room_id, seats + [('checkpoint', state.opener, state.seq)])
+
+def _archive_game(room_id, state):
+    """Queue the current game of a room as a compact record (game_record.py)"""
+    game_archive.append(room_id, state.mode, state.seats, state.opener, state.winner, state.packed)
+
+def _replay_log(room_id, state):
+    """Rebuild a fresh room state from its move log (rooms that outlived a restart)"""
+    try:
+        for kind, mark, value in move_log.replay(room_id):
+            if kind == 'seat':
+                state.seat(mark, value)
+            elif kind == 'checkpoint':
+                state.turn = state.opener = mark
+                state.seq = int(value)
+            elif kind == 'reset':
+                _apply_reset(state)
+            elif state.mode == 'chess':
+                _apply_chess_move(state, value)
+            else:
+                _apply_ttt_move(state, int(value), mark)
+    except Exception as e:
+        print(f"Move log replay stopped for room {room_id}: {e}")
+    return state
+
+def _deltas_since(state, since):
+    """Buffered deltas after `since`, or None when a full snapshot is needed"""
+    if not isinstance(since, int) or since > state.seq or since < 0:
+        return None
+    if since == state.seq:
+        return []
+    deltas = state.deltas
+    if not deltas or deltas[0]['seq'] > since + 1:
+        return None
+    return [d for d in deltas if d['seq'] > since]
+
+# Lobby index so the dashboard never hits the database (lives in the room store)
+lobby_index = active_rooms.lobby
+# Room metadata for game() and handle_join; a room that left the lobby index
+# (dissolved, possibly by another worker) is looked up again
+room_cache = RoomCache(_load_room_info, valid=lobby_index.__contains__,
+                       max_entries=app.config['ROOM_CACHE_SIZE'])
+# Lobby changes batched for dashboards in the lobby socket room (see lobby.py)
+lobby_feed = LobbyFeed()
+# Players waiting for a rated pvp opponent on this worker (see matchmaking.py)
+match_queue = MatchQueue()
+# Spectators connected to this worker, fed snapshots in tiers (see spectators.py)
+spectator_hub = SpectatorHub(tier_size=app.config['SPECTATOR_TIER_SIZE'])
+# lobby_index[room_id] = {
+#   'id': room_id,
+#   'name': room_name,
+#   'type': 'public'|'private',
+#   'mode': 'pvp'|'bot'|'chess',
+#   'players': number of members,
+#   'created_by': creator username or "Unknown"
+# }
+
+# Columns added after the first release: (table, column, DDL type)
+MIGRATED_COLUMNS = [
+    ('room', 'bot_level', 'VARCHAR(20)'),
+    ('user', 'rating', f'INTEGER NOT NULL DEFAULT {DEFAULT_RATING}'),
+]
+
+def _schema_version():
+    """Checksum of the models and migrations, stamped into SQLite's user_version"""
+    shape = [(table.name, [(column.name, str(column.type)) for column in table.columns],
+              sorted(index.name for index in table.indexes))
+             for table in db.metadata.sorted_tables]
+    return zlib.crc32(repr((shape, MIGRATED_COLUMNS)).encode()) & 0x7fffffff
 
-def init_database():
+def init_database(force=False):
     """Initialize database with proper migration"""
     with app.app_context():
+        sqlite = db.engine.dialect.name == 'sqlite'
+        if sqlite and not force:
+            # a database already migrated for these models is left alone: one pragma
+            # read instead of create_all and the column checks on every start
+            if db.session.execute(db.text("PRAGMA user_version")).scalar() == _schema_version():
+                db.session.close()
+                return
         # Create all tables
         db.create_all()
+        # create_all never alters existing tables, so add new columns by hand
+        for table, column, ddl in MIGRATED_COLUMNS:
+            existing = [row[1] for row in db.session.execute(db.text(f"PRAGMA table_info({table})"))]
+            if column not in existing:
+                db.session.execute(db.text(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}"))
+        # keyset pagination orders by created_at, so rooms from before it was set get one
+        db.session.execute(db.text("UPDATE room SET created_at = :epoch WHERE created_at IS NULL"),
+                           {'epoch': datetime(1970, 1, 1)})
+        db.session.commit()
+        # nor does it add indexes to existing tables
+        for index in Room.__table__.indexes:
+            index.create(bind=db.engine, checkfirst=True)
+        if sqlite:
+            db.session.execute(db.text(f"PRAGMA user_version = {_schema_version()}"))
+            db.session.commit()
         print("✅ Database initialized successfully")
 
-init_database()
+@app.cli.command('init-db')
+def init_db_command():
+    """Create missing tables, columns and indexes (flask --app run init-db)"""
+    init_database(force=True)
+
+def load_lobby_index():
+    """Fill the lobby index from the Room table with a single joined query"""
+    with app.app_context():
+        rows = (db.session.query(Room, User.username)
+                .outerjoin(User, Room.created_by == User.id)
+                .order_by(Room.created_at)
+                .all())
+        lobby_index.clear()
+        for room, creator_name in rows:
+            _lobby_add(room, creator_name)
+        active_rooms.bump_lobby_version()
+        print(f"✅ Lobby index loaded ({len(lobby_index)} rooms)")
+
+def _lobby_add(room, creator_name):
+    state = active_rooms.get(room.id)
+    entry = {
+        'id': room.id,
+        'name': room.name,
+        'type': room.type,
+        'mode': room.mode,
+        'players': len(state.members) if state else 0,
+        'created_by': creator_name or "Unknown"
+    }
+    lobby_index[room.id] = entry
+    return entry
+
+def _lobby_set_players(room_id, count):
+    entry = lobby_index.get(room_id)
+    if entry and entry['players'] != count:
+        entry['players'] = count
+        lobby_index[room_id] = entry
+        active_rooms.bump_lobby_version()
+        lobby_feed.room_updated(room_id, count)
+
+def _lobby_remove(room_id):
+    lobby_index.pop(room_id, None)
+    lobby_feed.room_dissolved(room_id)
+
+def _room_writes_committed(batch):
+    """Writer callback: the Room table changed, so /api/rooms listings do too. The
+    lobby version is raised only now, so a worker that sees the new version
+    reads rows that have the change, whichever worker queued it."""
+    if any(getattr(statement, 'table', None) is Room.__table__ for statement, _ in batch):
+        active_rooms.bump_lobby_version()
+
+def _lobby_listing():
+    """Room list for the dashboard, player counts kept current by join/leave"""
+    return list(lobby_index.values())
+
+# Socket.IO events that read or change room state, by handler name. They run
+# on the worker owning the room; other workers forward them there.
+ROOM_EVENTS = {}
+
+# The socket a room event came from: its sid, its user and the worker it is
+# connected to (None for this one). Room events reply with
+# socketio.emit(..., to=client.sid), which reaches it from any worker.
+RoomClient = namedtuple('RoomClient', 'sid username origin')
+
+def _room_event(handler):
+    """
+    Run `handler(data, client)` on the worker that owns data['room_id']
+    (always this one when unsharded). Keyword arguments are only passed when
+    it runs here.
+    """
+    ROOM_EVENTS[handler.__name__] = handler
+
+    @functools.wraps(handler)
+    def dispatch(data, **local):
+        client = RoomClient(request.sid, session.get('username'), None)
+        room_id = data.get('room_id') or data.get('room')
+        if shard_router and room_id and not shard_router.owns(room_id):
+            shard_router.forward(room_id, handler.__name__, data,
+                                 sid=client.sid, username=client.username)
+            return
+        return handler(data, client, **local)
+    return dispatch
+
+def _handle_forwarded(message):
+    """Run a message from another worker for its client"""
+    if message['type'] == 'enter_room':
+        socketio.server.enter_room(message['sid'], message['room'], namespace='/')
+        return
+    with app.app_context():
+        ROOM_EVENTS[message['event']](message['data'],
+                                      RoomClient(message['sid'], message['username'], message['origin']))
+
+def _enter_room(room, client):
+    """join_room() for a client, which may be connected to another worker"""
+    if client.origin:
+        shard_router.send(client.origin, {'type': 'enter_room', 'sid': client.sid, 'room': room})
+    else:
+        socketio.server.enter_room(client.sid, room, namespace='/')
+
+def _start_match(first, second):
+    """Matchmaking pair: Room row and seated room state in one step; both
+    dashboards are sent to the game page, which joins the room"""
+    (first_sid, first_id), (second_sid, _) = first.data, second.data
+    room_id = str(uuid.uuid4())
+    with app.app_context():
+        room = Room(
+            id=room_id,
+            name=f"{first.username} vs {second.username}",
+            type='public',
+            mode='pvp',
+            created_by=first_id,
+            created_at=datetime.utcnow()
+        )
+        write_queue.submit(_room_insert(room))
+        state = _create_room_state(room, first.username, replay=False)
+        for mark, ticket in zip(state.marks, (first, second)):
+            state.seat(mark, ticket.username)
+            move_log.append(room_id, 'seat', mark, ticket.username)
+        active_rooms[room_id] = state
+        room_cache.put(RoomInfo(room_id, room.name, room.type, room.mode, None, None,
+                                first_id, first.username))
+        lobby_feed.room_created(_lobby_add(room, first.username))
+
+    for sid, opponent in ((first_sid, second), (second_sid, first)):
+        socketio.emit('match_found', {
+            'room_id': room_id,
+            'opponent': opponent.username,
+            'opponent_rating': opponent.rating
+        }, to=sid)
+
+def _rate_game(room_id, players, score):
+    """Background task: Elo update for the two players of a finished pvp game
+    (score 1 / 0.5 / 0 for the first player)"""
+    with app.app_context():
+        rated = User.query.filter(User.username.in_(players))
+        ratings = dict(rated.with_entities(User.username, User.rating))
+        if len(ratings) < 2:
+            return
+        updated = elo_update(*(ratings[name] for name in players), score)
+        # rating + delta, not the value computed here: workers sharing the
+        # database may be rating another game of the same player right now
+        for name, rating in zip(players, updated):
+            db.session.execute(db.update(User).where(User.username == name)
+                               .values(rating=User.rating + (rating - ratings[name])))
+        ratings = dict(rated.with_entities(User.username, User.rating))
+        db.session.commit()
+    socketio.emit('ratings_update', ratings, to=room_id)
+
+def _spectator_payload(room_id, state):
+    if state.mode == 'chess':
+        return {
+            'room_id': room_id,
+            'mode': state.mode,
+            'fen': state.game.fen(),
+            'last': state.game.moves[-1] if state.game.moves else None,
+            'turn': state.turn,
+            'winner': state.winner,
+            'players': state.players
+        }
+    return {
+        'room_id': room_id,
+        'mode': state.mode,
+        'seq': state.seq,
+        'board': state.game.to_list(),
+        'turn': state.turn,
+        'winner': state.winner,
+        'players': state.players
+    }
+
+def _spectator_snapshot(room_id):
+    """SpectatorHub callback: the room's snapshot, None while it is out of memory
+    (or owned by another worker since a rebalance), False once dissolved"""
+    if room_id not in lobby_index:
+        return False
+    if shard_router and not shard_router.owns(room_id):
+        return None
+    state = active_rooms.get(room_id)
+    return _spectator_payload(room_id, state) if state else None
+
+with app.app_context():
+    instrumentation.instrument_engine(db.engine)
+    write_queue = DbWriter(db.engine, interval=app.config['DB_WRITE_INTERVAL'],
+                           after_commit=_room_writes_committed)
+    move_log = MoveLog(write_queue, Move.__table__)
+    game_archive = GameArchive(write_queue, GameRecord.__table__)
+room_reaper = RoomReaper(active_rooms, _evict_room,
+                         ttl=app.config['ROOM_IDLE_TTL'], max_rooms=app.config['ROOM_MAX_ACTIVE'])
+
+services_started = False
+
+def start_services():
+    """Schema, lobby index, position file, bot workers and every background loop of this
+    server. Run by the server entry point, never at import: `flask init-db`, tooling and
+    the bot pool's spawned workers import this file too. Runs once."""
+    global services_started
+    if services_started:
+        return
+    services_started = True
+    init_database()
+    load_lobby_index()
+    socketio.start_background_task(write_queue.run, socketio.sleep)
+    atexit.register(write_queue.flush)
+    socketio.start_background_task(room_reaper.run, socketio.sleep, app.config['ROOM_REAP_INTERVAL'])
+    if bot.open_position_db(app.config['POSITION_DB']):
+        print(f"✅ Position file mapped ({len(bot.position_db())} positions)")
+    bot_service.warm()  # the 3x3 table (a few ms, once) and the search workers
+    socketio.start_background_task(lobby_feed.run,
+                                   lambda diff: socketio.emit('lobby_diff', diff, to=LOBBY_ROOM),
+                                   socketio.sleep, app.config['LOBBY_FLUSH_INTERVAL'])
+    socketio.start_background_task(match_queue.run, _start_match, socketio.sleep,
+                                   app.config['MATCH_INTERVAL'])
+    socketio.start_background_task(spectator_hub.run, _spectator_snapshot,
+                                   lambda event, data, room: socketio.emit(event, data, to=room),
+                                   socketio.sleep, app.config['SPECTATOR_INTERVAL'])
+    if shard_router:
+        shard_router.join()
+        socketio.start_background_task(shard_router.listen, _handle_forwarded, socketio.sleep)
+        atexit.register(shard_router.leave)  # hand hot rooms back to the shared store
+
+def _start_services_first(wsgi_app):
+    """WSGI wrapper starting the services on the first request (HTTP or Socket.IO),
+    for servers that import the app instead of running this file (gunicorn run:app)"""
+    def start_then_serve(environ, start_response):
+        start_services()
+        return wsgi_app(environ, start_response)
+    return start_then_serve
+
+app.wsgi_app = _start_services_first(app.wsgi_app)  # outermost
+
+def _socket_rooms():
+    """(all sockets, {room: sockets}) on this worker, per-socket rooms left out"""
+    namespace_rooms = socketio.server.manager.rooms.get('/', {})
+    sids = namespace_rooms.get(None, {})
+    return sids, {room: members for room, members in namespace_rooms.items()
+                  if room is not None and room not in sids}
+
+metrics.gauge('chess_active_rooms', 'Rooms with live state in memory', lambda: len(active_rooms))
+metrics.gauge('chess_connected_users', 'Users with an open socket', lambda: len(connected_users))
+metrics.gauge('chess_sockets', 'Sockets connected to this worker', lambda: len(_socket_rooms()[0]))
+metrics.gauge('chess_lobby_sockets', 'Dashboards subscribed to lobby_diff',
+              lambda: len(_socket_rooms()[1].get(LOBBY_ROOM, ())))
+metrics.distribution('chess_room_sockets', 'Sockets per game room on this worker',
+                     lambda: [len(members) for room, members in _socket_rooms()[1].items()
+                              if room != LOBBY_ROOM],
+                     ROOM_SIZE_BUCKETS)
+metrics.gauge('chess_move_log_pending', 'Move log entries not yet written', move_log.pending)
+metrics.gauge('chess_db_write_pending', 'Writes queued for the database writer', write_queue.pending)
+metrics.gauge('chess_game_archive_pending', 'Finished games not yet archived', game_archive.pending)
+metrics.gauge('chess_bot_queue_depth', 'Bot searches in worker processes', lambda: bot_service.in_flight)
+metrics.gauge('chess_hash_queue_depth', 'Password hashes in flight', lambda: hash_service.in_flight)
+metrics.gauge('chess_match_queue_depth', 'Players waiting for a match', lambda: len(match_queue))
+metrics.gauge('chess_spectators', 'Spectator sockets on this worker', lambda: len(spectator_hub))
+
+def _throttled(username=None):
+    """True when this client IP (or username) used up its login attempts"""
+    if not ip_throttle.allow(request.remote_addr):
+        login_throttled.inc(('ip',))
+        return True
+    if username is not None and not user_throttle.allow(username):
+        login_throttled.inc(('user',))
+        return True
+    return False
 
 @app.route("/")
 def landing():
@@ -80,15 +658,29 @@ def login():
             flash("Username dan password tidak boleh kosong", "error")
             return render_template("login.html")
         
+        # throttled before any hashing, so brute force costs no CPU
+        if _throttled(username):
+            flash("Terlalu banyak percobaan login, coba lagi nanti", "error")
+            return render_template("login.html"), 429
+        
         user = User.query.filter_by(username=username).first()
         if not user:
             flash("Username tidak terdaftar", "error")
             return render_template("login.html")
         
-        if not user.check_password(password):
+        # give the DB connection back while this greenlet waits on the hash,
+        # or a login burst drains the connection pool and stalls every handler
+        db.session.close()
+        try:
+            valid = hash_service.verify(user.password_hash, password)
+        except PasswordBusy:
+            flash("Server sedang sibuk, coba lagi sebentar", "error")
+            return render_template("login.html"), 503
+        if not valid:
             flash("Password salah", "error")
             return render_template("login.html")
         
+        user_throttle.reset(username)
         session["username"] = user.username
         session["user_id"] = user.id
         return redirect(url_for("dashboard"))
@@ -108,14 +700,29 @@ def register():
             flash("Password tidak boleh kosong", "error")
             return render_template("register.html")
         
+        if _throttled():
+            flash("Terlalu banyak percobaan, coba lagi nanti", "error")
+            return render_template("register.html"), 429
+        
         if User.query.filter_by(username=username).first():
             flash("Username sudah dipakai", "error")
             return render_template("register.html")
         
-        user = User(username=username)
-        user.set_password(password)
+        db.session.close()  # as in login(): no connection held while hashing
+        try:
+            password_hash = hash_service.hash(password)
+        except PasswordBusy:
+            flash("Server sedang sibuk, coba lagi sebentar", "error")
+            return render_template("register.html"), 503
+        user = User(username=username, password_hash=password_hash)
         db.session.add(user)
-        db.session.commit()
+        try:
+            db.session.commit()
+        except IntegrityError:
+            # taken by a registration that finished while this one was hashing
+            db.session.rollback()
+            flash("Username sudah dipakai", "error")
+            return render_template("register.html")
         
         session["username"] = user.username
         session["user_id"] = user.id
@@ -128,6 +735,32 @@ def logout():
     session.clear()
     return redirect(url_for("login"))
 
+@app.route("/bot_stats")
+def bot_stats():
+    return jsonify(bot_service.stats())
+
+@app.route("/auth_stats")
+def auth_stats():
+    return jsonify(dict(hash_service.stats(), ip_throttle=ip_throttle.stats(),
+                        user_throttle=user_throttle.stats()))
+
+@app.route("/room_stats")
+def room_stats():
+    return jsonify(dict(room_reaper.stats(), cache=room_cache.stats(), spectators=spectator_hub.stats(),
+                        writes=write_queue.stats()))
+
+@app.route("/metrics")
+def prometheus_metrics():
+    return metrics.render(), 200, {'Content-Type': CONTENT_TYPE}
+
+@app.route("/match_stats")
+def match_stats():
+    return jsonify(match_queue.stats())
+
+@app.route("/shard_stats")
+def shard_stats():
+    return jsonify(shard_router.stats() if shard_router else {'node': None})
+
 @app.route("/dashboard", methods=["GET", "POST"])
 def dashboard():
     if "username" not in session:
@@ -137,6 +770,9 @@ def dashboard():
         room_name = request.form["room_name"].strip()
         room_type = request.form["room_type"]
         mode = request.form.get("room_mode", "pvp")
+        bot_level = request.form.get("bot_level", bot.DEFAULT_BOT_LEVEL) if mode == "bot" else None
+        if bot_level is not None and bot_level not in bot.BOT_LEVELS:
+            bot_level = bot.DEFAULT_BOT_LEVEL
         password = request.form.get("password") if room_type == "private" else None
         room_id = str(uuid.uuid4())
 
@@ -146,71 +782,255 @@ def dashboard():
             type=room_type,
             password=password,
             mode=mode,
+            bot_level=bot_level,
             created_by=session.get("user_id"),
             created_at=datetime.utcnow()
         )
-        db.session.add(new_room)
-        db.session.commit()
+        # committed by the writer; the lobby index and room cache below serve it meanwhile
+        write_queue.submit(_room_insert(new_room))
 
-        # initialize in-memory state for TicTacToe
-        active_rooms[room_id] = {
-            'members': set(),
-            'mode': mode,
-            'players': {'X': None, 'O': None},
-            'board': [''] * 9,
-            'turn': 'X',
-            'winner': None,
-            'rematch_votes': set(),
-            'rematch_requested': False,
-            'rematch_pending': set(),
-            'room_creator': session["username"]
-        }
+        # initialize in-memory state (nothing to replay for a new room)
+        active_rooms[room_id] = _create_room_state(new_room, session["username"], replay=False)
+        room_cache.put(RoomInfo(room_id, room_name, room_type, mode, bot_level, password,
+                                new_room.created_by, session["username"]))
+        entry = _lobby_add(new_room, session["username"])
         
-        # Emit realtime room update to all connected users
-        socketio.emit('room_created', {
-            'room': {
-                'id': room_id,
-                'name': room_name,
-                'type': room_type,
-                'mode': mode,
-                'players': 0,
-                'created_by': session["username"]
-            }
-        })
+        # Realtime room update for dashboards, sent with the next lobby_diff
+        lobby_feed.room_created(entry)
         
         return redirect(url_for("game", room_id=room_id))
     
-    # list rooms with simple counts from in-memory when available
-    try:
-        all_rooms = Room.query.all()
-        room_list = []
-        for r in all_rooms:
-            count = len(active_rooms.get(r.id, {}).get('members', set()))
-            creator_name = "Unknown"
-            if r.created_by:
-                creator = User.query.get(r.created_by)
-                if creator:
-                    creator_name = creator.username
-            
-            room_list.append({
-                'id': r.id,
-                'name': r.name,
-                'type': r.type,
-                'mode': r.mode,
-                'players': count,
-                'created_by': creator_name
-            })
-    except Exception as e:
-        print(f"Error loading rooms: {e}")
-        room_list = []
+    # list rooms from the lobby index with counts from in-memory state
+    room_list = _lobby_listing()
     
     return render_template("dashboard.html", rooms=room_list)
 
+# /api/rooms paging: rooms per page (default, most) and rows read per page at most
+# (limit * ROOM_SCAN_PAGES) so ?free=1 over a lobby of full rooms stays bounded
+ROOM_PAGE_SIZE = 50
+ROOM_PAGE_MAX = 200
+ROOM_SCAN_PAGES = 10
+ROOM_CAPACITY = {'bot': 1}  # players per room mode, 2 for the others
+
+def _room_cursor(created_at, room_id):
+    raw = f"{created_at.isoformat()}|{room_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+def _parse_room_cursor(cursor):
+    """(created_at, room_id) of a cursor from _room_cursor, ValueError otherwise"""
+    raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+    created_at, room_id = raw.split('|', 1)
+    return datetime.fromisoformat(created_at), room_id
+
+def _room_page(filters, after, limit, free_only):
+    """(rooms, next cursor or None) in (created_at, id) order, starting after `after`"""
+    page = []
+    budget = limit * ROOM_SCAN_PAGES
+    while budget > 0:
+        query = Room.query.filter(*filters)
+        if after:
+            # a row-value comparison, which the indexes serve as a range
+            query = query.filter(db.tuple_(Room.created_at, Room.id) > after)
+        rows = query.order_by(Room.created_at, Room.id).limit(limit).all()
+        budget -= limit
+        for room in rows:
+            entry = lobby_index.get(room.id)
+            players = entry['players'] if entry else 0
+            capacity = ROOM_CAPACITY.get(room.mode, 2)
+            if free_only and players >= capacity:
+                continue
+            page.append({
+                'id': room.id,
+                'name': room.name,
+                'type': room.type,
+                'mode': room.mode,
+                'players': players,
+                'capacity': capacity,
+                'created_by': entry['created_by'] if entry else "Unknown",
+                'created_at': room.created_at.isoformat()
+            })
+            if len(page) == limit:
+                return page, _room_cursor(room.created_at, room.id)
+        if len(rows) < limit:
+            return page, None
+        after = (rows[-1].created_at, rows[-1].id)
+    return page, _room_cursor(*after)
+
+@app.route("/api/rooms")
+def api_rooms():
+    """
+    Room listing, oldest first, for clients that poll:
+        ?type=public|private  ?mode=pvp|bot|chess  ?free=1 (a seat is open)
+        ?limit=50  ?after=<'next' of the previous page>
+    The weak ETag is the lobby version, so a poll while nothing changed is
+    answered 304 before any query or serialization.  The listing is read
+    from committed rows, and room writes raise the version only once the
+    writer has committed them, so an ETag never stamps a stale listing.
+    """
+    if "username" not in session:
+        return jsonify({'error': 'Not authenticated'}), 401
+    # read before the query: a change racing with it only makes the next poll a 200
+    etag = f"lobby-{active_rooms.lobby_version()}"
+    if request.if_none_match.contains_weak(etag):
+        response = app.response_class(status=304)
+    else:
+        try:
+            limit = int(request.args.get('limit', ROOM_PAGE_SIZE))
+            after = _parse_room_cursor(request.args['after']) if request.args.get('after') else None
+        except ValueError:
+            return jsonify({'error': 'invalid limit or after'}), 400
+        if not 1 <= limit <= ROOM_PAGE_MAX:
+            return jsonify({'error': f'limit must be 1..{ROOM_PAGE_MAX}'}), 400
+        filters = [getattr(Room, column) == request.args[column]
+                   for column in ('type', 'mode') if request.args.get(column)]
+        rooms, cursor = _room_page(filters, after, limit, request.args.get('free') in ('1', 'true'))
+        response = jsonify({'rooms': rooms, 'next': cursor})
+    response.set_etag(etag, weak=True)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+GAME_PAGE_SIZE = 50
+REPLAY_CHUNK = 256  # record bytes read per query while streaming a replay
+
+def _game_header(row):
+    mode, opener, result = decode_header(row.header)
+    return {
+        'id': row.id,
+        'room_id': row.room_id,
+        'mode': mode,
+        'players': [row.first_player, row.second_player],
+        'opener': opener,
+        'result': result,
+        'plies': row.plies,
+        'ended_at': row.ended_at,
+    }
+
+def _game_rows(*filters):
+    # the 2-byte header is sliced in SQL: a listing never loads the moves
+    return db.session.query(GameRecord.id, GameRecord.room_id, GameRecord.first_player,
+                            GameRecord.second_player, GameRecord.plies, GameRecord.ended_at,
+                            db.func.substr(GameRecord.record, 1, HEADER_SIZE).label('header')
+                            ).filter(*filters)
+
+def _live_state(room_id):
+    """A room's state for the read-only HTTP views: the live copy on the worker
+    keeping it, otherwise rebuilt from the move log (None if the room is gone)"""
+    if room_id not in lobby_index:
+        return None
+    state = active_rooms.get(room_id) if not shard_router or shard_router.owns(room_id) else None
+    return state or _rehydrate(room_id)
+
+def _live_header(room_id, state):
+    """_game_header() of the game being played in a room"""
+    return {
+        'id': None,
+        'room_id': room_id,
+        'mode': state.mode,
+        'players': list(state.seats),
+        'opener': state.opener,
+        'result': state.winner,
+        'plies': sum(1 for _ in iter_moves(state.mode, state.packed)),
+        'ended_at': None,
+    }
+
+def _replay_lines(header, read):
+    """NDJSON replay: the header line, then a line per move. read(offset, size)
+    returns up to `size` bytes of the packed moves, starting at `offset`."""
+    yield json.dumps(header) + "\n"
+    first, second = marks_for(header['mode'])
+    mark, other = (first, second) if header['opener'] == first else (second, first)
+    key = 'move' if header['mode'] == 'chess' else 'index'
+    offset, ply = 0, 0
+    while True:
+        chunk = read(offset, REPLAY_CHUNK)
+        consumed = 0
+        for consumed, move in iter_moves(header['mode'], chunk or b''):
+            ply += 1
+            yield json.dumps({'ply': ply, 'mark': mark, key: move}) + "\n"
+            mark, other = other, mark
+        # a move cut by the chunk boundary is read again with the next chunk
+        if not chunk or len(chunk) < REPLAY_CHUNK or not consumed:
+            break
+        offset += consumed
+
+@app.route("/api/rooms/<room_id>/games")
+def api_room_games(room_id):
+    """
+    Archived games of a room, newest first: ?limit=50 ?before=<'next' of the
+    previous page>.  The first page starts with the game in progress, if
+    any (id null, replayed by /api/rooms/<room_id>/replay), then the games
+    the writer has not committed yet (id null until it does).
+    """
+    if "username" not in session:
+        return jsonify({'error': 'Not authenticated'}), 401
+    try:
+        limit = int(request.args.get('limit', GAME_PAGE_SIZE))
+        before = int(request.args['before']) if request.args.get('before') else None
+    except ValueError:
+        return jsonify({'error': 'invalid limit or before'}), 400
+    if not 1 <= limit <= ROOM_PAGE_MAX:
+        return jsonify({'error': f'limit must be 1..{ROOM_PAGE_MAX}'}), 400
+    filters = [GameRecord.room_id == room_id]
+    if before:
+        filters.append(GameRecord.id < before)
+    while True:
+        written = write_queue.written
+        queued = [] if before else game_archive.queued(room_id)
+        rows = _game_rows(*filters).order_by(GameRecord.id.desc()).limit(limit).all()
+        if write_queue.written == written:  # no writer pass committed part of `queued` meanwhile
+            break
+    games = [_game_header(row) for row in rows]
+    cursor = games[-1]['id'] if len(games) == limit else None
+    # a game that just ended is listed before the writer commits it, without an id yet
+    games[:0] = [_game_header(SimpleNamespace(**row, id=None, header=row['record'][:HEADER_SIZE]))
+                 for row in reversed(queued)]
+    state = None if before else _live_state(room_id)
+    if state is not None and state.packed and not state.winner:  # a finished game is archived already
+        games.insert(0, _live_header(room_id, state))
+    return jsonify({'games': games, 'next': cursor})
+
+@app.route("/api/games/<int:game_id>/replay")
+def api_game_replay(game_id):
+    """
+    One archived game as NDJSON: the header line, then a line per move.
+    The record is read REPLAY_CHUNK bytes at a time, so the response starts
+    at once and memory stays flat however long the game.
+    """
+    if "username" not in session:
+        return jsonify({'error': 'Not authenticated'}), 401
+    row = _game_rows(GameRecord.id == game_id).first()
+    if row is None:
+        return jsonify({'error': 'Game not found'}), 404
+    header = _game_header(row)
+
+    def read(offset, size):
+        # substr() counts from 1
+        return db.session.query(db.func.substr(GameRecord.record, HEADER_SIZE + 1 + offset, size)
+                                ).filter(GameRecord.id == game_id).scalar()
+
+    def lines():
+        yield from _replay_lines(header, read)
+        db.session.remove()
+
+    return app.response_class(stream_with_context(lines()), mimetype='application/x-ndjson')
+
+@app.route("/api/rooms/<room_id>/replay")
+def api_live_replay(room_id):
+    """The game being played in a room, as NDJSON like /api/games/<id>/replay"""
+    if "username" not in session:
+        return jsonify({'error': 'Not authenticated'}), 401
+    state = _live_state(room_id)
+    if state is None:
+        return jsonify({'error': 'Room not found'}), 404
+    header, packed = _live_header(room_id, state), state.packed  # bytes: a snapshot of the game
+    return app.response_class(_replay_lines(header, lambda offset, size: packed[offset:offset + size]),
+                              mimetype='application/x-ndjson')
+
 @app.route("/game/<room_id>")
 def game(room_id):
     if "username" not in session:
         return redirect(url_for("login"))
-    room = Room.query.filter_by(id=room_id).first()
+    room = _room_info(room_id)
     if not room:
         return redirect(url_for("dashboard"))
 
@@ -238,41 +1058,60 @@ def game(room_id):
                 ra[room_id] = True
                 session['room_access'] = ra
 
-    # ensure in-memory state exists
+    # ensure in-memory state exists (rebuilt from the move log after a restart)
     if room_id not in active_rooms:
-        creator_name = "Unknown"
-        if room.created_by:
-            creator = User.query.get(room.created_by)
-            if creator:
-                creator_name = creator.username
-        
-        active_rooms[room_id] = {
-            'members': set(),
-            'mode': room.mode,
-            'players': {'X': None, 'O': None},
-            'board': [''] * 9,
-            'turn': 'X',
-            'winner': None,
-            'rematch_votes': set(),
-            'rematch_requested': False,
-            'rematch_pending': set(),
-            'room_creator': creator_name
-        }
-    return render_template("game.html", room_id=room_id, username=session["username"])
+        active_rooms.setdefault(room_id, _create_room_state(room))
+    template = "chess.html" if room.mode == 'chess' else "game.html"
+    return render_template(template, room_id=room_id, username=session["username"])
 
 @socketio.on("connect")
 def handle_connect():
     username = session.get("username")
     if username:
         connected_users.add(username)
-        emit('user_connected', {'username': username})
+        lobby_feed.user_connected(username)
 
 @socketio.on("disconnect")
 def handle_disconnect():
     username = session.get("username")
     if username:
         connected_users.discard(username)
-        emit('user_disconnected', {'username': username})
+        lobby_feed.user_disconnected(username)
+        ticket = match_queue.get(username)
+        if ticket and ticket.data[0] == request.sid:
+            match_queue.cancel(username)
+        _unwatch()
+        # a closed tab must not stay a member of its rooms (or keep them from the reaper)
+        for room_id in rooms():
+            if room_id not in (request.sid, LOBBY_ROOM):
+                _drop_member({'room_id': room_id})
+
+@socketio.on("join_lobby")
+def handle_join_lobby(data=None):
+    """Dashboards subscribe to lobby_diff; game pages never join this room"""
+    join_room(LOBBY_ROOM)
+
+@socketio.on("find_match")
+def handle_find_match(data=None):
+    """Queue for a rated pvp game; match_found and ttt_init follow once paired"""
+    username = session.get("username")
+    if not username:
+        emit("error", {"message": "Not authenticated"})
+        return
+    user = User.query.filter_by(username=username).first()
+    if not user:
+        return
+    pair = match_queue.enqueue(username, user.rating, (request.sid, user.id))
+    if pair:
+        _start_match(*pair)
+    else:
+        emit('match_queued', {'rating': user.rating, 'queued': len(match_queue)})
+
+@socketio.on("cancel_match")
+def handle_cancel_match(data=None):
+    username = session.get("username")
+    if username and match_queue.cancel(username):
+        emit('match_cancelled', {})
 
 @socketio.on("join_room")
 def handle_join(data):
@@ -285,7 +1124,7 @@ def handle_join(data):
         emit("error", {"message": "Not authenticated"})
         return
 
-    room = Room.query.filter_by(id=room_id).first()
+    room = _room_info(room_id)
     if not room:
         emit("error", {"message": "Room not found"})
         return
@@ -306,269 +1145,392 @@ def handle_join(data):
                 emit("error", {"message": "Wrong room password"})
                 return
 
-    # initialize state if needed
+    _unwatch()
+    _join_owned(dict(data, room_id=room_id), room=room)
+
+def _spectate(room_id, state, client):
+    """Watch a room: its spectator tier instead of its socket room, and a first snapshot right away.
+    Spectators are fed by the room's owner, whatever worker they are connected to."""
+    _enter_room(spectator_hub.add(client.sid, room_id), client)
+    socketio.emit('spectate_snapshot', dict(_spectator_payload(room_id, state),
+                                            spectators=spectator_hub.count(room_id)), to=client.sid)
+
+def _unwatch():
+    """Stop watching: leave the tier room here, and the room owner's hub forgets the socket"""
+    for room in rooms():
+        if room.startswith('watch:'):
+            leave_room(room)
+            _forget_spectator({'room_id': room.split(':')[2]})  # watch:<hub>:<room_id>:<tier>
+
+@_room_event
+def _forget_spectator(data, client):
+    spectator_hub.remove(client.sid)
+
+@_room_event
+def _join_owned(data, client, room=None):
+    """Room-state half of handle_join, run on the worker owning the room"""
+    room_id = data['room_id']
+    username = client.username
+    if room is None:
+        room = _room_info(room_id)
+        if not room:
+            return
+
+    # asked to watch, or the seats are taken (by players who may be disconnected,
+    # their seats stay theirs): join as a spectator, not as a member
     state = active_rooms.get(room_id)
-    if not state:
-        creator_name = "Unknown"
-        if room.created_by:
-            creator = User.query.get(room.created_by)
-            if creator:
-                creator_name = creator.username
-        
-        state = {
-            'members': set(),
-            'mode': room.mode,
-            'players': {'X': None, 'O': None},
-            'board': [''] * 9,
-            'turn': 'X',
-            'winner': None,
-            'rematch_votes': set(),
-            'rematch_requested': False,
-            'rematch_pending': set(),
-            'room_creator': creator_name
-        }
-        active_rooms[room_id] = state
+    if state is None and data.get('spectate'):
+        state = _rehydrate(room_id)  # out of memory: a copy, only for the first snapshot
+    if state is not None and username not in state.members and state.mark_of(username) is None:
+        if (data.get('spectate') or None not in state.seats
+                or len(state.members) >= (1 if room.mode == 'bot' else 2)):
+            _spectate(room_id, state, client)
+            return
+
+    # initialize state if needed
+    def create_state():
+        return _create_room_state(room)
 
-    # enforce player limit
-    current_players = state['members']
+    with active_rooms.transaction(room_id, create=create_state) as state:
+        _join_state(room, room_id, client, state, data)
+
+def _join_state(room, room_id, client, state, data):
+    """Rest of handle_join, run inside the room transaction"""
+    username = client.username
+    # enforce player limit; a seated player always gets back in
+    current_players = state.members
+    seated = state.mark_of(username) is not None
     if room.mode == 'bot':
-        if len(current_players) >= 1 and username not in current_players:
-            emit("error", {"message": "Room full (vs computer)"})
+        if len(current_players) >= 1 and username not in current_players and not seated:
+            socketio.emit("error", {"message": "Room full (vs computer)"}, to=client.sid)
             return
     else:
-        if len(current_players) >= 2 and username not in current_players:
-            emit("error", {"message": "Room full (2 players max)"})
+        if len(current_players) >= 2 and username not in current_players and not seated:
+            socketio.emit("error", {"message": "Room full (2 players max)"}, to=client.sid)
             return
 
-    join_room(room_id)
-    state['members'].add(username)
+    _enter_room(room_id, client)
+    state.add_member(username, client.sid)
     
-    # assign marks X/O
-    your_mark = None
-    if state['players']['X'] is None:
-        state['players']['X'] = username
-        your_mark = 'X'
-        if room.mode == 'bot':
-            state['players']['O'] = 'COMPUTER'
-    elif state['players']['O'] is None and room.mode == 'pvp':
-        state['players']['O'] = username
-        your_mark = 'O'
-    elif room.mode == 'bot':
-        # already has X human and O = COMPUTER
-        your_mark = 'X' if state['players']['X'] == username else None
-
-    # Emit realtime room update to dashboard
-    socketio.emit('room_updated', {
-        'room_id': room_id,
-        'players': len(state['members'])
-    })
+    # assign marks X/O (white/black for chess), keeping the mark of a returning player
+    first, second = state.marks
+    your_mark = state.mark_of(username)
+    if your_mark is None:
+        if state.player(first) is None:
+            state.seat(first, username)
+            your_mark = first
+            move_log.append(room_id, 'seat', first, username)
+            if room.mode == 'bot':
+                state.seat(second, 'COMPUTER')
+                move_log.append(room_id, 'seat', second, 'COMPUTER')
+        elif state.player(second) is None and room.mode != 'bot':
+            state.seat(second, username)
+            your_mark = second
+            move_log.append(room_id, 'seat', second, username)
+
+    # Realtime room update for dashboards (batched into lobby_diff)
+    _lobby_set_players(room_id, len(state.members))
 
     # notify the joiner with game state
-    emit('ttt_init', {
-        'board': state['board'],
-        'turn': state['turn'],
-        'winner': state['winner'],
-        'you': your_mark,
-        'players': state['players'],
-        'mode': state['mode'],
-        'room_creator': state['room_creator'],
-        'is_creator': username == state['room_creator']
-    })
+    if room.mode == 'chess':
+        socketio.emit('chess_init', {
+            'fen': state.game.fen(),
+            'moves': state.game.moves,
+            'turn': state.turn,
+            'winner': state.winner,
+            'you': your_mark,
+            'players': state.players,
+            'mode': state.mode,
+            'room_creator': state.room_creator,
+            'is_creator': username == state.room_creator
+        }, to=client.sid)
+    else:
+        init = _ttt_init(state, username, your_mark)
+        # a reconnecting client sends the last seq it applied and only gets what it missed
+        deltas = _deltas_since(state, data.get('since'))
+        if deltas is None:
+            init['board'] = state.game.to_list()
+        else:
+            init['deltas'] = deltas
+        socketio.emit('ttt_init', init, to=client.sid)
     
     # notify room about players update
-    emit("players_update", {
-        "players": state['players'],
-        "members": list(state['members']),
-        "room_creator": state['room_creator']
-    }, room=room_id)
-
-def _check_winner(board):
-    wins = [
-        (0,1,2),(3,4,5),(6,7,8),
-        (0,3,6),(1,4,7),(2,5,8),
-        (0,4,8),(2,4,6)
-    ]
-    for a,b,c in wins:
-        if board[a] and board[a] == board[b] == board[c]:
-            return board[a]
-    if all(cell for cell in board):
-        return 'draw'
-    return None
-
-def _bot_move(board):
-    import random
-    empties = [i for i,v in enumerate(board) if not v]
-    return random.choice(empties) if empties else None
+    socketio.emit("players_update", {
+        "players": state.players,
+        "members": list(state.members),
+        "room_creator": state.room_creator
+    }, to=room_id)
+
+def _ttt_init(state, username, your_mark):
+    return {
+        'seq': state.seq,
+        'turn': state.turn,
+        'winner': state.winner,
+        'you': your_mark,
+        'players': state.players,
+        'mode': state.mode,
+        'room_creator': state.room_creator,
+        'is_creator': username == state.room_creator
+    }
+
+def _bot_move(game, mark, level):
+    return bot_service.compute(game, mark, level)
+
+def _play_bot_turn(room_id, bot_mark):
+    """Background task: compute the bot reply and broadcast it when ready"""
+    state = active_rooms.get(room_id)
+    if not state:
+        return
+    game = state.game
+    position = (game.x, game.o)
+    bi = _bot_move(game, bot_mark, state.bot_level)
+    with active_rooms.transaction(room_id) as state:
+        # the room may have been reset or dissolved while the bot was thinking
+        if not state or (state.game.x, state.game.o) != position:
+            return
+        if bi is None or state.winner or state.turn != bot_mark:
+            return
+        move_log.append(room_id, 'move', bot_mark, bi)
+        socketio.emit('ttt_update', _apply_ttt_move(state, bi, bot_mark), room=room_id)
+        if state.winner:
+            _archive_game(room_id, state)
 
 @socketio.on('ttt_move')
-def on_ttt_move(data):
+@_room_event
+def on_ttt_move(data, client):
     room_id = data.get('room_id')
     index = data.get('index')
-    username = session.get('username')
-    if room_id not in active_rooms or index is None or username is None:
-        return
-    state = active_rooms[room_id]
-    board = state['board']
-    if state['winner']:
-        return
-    # Determine player's mark
-    mark = 'X' if state['players'].get('X') == username else ('O' if state['players'].get('O') == username else None)
-    if mark is None:
-        emit('error', {'message': 'You are a spectator'})
+    username = client.username
+    if not room_id or index is None or username is None:
         return
-    if state['turn'] != mark:
+    bot_mark = rated = None
+    with active_rooms.transaction(room_id, create=lambda: _rehydrate(room_id)) as state:
+        if not state:
+            return
+        game = state.game
+        if state.winner or state.mode == 'chess':
+            return
+        # Determine player's mark
+        mark = state.mark_of(username)
+        if mark is None:
+            socketio.emit('error', {'message': 'You are a spectator'}, to=client.sid)
+            return
+        if state.turn != mark:
+            return
+        if not isinstance(index, int) or not game.is_free(index):
+            return
+        # apply move (queued for the move log, never committed here)
+        move_log.append(room_id, 'move', mark, index)
+        socketio.emit('ttt_update', _apply_ttt_move(state, index, mark), to=room_id)
+        if state.winner:
+            _archive_game(room_id, state)
+        if state.winner and state.mode == 'pvp':
+            rated = (state.seats, 0.5 if state.winner == 'draw' else float(state.winner == state.marks[0]))
+
+        # bot move if needed, computed off the handler so the human move goes out first
+        if not state.winner and state.mode == 'bot':
+            bot_mark = state.other_mark(mark)
+            # ensure bot is assigned that mark
+            if state.player(bot_mark) != 'COMPUTER' or state.turn != bot_mark:
+                bot_mark = None
+    # started after the transaction so the bot sees the committed human move
+    if bot_mark:
+        socketio.start_background_task(_play_bot_turn, room_id, bot_mark)
+    if rated:
+        socketio.start_background_task(_rate_game, room_id, *rated)
+
+@socketio.on('ttt_sync')
+@_room_event
+def on_ttt_sync(data, client):
+    """Client saw a gap in ttt_update seq numbers: send the missing deltas or a snapshot"""
+    room_id = data.get('room_id')
+    state = active_rooms.get(room_id) or _rehydrate(room_id)
+    if not state or not client.username or state.mode == 'chess':
         return
-    if index < 0 or index > 8 or board[index]:
+    deltas = _deltas_since(state, data.get('since'))
+    if deltas is not None:
+        socketio.emit('ttt_deltas', {'deltas': deltas}, to=client.sid)
+    else:
+        socketio.emit('ttt_snapshot', {
+            'seq': state.seq,
+            'board': state.game.to_list(),
+            'turn': state.turn,
+            'winner': state.winner
+        }, to=client.sid)
+
+@socketio.on('chess_move')
+@_room_event
+def on_chess_move(data, client):
+    room_id = data.get('room_id')
+    move = data.get('move')  # UCI, e.g. 'e2e4' or 'e7e8q'
+    username = client.username
+    if not room_id or not move or username is None:
         return
-    # apply move
-    board[index] = mark
-    state['winner'] = _check_winner(board)
-    if not state['winner']:
-        state['turn'] = 'O' if state['turn'] == 'X' else 'X'
-
-    emit('ttt_update', {
-        'board': board,
-        'turn': state['turn'],
-        'winner': state['winner'],
-        'last': {'index': index, 'mark': mark}
-    }, room=room_id)
-
-    # bot move if needed
-    if not state['winner'] and state['mode'] == 'bot':
-        bot_mark = 'O' if mark == 'X' else 'X'
-        # ensure bot is assigned that mark
-        if state['players'].get(bot_mark) == 'COMPUTER' and state['turn'] == bot_mark:
-            bi = _bot_move(board)
-            if bi is not None:
-                board[bi] = bot_mark
-                state['winner'] = _check_winner(board)
-                if not state['winner']:
-                    state['turn'] = 'O' if state['turn'] == 'X' else 'X'
-                emit('ttt_update', {
-                    'board': board,
-                    'turn': state['turn'],
-                    'winner': state['winner'],
-                    'last': {'index': bi, 'mark': bot_mark}
-                }, room=room_id)
+    with active_rooms.transaction(room_id, create=lambda: _rehydrate(room_id)) as state:
+        if not state:
+            return
+        game = state.game
+        if state.winner or state.mode != 'chess':
+            return
+        mark = state.mark_of(username)
+        if mark is None:
+            socketio.emit('error', {'message': 'You are a spectator'}, to=client.sid)
+            return
+        if state.turn != mark:
+            return
+        try:
+            reason = _apply_chess_move(state, move)
+        except ValueError:
+            socketio.emit('error', {'message': 'Langkah tidak valid'}, to=client.sid)
+            return
+        move_log.append(room_id, 'move', mark, game.moves[-1])
+        if state.winner:
+            _archive_game(room_id, state)
+
+        socketio.emit('chess_update', {
+            'fen': game.fen(),
+            'turn': state.turn,
+            'winner': state.winner,
+            'reason': reason,
+            'last': {'move': game.moves[-1], 'mark': mark}
+        }, to=room_id)
 
 @socketio.on('ttt_rematch_request')
-def on_ttt_rematch_request(data):
+@_room_event
+def on_ttt_rematch_request(data, client):
     room_id = data.get('room_id')
-    username = session.get('username')
-    if not room_id or room_id not in active_rooms or not username:
+    username = client.username
+    if not room_id or not username:
         return
     
-    state = active_rooms[room_id]
+    with active_rooms.transaction(room_id, create=lambda: _rehydrate(room_id)) as state:
+        if not state:
+            return
     
-    # Only room creator can request rematch
-    if username != state['room_creator']:
-        emit('error', {'message': 'Hanya pembuat room yang bisa request rematch'})
-        return
+        # Only room creator can request rematch
+        if username != state.room_creator:
+            socketio.emit('error', {'message': 'Hanya pembuat room yang bisa request rematch'}, to=client.sid)
+            return
     
-    # Only allow when game is over
-    if not state.get('winner'):
-        emit('error', {'message': 'Game belum selesai'})
-        return
+        # Only allow when game is over
+        if not state.winner:
+            socketio.emit('error', {'message': 'Game belum selesai'}, to=client.sid)
+            return
     
-    # Set rematch as requested
-    state['rematch_requested'] = True
-    state['rematch_pending'] = set()
+        # Set rematch as requested
+        state.rematch_requested = True
+        state.rematch_pending = ()
     
-    # Add creator's vote
-    mark = 'X' if state['players'].get('X') == username else ('O' if state['players'].get('O') == username else None)
-    if mark:
-        state['rematch_votes'].add(mark)
+        # Add creator's vote
+        mark = state.mark_of(username)
+        if mark:
+            state.vote(mark)
     
-    # Notify other players about rematch request
-    emit('rematch_requested', {
-        'requested_by': username,
-        'creator_vote': mark
-    }, room=room_id)
+        # Notify other players about rematch request
+        socketio.emit('rematch_requested', {
+            'requested_by': username,
+            'creator_vote': mark
+        }, to=room_id)
 
 @socketio.on('ttt_rematch_response')
-def on_ttt_rematch_response(data):
+@_room_event
+def on_ttt_rematch_response(data, client):
     room_id = data.get('room_id')
     response = data.get('response')  # 'accept' or 'decline'
-    username = session.get('username')
+    username = client.username
     
-    if not room_id or room_id not in active_rooms or not username:
+    if not room_id or not username:
         return
     
-    state = active_rooms[room_id]
+    with active_rooms.transaction(room_id, create=lambda: _rehydrate(room_id)) as state:
+        if not state:
+            return
     
-    if not state.get('rematch_requested'):
-        emit('error', {'message': 'Tidak ada request rematch'})
-        return
+        if not state.rematch_requested:
+            socketio.emit('error', {'message': 'Tidak ada request rematch'}, to=client.sid)
+            return
     
-    if username == state['room_creator']:
-        emit('error', {'message': 'Anda adalah pembuat room'})
-        return
+        if username == state.room_creator:
+            socketio.emit('error', {'message': 'Anda adalah pembuat room'}, to=client.sid)
+            return
     
-    if response == 'accept':
-        # Add player's vote
-        mark = 'X' if state['players'].get('X') == username else ('O' if state['players'].get('O') == username else None)
-        if mark:
-            state['rematch_votes'].add(mark)
-            state['rematch_pending'].add(username)
+        if response == 'accept':
+            # Add player's vote
+            mark = state.mark_of(username)
+            if mark:
+                state.vote(mark)
+                state.add_pending(username)
         
-        # Check if both players voted
-        if len(state['rematch_votes']) >= 2:
-            # Reset game
-            state['board'] = [''] * 9
-            state['winner'] = None
-            state['turn'] = 'O' if state['turn'] == 'X' else 'X'
-            state['rematch_votes'].clear()
-            state['rematch_requested'] = False
-            state['rematch_pending'].clear()
-            
-            emit('ttt_reset', {
-                'board': state['board'],
-                'turn': state['turn']
-            }, room=room_id)
-        else:
-            emit('rematch_status', {
-                'votes': list(state['rematch_votes']),
-                'pending': list(state['rematch_pending'])
-            }, room=room_id)
+            # Check if both players voted
+            if len(state.voted()) >= 2:
+                # Reset game, the move log starts over from the new game
+                delta = _apply_reset(state)
+                _checkpoint(room_id, state)
+                if state.mode == 'chess':
+                    socketio.emit('chess_reset', {
+                        'fen': state.game.fen(),
+                        'turn': state.turn,
+                        'players': state.players
+                    }, to=room_id)
+                else:
+                    socketio.emit('ttt_reset', delta, to=room_id)
+            else:
+                socketio.emit('rematch_status', {
+                    'votes': state.voted(),
+                    'pending': list(state.rematch_pending)
+                }, to=room_id)
     
-    elif response == 'decline':
-        # Reset rematch state
-        state['rematch_requested'] = False
-        state['rematch_votes'].clear()
-        state['rematch_pending'].clear()
+        elif response == 'decline':
+            # Reset rematch state
+            state.clear_rematch()
         
-        emit('rematch_declined', {
-            'declined_by': username
-        }, room=room_id)
+            socketio.emit('rematch_declined', {
+                'declined_by': username
+            }, to=room_id)
 
 @socketio.on('dissolve_room')
-def on_dissolve_room(data):
+@_room_event
+def on_dissolve_room(data, client):
     room_id = data.get('room_id')
-    username = session.get('username')
+    username = client.username
     
     if not room_id or not username:
         return
     
-    state = active_rooms.get(room_id)
+    state = active_rooms.get(room_id) or _rehydrate(room_id)
     if not state:
         return
     
     # Only room creator can dissolve room
-    if username != state['room_creator']:
-        emit('error', {'message': 'Hanya pembuat room yang bisa dissolve room'})
+    if username != state.room_creator:
+        socketio.emit('error', {'message': 'Hanya pembuat room yang bisa dissolve room'}, to=client.sid)
         return
     
-    # Emit realtime room update to dashboard
-    socketio.emit('room_dissolved', {'room_id': room_id})
-    
-    # delete from memory and database if exists
+    # keep a game cut short, then delete from memory and database (_lobby_remove tells the dashboards)
+    if state.packed and not state.winner:
+        _archive_game(room_id, state)
     active_rooms.pop(room_id, None)
-    room = Room.query.filter_by(id=room_id).first()
-    if room:
-        db.session.delete(room)
-        db.session.commit()
+    _lobby_remove(room_id)
+    room_cache.invalidate(room_id)
+    move_log.discard(room_id)
+    write_queue.submit(_room_delete(room_id))
     
-    emit('room_dissolved', {'room_id': room_id}, room=room_id)
+    socketio.emit('room_dissolved', {'room_id': room_id}, to=room_id)
+
+@_room_event
+def _drop_member(data, client):
+    """The member's socket went away: free the member slot (unless another
+    of their sockets is still in the room) but keep the seat and the room"""
+    room_id = data['room_id']
+    with active_rooms.transaction(room_id) as state:
+        if not state or not state.drop_socket(client.sid):
+            return
+        _lobby_set_players(room_id, len(state.members))
+        socketio.emit("players_update", {
+            "players": state.players,
+            "members": list(state.members),
+            "room_creator": state.room_creator
+        }, to=room_id)
 
 @socketio.on("leave_room")
 def on_leave(data):
@@ -578,33 +1540,39 @@ def on_leave(data):
         return
     
     leave_room(room_id)
-    state = active_rooms.get(room_id)
-    if state and username in state['members']:
-        state['members'].remove(username)
+    _unwatch()
+    _leave_owned(dict(data, room_id=room_id))
+
+@_room_event
+def _leave_owned(data, client):
+    """Room-state half of on_leave, run on the worker owning the room"""
+    room_id = data['room_id']
+    with active_rooms.transaction(room_id) as state:
+        # a member with another tab still in the room stays
+        username = state and state.drop_socket(client.sid)
+        if not username:
+            return
         
-        # Emit realtime room update to dashboard
-        socketio.emit('room_updated', {
-            'room_id': room_id,
-            'players': len(state['members'])
-        })
+        # Realtime room update for dashboards (batched into lobby_diff)
+        _lobby_set_players(room_id, len(state.members))
         
-        emit("user_left", {
+        socketio.emit("user_left", {
             "username": username, 
-            "players": list(state['members'])
-        }, room=room_id)
+            "players": list(state.members)
+        }, to=room_id)
         
-        # cleanup if empty
-        if not state['members']:
+        # cleanup if empty (a game cut short is archived first)
+        if not state.members:
+            if state.packed and not state.winner:
+                _archive_game(room_id, state)
             active_rooms.pop(room_id, None)
-            room = Room.query.filter_by(id=room_id).first()
-            if room:
-                db.session.delete(room)
-                db.session.commit()
-            
-            # Emit realtime room update to dashboard
-            socketio.emit('room_dissolved', {'room_id': room_id})
+            _lobby_remove(room_id)
+            room_cache.invalidate(room_id)
+            move_log.discard(room_id)
+            write_queue.submit(_room_delete(room_id))
 
 if __name__ == "__main__":
+    start_services()
     socketio.run(app, debug=True)
 
 # For Heroku production
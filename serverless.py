@@ -0,0 +1,96 @@
+"""
+Cold-start helpers for the serverless entries (api/index.py, api/simple.py).
+
+A Vercel function instance imports its entry when it serves its first
+request, so whatever the module does at import is added to that response.
+The entries keep the import down to Flask, Flask-SQLAlchemy and the routes:
+
+  lazy database    the models and the schema load on the first request
+                   that needs them, once per instance, not at import or
+                   on every / (Flask rejects init_app after the first
+                   request, so the extension itself is registered at
+                   import; its engine does not connect until then)
+  templates        api/templates is compiled to Python modules ahead of
+                   time (api/templates_compiled), so the first render of
+                   a page imports its code instead of lexing, parsing and
+                   compiling the template
+
+SERVERLESS_COLD_START=0 turns this off: everything loads at import and
+templates compile from source on first render, as for a long-running
+server where the import is paid once.
+
+Recompile after editing a template (a stale or missing compiled copy is
+ignored, the source is used):
+
+    python serverless.py
+"""
+
+import hashlib
+import json
+import os
+
+TEMPLATES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'api', 'templates')
+COMPILED = os.path.join(os.path.dirname(TEMPLATES), 'templates_compiled')
+MANIFEST = 'manifest.json'
+
+
+def cold_start_enabled():
+    return os.environ.get('SERVERLESS_COLD_START', '1') != '0'
+
+
+def _digests(folder):
+    digests = {}
+    for name in sorted(os.listdir(folder)):
+        if name.endswith('.html'):
+            with open(os.path.join(folder, name), 'rb') as f:
+                digests[name] = hashlib.sha1(f.read()).hexdigest()
+    return digests
+
+
+def use_compiled_templates(app, compiled=COMPILED):
+    """
+    Render `app`'s templates from their compiled modules, before its Jinja
+    environment is created; False (sources used) when disabled or stale
+    """
+    if not cold_start_enabled():
+        return False
+    try:
+        with open(os.path.join(compiled, MANIFEST)) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return False
+    if manifest != _digests(os.path.join(app.root_path, app.template_folder)):
+        print("Compiled templates are stale, rendering from source (run: python serverless.py)")
+        return False
+    from jinja2 import ModuleLoader
+
+    app.jinja_options = dict(app.jinja_options, loader=ModuleLoader(compiled))
+    return True
+
+
+def compile_templates(app, compiled=COMPILED):
+    """Compile `app`'s templates with its own environment (autoescape, extensions)"""
+    source = os.path.join(app.root_path, app.template_folder)
+    os.makedirs(compiled, exist_ok=True)
+    for name in os.listdir(compiled):
+        if name.startswith('tmpl_') and name.endswith('.py'):
+            os.remove(os.path.join(compiled, name))
+    app.jinja_env.compile_templates(compiled, zip=None, ignore_errors=False,
+                                    filter_func=lambda name: name.endswith('.html'))
+    digests = _digests(source)
+    with open(os.path.join(compiled, MANIFEST), 'w') as f:
+        json.dump(digests, f, indent=2, sort_keys=True)
+        f.write('\n')
+    return digests
+
+
+def main():
+    from flask import Flask
+
+    app = Flask(__name__, template_folder=TEMPLATES)
+    for name in compile_templates(app):
+        print(f"compiled {name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,335 @@
+"""
+Room-affinity sharding across worker processes.
+
+Every room is owned by one worker, chosen by consistent hashing of its
+room_id.  The owner keeps the room state hot in its own memory, so a move
+never round-trips through the shared store.  A worker that receives an
+event for a room it does not own forwards it to the owner over the shared
+store's pub/sub; the owner's emits reach the client through the Socket.IO
+message queue as usual.
+
+Workers register in a shared node set.  When one joins or leaves, every
+worker rebuilds its ring from that set and writes the rooms it no longer
+owns back to the shared store, where the new owner loads them on first
+access.  Only the rooms whose arc of the ring changed hands move.
+"""
+
+import bisect
+import hashlib
+import pickle
+import uuid
+from contextlib import contextmanager
+
+from room_store import RecentlyUsed, SharedHash, SharedSet
+
+REPLICAS = 100  # virtual nodes per worker, evens out the share of rooms
+POLL_INTERVAL = 0.005  # seconds between pub/sub polls when idle
+
+
+def _hash(key):
+    return int.from_bytes(hashlib.md5(key.encode()).digest()[:8], 'big')
+
+
+class HashRing:
+    """Consistent hash ring mapping room ids to worker names"""
+
+    def __init__(self, nodes=(), replicas=REPLICAS):
+        self.replicas = replicas
+        self.nodes = set()
+        self._points = []  # sorted hashes of the virtual nodes
+        self._owners = []  # worker owning each point
+        for node in nodes:
+            self.add(node)
+
+    def add(self, node):
+        if node in self.nodes:
+            return
+        self.nodes.add(node)
+        for i in range(self.replicas):
+            point = _hash(f"{node}#{i}")
+            at = bisect.bisect(self._points, point)
+            self._points.insert(at, point)
+            self._owners.insert(at, node)
+
+    def remove(self, node):
+        if node not in self.nodes:
+            return
+        self.nodes.discard(node)
+        kept = [(p, n) for p, n in zip(self._points, self._owners) if n != node]
+        self._points = [p for p, _ in kept]
+        self._owners = [n for _, n in kept]
+
+    def owner(self, key):
+        """Worker owning `key`, or None on an empty ring"""
+        if not self._points:
+            return None
+        at = bisect.bisect(self._points, _hash(key)) % len(self._points)
+        return self._owners[at]
+
+
+class ShardRouter:
+    """
+    Ownership and forwarding for one worker (`node`), over a Redis-compatible
+    client (redis.Redis or room_store.LocalKV).
+
+    Messages are pickled dicts with a 'type':
+      event       a Socket.IO event for a room this worker owns
+      enter_room  put a client connected to this worker into a socket room
+      rebalance   the node set changed, rebuild the ring
+      handoff     the old owner has written a room back, reload it unless
+                  the hot copy was already loaded from that write
+    """
+
+    def __init__(self, client, node, prefix='chess-socket:'):
+        self.client = client
+        self.node = node
+        self.prefix = prefix
+        self.members = SharedSet(client, prefix + 'nodes')
+        self.ring = HashRing([node])
+        self.handoff = None  # callback(owns) -> {room_id: token} written back
+        self.drop = None  # callback(room_id, token); both set by ShardedRoomStore
+        self._pubsub = None
+        self.forwarded = 0
+        self.received = 0
+        self.moved = 0
+
+    def channel(self, node):
+        return f"{self.prefix}shard:{node}"
+
+    def owner(self, room_id):
+        return self.ring.owner(room_id)
+
+    def owns(self, room_id):
+        return self.ring.owner(room_id) in (None, self.node)
+
+    def join(self):
+        """Register this worker and ask every worker to rebalance"""
+        self._pubsub = self.client.pubsub()
+        self._pubsub.subscribe(self.channel(self.node))
+        self.members.add(self.node)
+        self.refresh()
+        self.broadcast({'type': 'rebalance'})
+
+    def leave(self):
+        """Deregister, hand every hot room back and let the others take over"""
+        self.members.discard(self.node)
+        self.ring = HashRing(self.members.members())
+        self._hand_off(lambda room_id: False)
+        self.broadcast({'type': 'rebalance'})
+        if self._pubsub is not None:
+            self._pubsub.close()
+            self._pubsub = None
+
+    def refresh(self):
+        """Rebuild the ring from the shared node set and hand off lost rooms"""
+        self.ring = HashRing(self.members.members() | {self.node})
+        self._hand_off(self.owns)
+
+    def _hand_off(self, owns):
+        if not self.handoff:
+            return
+        moved = self.handoff(owns)
+        self.moved += len(moved)
+        for room_id, token in moved.items():
+            owner = self.owner(room_id)
+            if owner is not None:
+                self.send(owner, {'type': 'handoff', 'room_id': room_id, 'token': token})
+
+    def send(self, node, message):
+        self.client.publish(self.channel(node), pickle.dumps(message))
+
+    def broadcast(self, message):
+        for node in self.members.members():
+            if node != self.node:
+                self.send(node, message)
+
+    def forward(self, room_id, event, data, sid, username):
+        """Hand a room event to the worker that owns the room"""
+        self.forwarded += 1
+        self.send(self.owner(room_id), {
+            'type': 'event',
+            'event': event,
+            'data': data,
+            'sid': sid,
+            'username': username,
+            'origin': self.node,
+        })
+
+    def pump(self, handle):
+        """Process every pending message; events go to `handle(message)`"""
+        count = 0
+        while self._pubsub is not None:
+            raw = self._pubsub.get_message(ignore_subscribe_messages=True)
+            if raw is None:
+                break
+            if raw.get('type') != 'message':
+                continue
+            message = pickle.loads(raw['data'])
+            count += 1
+            if message['type'] == 'rebalance':
+                self.refresh()
+            elif message['type'] == 'handoff':
+                if self.drop:
+                    self.drop(message['room_id'], message['token'])
+            else:
+                self.received += 1
+                try:
+                    handle(message)
+                except Exception as e:
+                    print(f"Forwarded {message.get('event', message['type'])} failed: {e}")
+        return count
+
+    def listen(self, handle, sleep):
+        """Background loop: pump the inbox, sleeping cooperatively when idle"""
+        while self._pubsub is not None:
+            if not self.pump(handle):
+                sleep(POLL_INTERVAL)
+
+    def stats(self):
+        return {
+            'node': self.node,
+            'nodes': sorted(self.ring.nodes),
+            'forwarded': self.forwarded,
+            'received': self.received,
+            'moved': self.moved,
+        }
+
+
+class ShardedRoomStore:
+    """
+    Room store for one shard: rooms this worker owns live in `_hot`; the
+    rest (and rooms in transit during a rebalance) are read from `backing`,
+    a room_store.SharedRoomStore.
+    """
+
+    shared = True
+
+    def __init__(self, backing, router):
+        self.backing = backing
+        self.router = router
+        self.lobby = backing.lobby
+        self.users = backing.users
+        self.lobby_version = backing.lobby_version
+        self.bump_lobby_version = backing.bump_lobby_version
+        self._hot = {}
+        self._used = RecentlyUsed()
+        # handoff token of the write each hot room was loaded from
+        self._tokens = {}
+        self._handoffs = SharedHash(backing.client, backing.prefix + 'handoffs')
+        router.handoff = self.handoff
+        router.drop = self.drop
+
+    def _load(self, room_id):
+        state = self._hot.get(room_id)
+        if state is None:
+            state = self.backing.get(room_id)
+            if state is None:
+                return None
+            self._hot[room_id] = state
+            self._tokens[room_id] = self._handoffs.get(room_id)
+        self._used.touch(room_id)
+        return state
+
+    def __contains__(self, room_id):
+        return self.get(room_id) is not None
+
+    def __len__(self):
+        return len(self.keys())
+
+    def __getitem__(self, room_id):
+        state = self.get(room_id)
+        if state is None:
+            raise KeyError(room_id)
+        return state
+
+    def __setitem__(self, room_id, state):
+        if self.router.owns(room_id):
+            self._hot[room_id] = state
+            self._used.touch(room_id)
+        else:
+            self.backing[room_id] = state
+
+    def get(self, room_id, default=None):
+        if self.router.owns(room_id):
+            state = self._load(room_id)
+            return default if state is None else state
+        return self.backing.get(room_id, default)
+
+    def pop(self, room_id, default=None):
+        self._used.forget(room_id)
+        self._tokens.pop(room_id, None)
+        self._handoffs.pop(room_id)
+        state = self._hot.pop(room_id, None)
+        stored = self.backing.pop(room_id, None)
+        if state is None:
+            state = stored
+        return default if state is None else state
+
+    def setdefault(self, room_id, state):
+        if not self.router.owns(room_id):
+            return self.backing.setdefault(room_id, state)
+        existing = self._load(room_id)
+        if existing is not None:
+            return existing
+        self._hot[room_id] = state
+        self._used.touch(room_id)
+        return state
+
+    def keys(self):
+        return list(set(self._hot) | set(self.backing.keys()))
+
+    def values(self):
+        return [self.get(room_id) for room_id in self.keys()]
+
+    @contextmanager
+    def transaction(self, room_id, create=None):
+        """Owned rooms: the hot state, no lock needed.  Others: the shared store."""
+        if not self.router.owns(room_id):
+            with self.backing.transaction(room_id, create=create) as state:
+                yield state
+            return
+        state = self._load(room_id)
+        if state is None and create is not None:
+            state = create()
+            if state is not None:
+                self[room_id] = state
+        yield state
+
+    def peek(self, room_id):
+        """A hot room without counting as a use"""
+        return self._hot.get(room_id)
+
+    def lru(self):
+        """[(room_id, idle seconds), ...] for hot rooms, least recently used first"""
+        return self._used.ages()
+
+    def evict(self, room_id):
+        """Write a hot room back to the shared store and free it here"""
+        state = self._hot.pop(room_id, None)
+        self._used.forget(room_id)
+        self._tokens.pop(room_id, None)
+        if state is not None:
+            self.backing[room_id] = state
+        return state
+
+    def handoff(self, owns):
+        """
+        Write hot rooms for which `owns(room_id)` is false back to the shared
+        store; returns {room_id: token} identifying each write.
+        """
+        moved = {}
+        for room_id in [r for r in self._hot if not owns(r)]:
+            token = uuid.uuid4().hex
+            self.backing[room_id] = self._hot.pop(room_id)
+            self._used.forget(room_id)
+            self._handoffs[room_id] = token
+            self._tokens.pop(room_id, None)
+            moved[room_id] = token
+        return moved
+
+    def drop(self, room_id, token):
+        """Forget a hot copy loaded before the handoff `token` was written"""
+        if room_id in self._hot and self._tokens.get(room_id) != token:
+            self._hot.pop(room_id)
+            self._used.forget(room_id)
+            self._tokens.pop(room_id, None)
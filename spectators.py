@@ -0,0 +1,123 @@
+"""
+Spectators of a room, fed coalesced board snapshots.
+
+Spectators are not room members: they never count against the player
+limit and never join the room's Socket.IO room, so the players' ttt_update
+fan-out stays two sockets wide.  They are split into tier rooms of at most
+TIER_SIZE sockets instead.  Once per SNAPSHOT_INTERVAL the background loop
+builds a snapshot of every watched room and, if it changed since the last
+one, emits it to that room's tiers one at a time, yielding to the hub in
+between, so 10k spectators cost the players one short pause per tier
+rather than one long one per move.  Moves in between are coalesced: a
+spectator sees at most 1 / SNAPSHOT_INTERVAL snapshots per second.
+
+Tier room names carry a per-worker prefix: each worker feeds the
+spectators connected to it, and with a message queue the other workers
+have no such rooms.
+"""
+
+import uuid
+
+SNAPSHOT_INTERVAL = 1.0  # seconds: at most one snapshot per second per room
+TIER_SIZE = 100  # spectator sockets per broadcast room (one hub pause each)
+
+
+class SpectatorHub:
+    def __init__(self, tier_size=TIER_SIZE, prefix=None):
+        self.tier_size = tier_size
+        self.prefix = prefix or uuid.uuid4().hex[:8]
+        self._tiers = {}  # room_id -> [spectator sockets per tier]
+        self._watching = {}  # sid -> (room_id, tier)
+        self._sent = {}  # room_id -> last snapshot emitted
+        self.snapshots = 0
+        self.tier_emits = 0
+
+    def __len__(self):
+        return len(self._watching)
+
+    def tier_room(self, room_id, tier):
+        return f"watch:{self.prefix}:{room_id}:{tier}"
+
+    def tier_rooms(self, room_id):
+        return [self.tier_room(room_id, tier) for tier, size in enumerate(self._tiers.get(room_id, ()))
+                if size]
+
+    def count(self, room_id):
+        return sum(self._tiers.get(room_id, ()))
+
+    def watching(self, sid):
+        entry = self._watching.get(sid)
+        return entry[0] if entry else None
+
+    def add(self, sid, room_id):
+        """Register a spectator socket; returns the tier room it must enter"""
+        tiers = self._tiers.setdefault(room_id, [])
+        for tier, size in enumerate(tiers):
+            if size < self.tier_size:
+                break
+        else:
+            tier = len(tiers)
+            tiers.append(0)
+        tiers[tier] += 1
+        self._watching[sid] = (room_id, tier)
+        return self.tier_room(room_id, tier)
+
+    def remove(self, sid):
+        """Forget a spectator socket; returns the tier room it must leave (None if not watching)"""
+        entry = self._watching.pop(sid, None)
+        if entry is None:
+            return None
+        room_id, tier = entry
+        tiers = self._tiers[room_id]
+        tiers[tier] -= 1
+        if not any(tiers):
+            del self._tiers[room_id]
+            self._sent.pop(room_id, None)
+        return self.tier_room(room_id, tier)
+
+    def drop_room(self, room_id):
+        """The room is gone: forget its spectators, returns their tier rooms"""
+        rooms = self.tier_rooms(room_id)
+        self._tiers.pop(room_id, None)
+        self._sent.pop(room_id, None)
+        for sid in [sid for sid, entry in self._watching.items() if entry[0] == room_id]:
+            del self._watching[sid]
+        return rooms
+
+    def broadcast(self, snapshot, emit, sleep):
+        """One pass: emit(event, data, tier_room) for every watched room whose snapshot changed.
+
+        snapshot(room_id) returns the payload, None when nothing can be sent
+        (state not in memory) or False when the room no longer exists."""
+        for room_id in list(self._tiers):
+            payload = snapshot(room_id)
+            if payload is False:
+                for room in self.drop_room(room_id):
+                    emit('room_dissolved', {'room_id': room_id}, room)
+                continue
+            if payload is None or payload == self._sent.get(room_id):
+                continue
+            self._sent[room_id] = payload
+            self.snapshots += 1
+            for room in self.tier_rooms(room_id):
+                emit('spectate_snapshot', payload, room)
+                self.tier_emits += 1
+                sleep(0)  # let player moves through between tiers
+
+    def run(self, snapshot, emit, sleep, interval=SNAPSHOT_INTERVAL):
+        """Background loop: one broadcast pass every `interval` seconds"""
+        while True:
+            sleep(interval)
+            try:
+                self.broadcast(snapshot, emit, sleep)
+            except Exception as e:
+                print(f"Spectator broadcast failed: {e}")
+
+    def stats(self):
+        return {
+            'spectators': len(self._watching),
+            'rooms': len(self._tiers),
+            'tier_size': self.tier_size,
+            'snapshots': self.snapshots,
+            'tier_emits': self.tier_emits,
+        }
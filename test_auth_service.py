@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Test auth service: hashing password di thread pool dan throttle percobaan login
+"""
+
+from auth_service import HashService, PasswordBusy, Throttle
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_pool_hashes_and_verifies():
+    service = HashService(workers=1)
+    try:
+        password_hash = service.hash('rahasia')
+        assert service.verify(password_hash, 'rahasia')
+        assert not service.verify(password_hash, 'salah')
+    finally:
+        service.shutdown()
+    stats = service.stats()
+    assert stats['completed'] == 3 and stats['queue_depth'] == 0
+
+
+def test_inline_mode_without_workers():
+    service = HashService(workers=0)
+    assert service.verify(service.hash('pw'), 'pw')
+    assert service._pool is None
+
+
+def test_full_queue_is_refused():
+    service = HashService(workers=1, queue_limit=0)
+    try:
+        service.hash('pw')
+        assert False, "expected PasswordBusy"
+    except PasswordBusy:
+        pass
+    assert service.stats()['rejected'] == 1
+
+
+def test_throttle_limits_and_refills():
+    clock = FakeClock()
+    throttle = Throttle(3, window=60, clock=clock)
+    assert [throttle.allow('10.0.0.1') for _ in range(4)] == [True, True, True, False]
+    assert throttle.allow('10.0.0.2')  # other keys are not affected
+    clock.now += 20  # one attempt back per 20 seconds
+    assert throttle.allow('10.0.0.1') and not throttle.allow('10.0.0.1')
+    throttle.reset('10.0.0.1')
+    assert throttle.allow('10.0.0.1')
+    assert throttle.stats()['denied'] == 2
+
+
+def test_throttle_prunes_idle_keys():
+    clock = FakeClock()
+    throttle = Throttle(2, window=10, clock=clock, max_keys=3)
+    for key in ('a', 'b', 'c'):
+        throttle.allow(key)
+    clock.now += 10
+    throttle.allow('d')
+    assert throttle.stats()['keys'] == 1
+
+
+if __name__ == "__main__":
+    for name, fn in list(globals().items()):
+        if name.startswith('test_'):
+            fn()
+            print(f"✅ {name}")
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Test bot engine: tabel perfect-play 3x3 dan fallback alpha-beta
+"""
+
+import random
+
+import bot
+from bot_service import BotService
+from tictactoe import TicTacToe
+
+
+def _play(game, players, first='X'):
+    turn, result = first, None
+    while not result:
+        result = game.play(players[turn](game, turn), turn)
+        turn = 'O' if turn == 'X' else 'X'
+    return result
+
+
+def test_perfect_table_is_symmetry_reduced():
+    assert 0 < len(bot.perfect_table()) < 6000
+
+
+def test_perfect_never_loses_to_random():
+    rng = random.Random(3)
+    players = {
+        'X': lambda g, m: rng.choice(g.empties()),
+        'O': lambda g, m: bot.choose_move(g, m, 'perfect'),
+    }
+    for n in range(500):
+        assert _play(TicTacToe(), players, 'X' if n % 2 else 'O') != 'X'
+
+
+def test_perfect_self_play_is_draw():
+    players = {m: (lambda g, m: bot.choose_move(g, m, 'perfect')) for m in 'XO'}
+    assert _play(TicTacToe(), players) == 'draw'
+
+
+def test_medium_wins_and_blocks():
+    game = TicTacToe.from_cells(['O', 'O', '', 'X', 'X', '', '', '', ''])
+    assert bot.choose_move(game, 'O', 'medium') == 2
+    game = TicTacToe.from_cells(['X', 'X', '', '', 'O', '', '', '', ''])
+    assert bot.choose_move(game, 'O', 'medium') == 2
+
+
+def test_search_finds_win_on_large_board():
+    game = TicTacToe(9)
+    for i in range(4):
+        game.play(40 + i, 'O')
+        game.play(i, 'X')
+    assert bot.choose_move(game, 'O', 'perfect', budget=0.2) in (39, 44)
+
+
+def test_service_runs_search_in_pool():
+    service = BotService(workers=1, budget=0.1)
+    try:
+        game = TicTacToe(9)
+        game.play(40, 'X')
+        move = service.compute(game, 'O', 'perfect')
+        assert game.is_free(move)
+        # a 3x3 room's perfect reply is a table lookup, answered inline
+        assert service.compute(TicTacToe(), 'O', 'perfect') == bot.perfect_move(0, 0)
+        assert service.compute(TicTacToe(), 'O', 'easy') is not None
+        stats = service.stats()
+        assert stats['completed'] == 1 and stats['inline'] == 2
+        assert stats['queue_depth'] == 0
+    finally:
+        service.shutdown()
+
+
+def test_3x3_perfect_replies_skip_the_pool():
+    service = BotService(workers=1, queue_limit=0)  # a busy pool rejects every search
+    game = TicTacToe.from_cells(['X', 'X', '', 'O', '', '', '', '', ''])
+    assert service.compute(game, 'O', 'perfect') == 2  # still perfect, not the medium fallback
+    stats = service.stats()
+    assert stats['inline'] == 1 and stats['submitted'] == stats['rejected'] == 0
+    assert service._pool is None
+
+
+def test_service_falls_back_when_queue_full():
+    service = BotService(workers=1, queue_limit=0)
+    game = TicTacToe(9)
+    game.play(40, 'X')
+    assert game.is_free(service.compute(game, 'O', 'perfect'))
+    assert service.stats()['rejected'] == 1
+
+
+if __name__ == "__main__":
+    for name, fn in list(globals().items()):
+        if name.startswith('test_'):
+            fn()
+            print(f"✅ {name}")
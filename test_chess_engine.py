@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Test move generator catur: perft terhadap node count yang sudah diketahui
+"""
+
+from chess_engine import START_FEN, ChessGame, Position, perft
+
+# (fen, [perft(1), perft(2), ...]) from the standard perft suite
+PERFT_CASES = [
+    (START_FEN, [20, 400, 8902]),
+    ("r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1", [48, 2039]),
+    ("8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1", [14, 191, 2812]),
+    ("r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 w kq - 0 1", [6, 264]),
+    ("rnbq1k1r/pp1Pbppp/2p5/8/2B5/8/PPP1NnPP/RNBQK2R w KQ - 1 8", [44, 1486]),
+]
+
+
+def test_perft():
+    for fen, counts in PERFT_CASES:
+        pos = Position(fen)
+        for depth, expected in enumerate(counts, 1):
+            assert perft(pos, depth) == expected, (fen, depth)
+
+
+def test_make_unmake_restores_position():
+    for fen, _ in PERFT_CASES:
+        pos = Position(fen)
+        before = (pos.fen(), pos.hash)
+        for move in pos.legal_moves():
+            pos.make(move)
+            assert pos.hash == pos._full_hash()
+            pos.unmake()
+            assert (pos.fen(), pos.hash) == before
+
+
+def test_illegal_moves_rejected():
+    game = ChessGame()
+    for uci in ('e2e5', 'e7e5', 'a1a2', 'zz', None, 'e2e4x'):
+        try:
+            game.play(uci)
+        except ValueError:
+            continue
+        assert False, uci
+    assert game.play('e2e4') == (None, None)
+    assert game.turn == 'black'
+
+
+def test_fools_mate():
+    game = ChessGame()
+    for uci in ('f2f3', 'e7e5', 'g2g4'):
+        game.play(uci)
+    assert game.play('d8h4') == ('black', 'checkmate')
+
+
+def test_threefold_repetition():
+    game = ChessGame()
+    result = None
+    for _ in range(2):
+        for uci in ('g1f3', 'g8f6', 'f3g1', 'f6g8'):
+            result = game.play(uci)
+    assert result == ('draw', 'threefold')
+
+
+if __name__ == "__main__":
+    for name, fn in list(globals().items()):
+        if name.startswith('test_'):
+            fn()
+            print(f"✅ {name}")
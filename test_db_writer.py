@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Test database writer: antrian satu transaksi, statement gagal, pragma SQLite dan opsi pool
+"""
+
+import os
+import tempfile
+
+from sqlalchemy import Column, MetaData, String, Table, create_engine, event, select, text
+
+from db_writer import DbWriter, apply_sqlite_pragmas, engine_options
+
+metadata = MetaData()
+rooms = Table('room', metadata,
+              Column('id', String(64), primary_key=True),
+              Column('name', String(120), nullable=False))
+
+
+def _writer(interval=1.0):
+    engine = create_engine('sqlite://')
+    metadata.create_all(engine)
+    commits = []
+    event.listen(engine, 'commit', lambda conn: commits.append(1))
+    return DbWriter(engine, interval=interval), engine, commits
+
+
+def _ids(engine):
+    with engine.connect() as conn:
+        return [row.id for row in conn.execute(select(rooms.c.id).order_by(rooms.c.id))]
+
+
+def test_queued_writes_commit_together():
+    writer, engine, commits = _writer()
+    for i in range(5):
+        writer.submit(rooms.insert().values(id=f"r{i}", name='room'))
+    writer.submit(rooms.delete().where(rooms.c.id == 'r0'))
+    assert writer.pending() == 6 and commits == []
+    assert writer.flush() == 6
+    assert commits == [1] and _ids(engine) == ['r1', 'r2', 'r3', 'r4']
+
+
+def test_batch_being_written_is_still_pending():
+    writer, engine, _ = _writer()
+    writer.submit(rooms.insert().values(id='r1', name='room'))
+    seen = []
+    event.listen(engine, 'commit', lambda conn: seen.append(writer.pending()))
+    writer.flush()
+    assert seen == [1] and writer.pending() == 0
+
+
+def test_zero_interval_writes_inline():
+    writer, engine, commits = _writer(interval=0)
+    writer.submit(rooms.insert().values(id='r1', name='room'))
+    assert writer.pending() == 0 and _ids(engine) == ['r1']
+
+
+def test_bad_statement_dropped_alone():
+    writer, engine, _ = _writer()
+    writer.submit(rooms.insert().values(id='r1', name='room'))
+    writer.submit(rooms.insert().values(id='r1', name='duplicate'))
+    writer.submit(rooms.insert().values(id='r2', name='room'))
+    assert writer.flush() == 3
+    assert _ids(engine) == ['r1', 'r2']
+    assert writer.stats()['dropped'] == 1 and writer.pending() == 0
+
+
+def test_locked_database_keeps_the_queue():
+    writer, engine, _ = _writer()
+    writer.submit(rooms.insert().values(id='r1', name='room'))
+    writer.submit(text("INSERT INTO missing_table VALUES (1)"))  # OperationalError
+    assert writer.flush() == 0
+    assert writer.pending() == 2 and writer.stats()['failures'] == 1
+
+
+def test_rows_of_one_statement_are_batched_in_order():
+    writer, engine, commits = _writer()
+    insert, statements = rooms.insert(), []
+    event.listen(engine, 'before_cursor_execute',
+                 lambda conn, cursor, sql, params, context, many: statements.append((sql.split()[0], many)))
+    writer.submit(insert, {'id': 'r1', 'name': 'room'})
+    writer.submit(insert, {'id': 'r2', 'name': 'room'})
+    writer.submit(rooms.delete().where(rooms.c.id == 'r1'))
+    writer.submit(insert, {'id': 'r3', 'name': 'room'})
+    assert [params['id'] for _, params in writer.queued(insert)] == ['r1', 'r2', 'r3']
+    assert writer.flush() == 4
+    assert statements == [('INSERT', True), ('DELETE', False), ('INSERT', False)]
+    assert commits == [1] and _ids(engine) == ['r2', 'r3']
+
+
+def test_after_commit_sees_each_committed_batch():
+    engine = create_engine('sqlite://')
+    metadata.create_all(engine)
+    seen = []
+
+    def after_commit(batch):
+        seen.append(len(batch))
+        raise RuntimeError("callback down")  # the batch stays committed, never retried
+
+    writer = DbWriter(engine, after_commit=after_commit)
+    writer.submit(rooms.insert().values(id='r1', name='room'))
+    writer.submit(rooms.insert().values(id='r2', name='room'))
+    assert seen == []
+    assert writer.flush() == 2 and seen == [2]
+    assert writer.pending() == 0 and _ids(engine) == ['r1', 'r2']
+
+
+def test_sqlite_pragmas_and_pool_options():
+    path = os.path.join(tempfile.mkdtemp(), 'pragmas.db')
+    engine = create_engine(f"sqlite:///{path}", **engine_options(f"sqlite:///{path}", pool_size=3))
+    apply_sqlite_pragmas(engine)
+    with engine.connect() as conn:
+        assert conn.execute(text("PRAGMA journal_mode")).scalar() == 'wal'
+        assert conn.execute(text("PRAGMA synchronous")).scalar() == 1  # NORMAL
+        assert conn.execute(text("PRAGMA busy_timeout")).scalar() == 5000
+    assert engine.pool.size() == 3
+    assert engine_options('sqlite://') == {} and engine_options('sqlite:///:memory:') == {}
+
+
+if __name__ == "__main__":
+    for name, fn in list(globals().items()):
+        if name.startswith('test_'):
+            fn()
+            print(f"✅ {name}")
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Test HTTP game API (serverless): kursi, langkah, ETag/304 dan long-poll yang bangun saat state berubah
+"""
+
+import os
+import tempfile
+
+from flask import Flask
+
+import game_api
+
+
+def _app(sleep=lambda seconds: None, room_exists=None):
+    os.environ['GAME_STATE_URL'] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'state.db')}"
+    try:
+        app = Flask(__name__)
+        app.config['SECRET_KEY'] = 'test'
+        game_api.init_game_api(app, room_exists=room_exists, sleep=sleep)
+    finally:
+        del os.environ['GAME_STATE_URL']
+    return app
+
+
+def _client(app, username):
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session['username'] = username
+    return client
+
+
+def test_seats_and_moves():
+    app = _app()
+    alice, bob, carol = (_client(app, name) for name in ('alice', 'bob', 'carol'))
+    assert alice.post('/api/game/r1/join').json['you'] == 'X'
+    assert alice.post('/api/game/r1/join').json['version'] == 1  # already seated: no new version
+    r = bob.post('/api/game/r1/join')
+    assert r.json['you'] == 'O' and r.json['version'] == 2
+    assert carol.post('/api/game/r1/join').status_code == 409
+    assert bob.post('/api/game/r1/move', json={'index': 0}).status_code == 409  # X opens
+    for client, index in ((alice, 0), (bob, 3), (alice, 1), (bob, 4)):
+        assert client.post('/api/game/r1/move', json={'index': index}).status_code == 200
+    assert alice.post('/api/game/r1/move', json={'index': 3}).status_code == 409
+    assert alice.post('/api/game/r1/move', json={'index': 2, 'version': 3}).json['stale']
+    r = alice.post('/api/game/r1/move', json={'index': 2, 'version': 6})
+    assert r.json['winner'] == 'X' and r.json['board'][:3] == ['X', 'X', 'X']
+    r = bob.post('/api/game/r1/reset')
+    assert r.json['turn'] == 'O' and r.json['board'] == [''] * 9 and r.json['version'] == 8
+    assert carol.post('/api/game/r1/move', json={'index': 5}).status_code == 403
+    assert app.test_client().get('/api/game/r1/state').status_code == 401
+
+
+def test_unchanged_state_is_304():
+    app = _app()
+    alice = _client(app, 'alice')
+    etag = alice.post('/api/game/r1/join').headers['ETag']
+    assert etag == 'W/"game-1"'
+    assert alice.get('/api/game/r1/state', headers={'If-None-Match': etag}).status_code == 304
+    _client(app, 'bob').post('/api/game/r1/join')
+    r = alice.get('/api/game/r1/state', headers={'If-None-Match': etag})
+    assert r.status_code == 200 and r.json['players'] == {'X': 'alice', 'O': 'bob'}
+
+
+def test_long_poll_wakes_on_change():
+    holds = []
+
+    def sleep(seconds):
+        holds.append(seconds)
+        if len(holds) == 2:  # the opponent moves while the request is held
+            _client(app, 'alice').post('/api/game/r1/move', json={'index': 4})
+
+    app = _app(sleep=sleep)
+    _client(app, 'alice').post('/api/game/r1/join')
+    bob = _client(app, 'bob')
+    etag = bob.post('/api/game/r1/join').headers['ETag']
+    r = bob.get('/api/game/r1/state?wait=8', headers={'If-None-Match': etag})
+    assert r.status_code == 200 and r.json['board'][4] == 'X' and len(holds) == 2
+
+
+def test_unknown_room():
+    app = _app(room_exists={'r1'}.__contains__)
+    assert _client(app, 'alice').post('/api/game/nope/join').status_code == 404
+
+
+if __name__ == "__main__":
+    for name, fn in list(globals().items()):
+        if name.startswith('test_'):
+            fn()
+            print(f"✅ {name}")
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Test game record: pack/unpack langkah, header, decode per potongan dan arsip write-behind
+"""
+
+from sqlalchemy import Column, Integer, LargeBinary, MetaData, String, Table, create_engine, select
+
+from db_writer import DbWriter
+from game_record import HEADER_SIZE, GameArchive, decode_header, encode, iter_moves, pack_move
+
+metadata = MetaData()
+games = Table('game_record', metadata,
+              Column('id', Integer, primary_key=True),
+              Column('room_id', String(64), nullable=False, index=True),
+              Column('first_player', String(80)),
+              Column('second_player', String(80)),
+              Column('plies', Integer, nullable=False),
+              Column('record', LargeBinary, nullable=False),
+              Column('ended_at', Integer, nullable=False))
+
+CHESS_MOVES = ['e2e4', 'h7h5', 'e4e5', 'h5h4', 'e5e6', 'h4h3', 'e6f7', 'e8e7', 'f7g8q', 'a7a1n']
+
+
+def test_ttt_moves_one_byte_each():
+    packed = b''.join(pack_move('pvp', index) for index in (4, 0, 8))
+    assert packed == bytes((4, 0, 8))
+    assert [move for _, move in iter_moves('pvp', packed)] == [4, 0, 8]
+
+
+def test_chess_round_trip_with_promotion():
+    packed = b''.join(pack_move('chess', move) for move in CHESS_MOVES)
+    assert len(pack_move('chess', 'e2e4')) == 2 and len(pack_move('chess', 'f7g8q')) == 3
+    assert [move for _, move in iter_moves('chess', packed)] == CHESS_MOVES
+
+
+def test_chunks_leave_a_split_move_for_the_next_read():
+    packed = b''.join(pack_move('chess', move) for move in CHESS_MOVES)
+    decoded, position = [], 0
+    while position < len(packed):
+        chunk = packed[position:position + 3]
+        consumed = 0
+        for consumed, move in iter_moves('chess', chunk):
+            decoded.append(move)
+        position += consumed
+    assert decoded == CHESS_MOVES
+
+
+def test_header_round_trip():
+    record = encode('pvp', 'O', 'X', bytes((4,)))
+    assert len(record) == HEADER_SIZE + 1
+    assert decode_header(record[:HEADER_SIZE]) == ('pvp', 'O', 'X')
+    assert decode_header(encode('chess', 'white', 'draw', b'')) == ('chess', 'white', 'draw')
+    assert decode_header(encode('bot', 'X', None, b'')) == ('bot', 'X', None)
+    try:
+        decode_header(b'\x09\x00')
+    except ValueError:
+        pass
+    else:
+        assert False, "unknown version accepted"
+
+
+def test_archive_flushes_queued_games():
+    engine = create_engine('sqlite://')
+    metadata.create_all(engine)
+    archive = GameArchive(DbWriter(engine), games, clock=lambda: 1700000000.5)
+    archive.append('r1', 'pvp', ('alice', 'bob'), 'X', 'X', bytes((0, 3, 1, 4, 2)))
+    archive.append('r2', 'chess', ('carol', None), 'white', None, pack_move('chess', 'e2e4'))
+    assert archive.pending() == 2
+    assert archive.flush() == 2 and archive.pending() == 0
+    with engine.connect() as conn:
+        rows = conn.execute(select(games).order_by(games.c.id)).all()
+    assert [(row.room_id, row.plies, row.ended_at) for row in rows] == [('r1', 5, 1700000000),
+                                                                        ('r2', 1, 1700000000)]
+    assert rows[0].record == encode('pvp', 'X', 'X', bytes((0, 3, 1, 4, 2)))
+    assert archive.stats()['record_bytes_avg'] == (7 + 4) / 2
+
+
+if __name__ == "__main__":
+    for name, fn in list(globals().items()):
+        if name.startswith('test_'):
+            fn()
+            print(f"✅ {name}")
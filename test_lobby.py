@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Test lobby feed: perubahan lobby digabung jadi satu lobby_diff per interval
+"""
+
+from lobby import LobbyFeed
+
+
+def _entry(room_id, players=0):
+    return {'id': room_id, 'name': room_id, 'type': 'public', 'mode': 'pvp',
+            'players': players, 'created_by': 'alice'}
+
+
+def test_nothing_to_send():
+    assert LobbyFeed().take() is None
+
+
+def test_latest_player_count_wins():
+    feed = LobbyFeed()
+    for players in (1, 2, 1, 2):
+        feed.room_updated('r1', players)
+    diff = feed.take()
+    assert diff['updated'] == {'r1': 2}
+    assert feed.take() is None
+
+
+def test_updates_fold_into_created_entry():
+    feed = LobbyFeed()
+    feed.room_created(_entry('r1'))
+    feed.room_updated('r1', 1)
+    diff = feed.take()
+    assert diff['created'][0]['players'] == 1 and diff['updated'] == {}
+
+
+def test_room_created_and_dissolved_in_one_window_is_not_sent():
+    feed = LobbyFeed()
+    feed.room_created(_entry('r1'))
+    feed.room_updated('r1', 1)
+    feed.room_dissolved('r1')
+    assert feed.take() is None
+
+
+def test_dissolve_drops_pending_update():
+    feed = LobbyFeed()
+    feed.room_updated('r1', 1)
+    feed.room_dissolved('r1')
+    diff = feed.take()
+    assert diff['updated'] == {} and diff['dissolved'] == ['r1']
+
+
+def test_presence_last_state_wins():
+    feed = LobbyFeed()
+    feed.user_connected('alice')
+    feed.user_disconnected('alice')
+    feed.user_connected('bob')
+    diff = feed.take()
+    assert diff['online'] == ['bob'] and diff['offline'] == ['alice']
+
+
+def test_churn_collapses_to_one_diff():
+    feed = LobbyFeed()
+    for i in range(1000):
+        feed.room_updated(f"r{i % 10}", i % 3)
+    diff = feed.take()
+    assert len(diff['updated']) == 10 and feed.events == 1000 and feed.flushes == 1
+
+
+if __name__ == "__main__":
+    for name, fn in list(globals().items()):
+        if name.startswith('test_'):
+            fn()
+            print(f"✅ {name}")
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Test matchmaking: antrian rating berbucket, jendela yang melebar dan Elo
+"""
+
+from matchmaking import MatchQueue, elo_update, expected_score
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_close_ratings_pair_on_enqueue():
+    queue = MatchQueue(base_window=50, clock=_Clock())
+    assert queue.enqueue('alice', 1200) is None
+    assert queue.enqueue('bob', 1600) is None
+    first, second = queue.enqueue('carol', 1240, data='sid-c')
+    assert (first.username, second.username, second.data) == ('alice', 'carol', 'sid-c')
+    assert len(queue) == 1 and 'bob' in queue and 'alice' not in queue
+
+
+def test_window_widens_while_waiting():
+    clock = _Clock()
+    queue = MatchQueue(base_window=50, widen_rate=25, max_window=400, clock=clock)
+    queue.enqueue('alice', 1200)
+    queue.enqueue('bob', 1400)
+    assert queue.sweep() == []
+    clock.now = 7.0  # window 50 + 7 * 25 = 225
+    [(first, second)] = queue.sweep()
+    assert {first.username, second.username} == {'alice', 'bob'} and len(queue) == 0
+
+
+def test_window_is_capped():
+    clock = _Clock()
+    queue = MatchQueue(base_window=50, widen_rate=25, max_window=400, clock=clock)
+    queue.enqueue('alice', 1000)
+    queue.enqueue('bob', 1500)
+    clock.now = 3600.0
+    assert queue.sweep() == []
+
+
+def test_nearest_and_oldest_partner_first():
+    clock = _Clock()
+    queue = MatchQueue(base_window=100, clock=clock)
+    queue.add('far', 1290)
+    clock.now = 1.0
+    queue.add('near old', 1210)
+    queue.add('near new', 1212)
+    first, second = queue.enqueue('me', 1200)
+    assert first.username == 'near old'
+
+
+def test_partner_behind_an_out_of_reach_oldest():
+    queue = MatchQueue(base_window=50, bucket_width=25, clock=_Clock())
+    queue.add('edge', 1270)  # oldest of bucket 1250-1274, 70 points away
+    queue.add('inside', 1250)  # same bucket, 50 points away
+    first, second = queue.enqueue('me', 1200)
+    assert (first.username, second.username) == ('inside', 'me')
+    assert 'edge' in queue
+
+
+def test_crowded_edge_bucket_is_not_scanned():
+    class CountingQueue(MatchQueue):
+        looks = 0
+
+        def window(self, ticket, now):
+            self.looks += 1
+            return super().window(ticket, now)
+
+    queue = CountingQueue(base_window=50, bucket_width=25, clock=_Clock())
+    for i in range(1000):
+        queue.add(f"edge{i}", 1270 + i % 5)  # out of reach, all older than the one in reach
+    queue.add('inside', 1250)
+    first, second = queue.enqueue('me', 1200)
+    assert (first.username, second.username) == ('inside', 'me')
+    assert queue.looks < 20 and len(queue) == 1000
+
+
+def test_cancel_and_requeue():
+    queue = MatchQueue(clock=_Clock())
+    queue.enqueue('alice', 1200)
+    assert queue.cancel('alice').rating == 1200
+    assert queue.cancel('alice') is None
+    queue.enqueue('alice', 1300)
+    queue.enqueue('alice', 1100)  # re-queueing replaces the old ticket
+    assert len(queue) == 1 and queue.get('alice').rating == 1100
+    assert queue.stats()['buckets'] == 1
+
+
+def test_sweep_limit():
+    clock = _Clock()
+    queue = MatchQueue(base_window=0, clock=clock)
+    for i in range(10):
+        queue.add(f"p{i}", 1200)
+    assert len(queue.sweep(limit=2)) == 2 and len(queue) == 6
+
+
+def test_elo():
+    assert expected_score(1200, 1200) == 0.5
+    assert elo_update(1200, 1200, 1) == (1216, 1184)
+    assert elo_update(1200, 1200, 0.5) == (1200, 1200)
+    # an upset moves the ratings further than an expected win
+    assert elo_update(1000, 1400, 1)[0] - 1000 > elo_update(1400, 1000, 1)[0] - 1400
+
+
+if __name__ == "__main__":
+    for name, fn in list(globals().items()):
+        if name.startswith('test_'):
+            fn()
+            print(f"✅ {name}")
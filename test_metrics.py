@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Test metrics: format teks Prometheus, histogram latency dan wrapper handler
+"""
+
+from metrics import Instrumentation, Metrics
+
+
+def test_counter_and_gauge_render():
+    metrics = Metrics()
+    emits = metrics.counter('chess_emits_total', 'Events emitted', ('event',))
+    emits.inc(('ttt_update',))
+    emits.inc(('ttt_update',), 2)
+    metrics.gauge('chess_active_rooms', 'Rooms', lambda: 3)
+    text = metrics.render()
+    assert '# TYPE chess_emits_total counter' in text
+    assert 'chess_emits_total{event="ttt_update"} 3' in text
+    assert 'chess_active_rooms 3' in text
+
+
+def test_histogram_buckets_are_cumulative():
+    metrics = Metrics()
+    latency = metrics.histogram('h', 'Latency', ('name',), buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.5, 2.0):
+        latency.observe(value, ('move',))
+    lines = metrics.render().splitlines()
+    assert 'h_bucket{name="move",le="0.1"} 1' in lines
+    assert 'h_bucket{name="move",le="1.0"} 3' in lines
+    assert 'h_bucket{name="move",le="+Inf"} 4' in lines
+    assert 'h_count{name="move"} 4' in lines and 'h_sum{name="move"} 3.05' in lines
+
+
+def test_label_values_are_escaped():
+    metrics = Metrics()
+    metrics.counter('c', 'Counter', ('name',)).inc(('say "hi"\n',))
+    assert 'c{name="say \\"hi\\"\\n"} 1' in metrics.render()
+
+
+def test_distribution_and_broken_gauge():
+    metrics = Metrics()
+    metrics.gauge('broken', 'Fails', lambda: 1 / 0)
+    metrics.distribution('room_sockets', 'Sizes', lambda: [1, 2, 2, 7], buckets=(1, 2, 5))
+    text = metrics.render()
+    assert 'broken' not in text
+    assert 'room_sockets_bucket{le="2"} 3' in text and 'room_sockets_count 4' in text
+
+
+def test_timed_handler_records_latency_and_errors():
+    clock = iter([0.0, 0.002, 1.0, 1.5]).__next__
+    metrics = Metrics()
+    inst = Instrumentation(metrics, clock=clock)
+    ok = inst.timed('socket', 'ttt_move', lambda data: data['index'])
+    assert ok({'index': 4}) == 4
+    fail = inst.timed('socket', 'ttt_move', lambda data: data['missing'])
+    try:
+        fail({})
+    except KeyError:
+        pass
+    series = inst.handler_seconds.values[('socket', 'ttt_move')]
+    assert sum(series[0]) == 2 and abs(series[1] - 0.502) < 1e-9
+    assert inst.handler_errors.values == {('socket', 'ttt_move'): 1}
+
+
+def test_bare_handler_stays_bare():
+    # Flask-SocketIO calls connect(auth) and retries connect() on TypeError
+    inst = Instrumentation(Metrics())
+
+    def handle_connect():
+        return 'ok'
+    wrapped = inst.timed('socket', 'connect', handle_connect)
+    try:
+        wrapped({'token': 1})
+        assert False, "a bare handler must reject the auth argument"
+    except TypeError:
+        pass
+    assert wrapped() == 'ok' and wrapped.__name__ == 'handle_connect'
+    assert inst.handler_errors.values == {}
+
+
+if __name__ == "__main__":
+    for name, fn in list(globals().items()):
+        if name.startswith('test_'):
+            fn()
+            print(f"✅ {name}")
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Test move log: antrian di database writer, batch transaksi dan replay per room
+"""
+
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, create_engine, event
+
+from db_writer import DbWriter
+from move_log import MoveLog
+
+metadata = MetaData()
+moves = Table('move', metadata,
+              Column('id', Integer, primary_key=True),
+              Column('room_id', String(64), nullable=False, index=True),
+              Column('kind', String(10), nullable=False),
+              Column('mark', String(10)),
+              Column('value', String(80)),
+              Column('created_at', DateTime))
+
+
+def _log():
+    engine = create_engine('sqlite://')
+    metadata.create_all(engine)
+    return MoveLog(DbWriter(engine), moves), engine
+
+
+def test_append_only_queues():
+    log, engine = _log()
+    commits = []
+    event.listen(engine, 'commit', lambda conn: commits.append(1))
+    log.append('r1', 'move', 'X', 4)
+    assert log.pending() == 1 and commits == []
+
+
+def test_flush_writes_one_transaction():
+    log, engine = _log()
+    commits = []
+    event.listen(engine, 'commit', lambda conn: commits.append(1))
+    for i in range(9):
+        log.append(f"r{i % 3}", 'move', 'XO'[i % 2], i)
+    assert log.flush() == 9
+    assert len(commits) == 1 and log.pending() == 0
+    assert log.writer.stats()['batches'] == 1
+
+
+def test_replay_in_order_including_pending():
+    log, _ = _log()
+    log.append('r1', 'seat', 'X', 'alice')
+    log.append('r2', 'move', 'X', 0)
+    log.append('r1', 'move', 'X', 4)
+    log.flush()
+    log.append('r1', 'reset')
+    assert log.replay('r1') == [('seat', 'X', 'alice'), ('move', 'X', '4'), ('reset', None, None)]
+
+
+def test_replay_merges_queued_entries_without_committing():
+    log, engine = _log()
+    log.append('r1', 'seat', 'X', 'alice')
+    log.flush()
+    commits = []
+    event.listen(engine, 'commit', lambda conn: commits.append(1))
+    log.append('r1', 'move', 'X', 4)
+    log.append('r2', 'move', 'X', 0)
+    assert log.replay('r1') == [('seat', 'X', 'alice'), ('move', 'X', '4')]
+    log.compact('r1', [('checkpoint', 'O', 3)])  # the queued delete hides the committed seat
+    assert log.replay('r1') == [('checkpoint', 'O', '3')]
+    assert commits == [] and log.pending() == 4
+
+
+def test_discard_applies_after_earlier_moves():
+    log, _ = _log()
+    log.append('r1', 'move', 'X', 4)
+    log.discard('r1')
+    log.append('r2', 'move', 'X', 0)
+    log.flush()
+    assert log.replay('r1') == []
+    assert log.replay('r2') == [('move', 'X', '0')]
+
+
+def test_compact_replaces_the_room_log():
+    log, _ = _log()
+    log.append('r1', 'seat', 'X', 'alice')
+    log.append('r1', 'move', 'X', 4)
+    log.append('r2', 'move', 'X', 0)
+    log.flush()
+    log.append('r1', 'move', 'O', 0)  # still queued: dropped too
+    log.compact('r1', [('seat', 'O', 'alice'), ('checkpoint', 'O', 6)])
+    log.append('r1', 'move', 'O', 8)
+    assert log.replay('r1') == [('seat', 'O', 'alice'), ('checkpoint', 'O', '6'), ('move', 'O', '8')]
+    assert log.replay('r2') == [('move', 'X', '0')]
+
+
+def test_failed_flush_keeps_entries():
+    log, engine = _log()
+    log.append('r1', 'move', 'X', 4)
+    moves.drop(engine)
+    assert log.flush() == 0
+    assert log.pending() == 1 and log.writer.stats()['failures'] == 1
+    moves.create(engine)
+    assert log.flush() == 1
+
+
+if __name__ == "__main__":
+    for name, fn in list(globals().items()):
+        if name.startswith('test_'):
+            fn()
+            print(f"✅ {name}")
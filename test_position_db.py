@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Test position file: tulis/baca via mmap, file rusak, dan bot yang menjawab dari file
+"""
+
+import os
+import tempfile
+
+import bot
+from bot_service import BotService
+from position_db import PositionDB, position_key, write
+from tictactoe import TicTacToe
+
+
+def _path():
+    return os.path.join(tempfile.mkdtemp(), 'positions.bin')
+
+
+def test_write_and_lookup():
+    path = _path()
+    entries = {position_key(3, 3, mine, 0): mine % 9 for mine in range(200)}
+    write(path, entries)
+    db = PositionDB(path)
+    try:
+        assert len(db) == 200
+        assert all(db.get(key) == value for key, value in entries.items())
+        assert db.get(position_key(4, 3, 1, 2)) is None
+        assert db.stats()['hits'] == 200 and db.stats()['lookups'] == 201
+    finally:
+        db.close()
+
+
+def test_rejects_other_files():
+    path = _path()
+    with open(path, 'wb') as f:
+        f.write(b'SQLite format 3\0' + bytes(100))
+    try:
+        PositionDB(path)
+    except ValueError:
+        pass
+    else:
+        assert False, "not a position file, yet opened"
+    assert bot.open_position_db(path) is False
+    assert bot.open_position_db(path + '.missing') is False
+    assert bot.position_db() is None
+
+
+def test_bot_answers_from_the_file():
+    path = _path()
+    write(path, bot.position_entries([(4, 3, 2)], budget=0.05))
+    positions = [(key & 0o777, key >> 9) for key in bot.perfect_table()]
+    expected = [bot.perfect_move(mine, theirs) for mine, theirs in positions]
+    assert bot.open_position_db(path)
+    try:
+        # the mapped table agrees with the in-memory one on every 3x3 position
+        assert [bot.perfect_move(mine, theirs) for mine, theirs in positions] == expected
+        game = TicTacToe(4, 3)
+        game.play(5, 'X')
+        service = BotService(workers=1)
+        assert game.is_free(service.compute(game, 'O', 'perfect'))
+        # 3x3 rooms read the mapped table inline too, no worker involved
+        assert service.compute(TicTacToe(), 'X', 'perfect') == expected[positions.index((0, 0))]
+        stats = service.stats()
+        assert (stats['book_hits'], stats['inline'], stats['submitted']) == (1, 1, 0)
+    finally:
+        bot._position_db = None
+
+
+def test_bot_falls_back_when_the_file_misses():
+    path = _path()
+    entries = bot.position_entries()
+    opening = position_key(3, 3, 0, 0)
+    # a short file: half the 3x3 table, and the opening reply pointing at a taken cell
+    kept = dict(list(entries.items())[::2])
+    kept[position_key(3, 3, 0, 1)] = 0  # O to move on X's corner: cell 0 is X's
+    kept.pop(opening, None)
+    write(path, kept)
+    positions = [(key & 0o777, key >> 9) for key in bot.perfect_table()]
+    expected = [bot.perfect_move(mine, theirs) for mine, theirs in positions]
+    assert bot.open_position_db(path)
+    try:
+        assert [bot.perfect_move(mine, theirs) for mine, theirs in positions] == expected
+        assert bot.choose_move(TicTacToe(), 'X', 'perfect') == expected[positions.index((0, 0))]
+        service = BotService(workers=1, deadline=5.0)
+        game = TicTacToe()
+        game.play(0, 'X')
+        move = service.compute(game, 'O', 'perfect')
+        assert move == expected[positions.index((0, 1))] and game.is_free(move)
+        assert service.stats()['book_hits'] == 0  # the stale entry is not served
+    finally:
+        bot._position_db = None
+
+
+def test_truncated_file_is_not_mapped():
+    path = _path()
+    write(path, bot.position_entries())
+    with open(path, 'r+b') as f:
+        f.truncate(os.path.getsize(path) // 2)
+    assert bot.open_position_db(path) is False
+    assert bot.position_db() is None
+    assert bot.choose_move(TicTacToe(), 'X', 'perfect') is not None
+
+
+if __name__ == "__main__":
+    for name, fn in list(globals().items()):
+        if name.startswith('test_'):
+            fn()
+            print(f"✅ {name}")
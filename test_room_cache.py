@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Test room cache: LRU terbatas, invalidasi dan room yang dihapus worker lain
+"""
+
+from room_cache import RoomCache, RoomInfo
+
+
+def _info(room_id):
+    return RoomInfo(room_id, f"Room {room_id}", 'public', 'pvp', None, None, 1, 'alice')
+
+
+class _Database:
+    def __init__(self, *room_ids):
+        self.rooms = {room_id: _info(room_id) for room_id in room_ids}
+        self.queries = 0
+
+    def load(self, room_id):
+        self.queries += 1
+        return self.rooms.get(room_id)
+
+
+def test_hit_skips_the_database():
+    db = _Database('r1')
+    cache = RoomCache(db.load)
+    assert cache.get('r1').creator_name == 'alice'
+    assert cache.get('r1') == _info('r1')
+    assert db.queries == 1
+    assert cache.stats()['hits'] == 1 and cache.stats()['misses'] == 1
+
+
+def test_missing_room_is_not_cached():
+    db = _Database()
+    cache = RoomCache(db.load)
+    assert cache.get('r1') is None
+    db.rooms['r1'] = _info('r1')
+    assert cache.get('r1') is not None and db.queries == 2
+
+
+def test_least_recently_used_is_evicted():
+    db = _Database('r1', 'r2', 'r3')
+    cache = RoomCache(db.load, max_entries=2)
+    cache.get('r1')
+    cache.get('r2')
+    cache.get('r1')
+    cache.get('r3')  # r2 is the least recently used
+    assert len(cache) == 2 and cache.stats()['evictions'] == 1
+    cache.get('r1')
+    assert db.queries == 3
+    cache.get('r2')
+    assert db.queries == 4
+
+
+def test_invalidate_and_valid_predicate():
+    db = _Database('r1', 'r2')
+    lobby = {'r1', 'r2'}
+    cache = RoomCache(db.load, valid=lobby.__contains__)
+    cache.put(_info('r1'))
+    cache.get('r2')
+    cache.invalidate('r1')
+    del db.rooms['r1']
+    assert cache.get('r1') is None
+    # dissolved by another worker: gone from the shared lobby, still cached here
+    lobby.discard('r2')
+    del db.rooms['r2']
+    assert cache.get('r2') is None and len(cache) == 0
+
+
+if __name__ == "__main__":
+    for name, fn in list(globals().items()):
+        if name.startswith('test_'):
+            fn()
+            print(f"✅ {name}")
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Test RoomState: kursi pemain, vote rematch dan buffer delta
+"""
+
+import pickle
+
+from room_state import DELTA_BUFFER, RoomState
+
+
+def test_no_instance_dict():
+    state = RoomState('pvp', 'medium', 'alice')
+    assert not hasattr(state, '__dict__')
+    assert state.deltas is None  # allocated on the first update
+
+
+def test_seats_and_marks():
+    state = RoomState('chess', 'medium', 'alice')
+    state.seat('white', 'alice')
+    state.seat('black', 'bob')
+    assert state.players == {'white': 'alice', 'black': 'bob'}
+    assert state.mark_of('bob') == 'black' and state.mark_of('carol') is None
+    state.swap_seats()
+    assert state.player('white') == 'bob'
+    assert state.other_mark('white') == 'black'
+
+
+def test_members_behave_like_a_set():
+    state = RoomState('pvp', 'medium', 'alice')
+    for name in ('alice', 'bob', 'alice'):
+        state.add_member(name)
+    assert state.members == ('alice', 'bob')
+    state.remove_member('alice')
+    assert state.members == ('bob',)
+
+
+def test_member_stays_while_another_socket_is_in_the_room():
+    state = RoomState('pvp', 'medium', 'alice')
+    state.add_member('alice', 'tab1')
+    state.add_member('alice', 'tab2')
+    state.add_member('bob', 'sid3')
+    assert state.drop_socket('tab1') is None
+    assert state.members == ('alice', 'bob')
+    assert state.drop_socket('tab2') == 'alice'
+    assert state.members == ('bob',)
+    assert state.drop_socket('tab2') is None  # not a member socket (any more)
+    state.remove_member('bob')
+    assert state.members == () and state.sockets == ()
+
+
+def test_rematch_votes():
+    state = RoomState('pvp', 'medium', 'alice')
+    state.vote('O')
+    state.vote('O')
+    state.add_pending('bob')
+    assert state.voted() == ['O'] and state.rematch_pending == ('bob',)
+    state.vote('X')
+    assert len(state.voted()) == 2
+    state.clear_rematch()
+    assert state.voted() == [] and state.rematch_pending == ()
+
+
+def test_record_keeps_recent_deltas():
+    state = RoomState('pvp', 'medium', 'alice')
+    for i in range(DELTA_BUFFER + 5):
+        state.record({'last': i})
+    assert state.seq == DELTA_BUFFER + 5
+    assert len(state.deltas) == DELTA_BUFFER and state.deltas[0]['seq'] == 6
+
+
+def test_pickles_for_shared_store():
+    state = RoomState('pvp', 'perfect', 'alice')
+    state.seat('X', 'alice')
+    state.game.play(4, 'X')
+    state.record({'last': 4})
+    copy = pickle.loads(pickle.dumps(state))
+    assert copy.players == state.players and copy.game.to_list() == state.game.to_list()
+    assert copy.seq == 1 and list(copy.deltas) == list(state.deltas)
+
+
+if __name__ == "__main__":
+    for name, fn in list(globals().items()):
+        if name.startswith('test_'):
+            fn()
+            print(f"✅ {name}")
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Test room store: backend memory dan shared (LocalKV) antar worker
+"""
+
+from room_store import (LocalKV, MemoryRoomStore, SharedRoomStore, create_room_store,
+                        socketio_queue_options)
+
+
+def _workers():
+    kv = LocalKV()
+    return SharedRoomStore(kv), SharedRoomStore(kv)
+
+
+def test_memory_transaction_yields_live_state():
+    store = MemoryRoomStore()
+    with store.transaction('r1', create=lambda: {'members': set()}) as state:
+        state['members'].add('alice')
+    assert store.get('r1')['members'] == {'alice'}
+    with store.transaction('missing') as state:
+        assert state is None
+
+
+def test_shared_state_visible_to_other_worker():
+    a, b = _workers()
+    with a.transaction('r1', create=lambda: {'members': set(), 'seq': 0}) as state:
+        state['members'].add('alice')
+    with b.transaction('r1') as state:
+        state['members'].add('bob')
+        state['seq'] += 1
+    assert a.get('r1') == {'members': {'alice', 'bob'}, 'seq': 1}
+    assert a.keys() == ['r1'] and len(b) == 1
+
+
+def test_shared_pop_inside_transaction_is_not_written_back():
+    a, b = _workers()
+    a['r1'] = {'members': set()}
+    with b.transaction('r1'):
+        b.pop('r1')
+    assert 'r1' not in a
+
+
+def test_shared_lobby_and_users():
+    a, b = _workers()
+    a.lobby['r1'] = {'id': 'r1', 'players': 1}
+    b.users.add('alice')
+    assert b.lobby.values() == [{'id': 'r1', 'players': 1}]
+    assert 'alice' in a.users
+    b.lobby.pop('r1')
+    a.users.discard('alice')
+    assert len(a.lobby) == 0 and len(b.users) == 0
+
+
+def test_lobby_version_is_shared():
+    a, b = _workers()
+    assert a.lobby_version() == 0
+    a.bump_lobby_version()
+    b.bump_lobby_version()
+    assert a.lobby_version() == b.lobby_version() == 2
+    memory = MemoryRoomStore()
+    memory.bump_lobby_version()
+    assert memory.lobby_version() == 1
+
+
+def test_create_room_store_urls():
+    assert isinstance(create_room_store(None), MemoryRoomStore)
+    assert isinstance(create_room_store('local://'), SharedRoomStore)
+    assert socketio_queue_options('memory://') == {}
+    assert socketio_queue_options('local://') == {}
+    assert socketio_queue_options('redis://localhost:6379/0') == {'message_queue': 'redis://localhost:6379/0'}
+
+
+if __name__ == "__main__":
+    for name, fn in list(globals().items()):
+        if name.startswith('test_'):
+            fn()
+            print(f"✅ {name}")
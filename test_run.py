@@ -0,0 +1,488 @@
+#!/usr/bin/env python3
+"""
+Test server (run.py): lobby index sinkron dengan tabel Room, resync delta ttt, worker bot tidak menjalankan server lagi
+"""
+
+import itertools
+import json
+import multiprocessing
+import os
+import subprocess
+import sys
+import tempfile
+
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'run.db')}"
+os.environ.setdefault('LOGIN_IP_LIMIT', '1000')  # every test client registers from 127.0.0.1
+os.environ.setdefault('TRUSTED_PROXIES', '1')  # as behind the Heroku router
+
+import run  # noqa: E402
+from auth_service import Throttle  # noqa: E402
+from matchmaking import elo_update  # noqa: E402
+from room_state import DELTA_BUFFER  # noqa: E402
+from run import Room, User, app, db, socketio  # noqa: E402
+
+if multiprocessing.current_process().name == 'MainProcess':  # not in the spawned child below
+    run.start_services()  # what the server entry point does
+
+_names = itertools.count()
+
+
+def _user(prefix='user'):
+    client = app.test_client()
+    username = f"{prefix}{next(_names)}"
+    client.post('/register', data={'username': username, 'password': 'pw'})
+    return client
+
+
+def _room(client, mode='pvp', name='room', room_type='public'):
+    r = client.post('/dashboard', data={'room_name': name, 'room_type': room_type, 'room_mode': mode})
+    return r.headers['Location'].rsplit('/', 1)[-1]
+
+
+def _socket(client):
+    return socketio.test_client(app, flask_test_client=client)
+
+
+def _events(socket, name):
+    return [m['args'][0] for m in socket.get_received() if m['name'] == name]
+
+
+def _room_table():
+    """{room_id: (name, creator name)} straight from the database"""
+    run.write_queue.flush()
+    with app.app_context():
+        rows = (db.session.query(Room.id, Room.name, User.username)
+                .outerjoin(User, Room.created_by == User.id).all())
+        db.session.remove()
+    return {room_id: (name, creator or "Unknown") for room_id, name, creator in rows}
+
+
+def _lobby_index():
+    return {room_id: (entry['name'], entry['created_by']) for room_id, entry in run.lobby_index.items()}
+
+
+def test_lobby_index_loaded_from_room_table():
+    _room(_user('owner'), name='kept')
+    with app.app_context():
+        db.session.add(Room(id='orphan-room', name='orphan', type='public', mode='pvp'))
+        db.session.commit()
+    run.write_queue.flush()  # at startup nothing is queued yet
+    run.load_lobby_index()
+    assert _lobby_index() == _room_table()
+    assert run.lobby_index['orphan-room']['created_by'] == "Unknown"
+    assert run.lobby_index['orphan-room']['players'] == 0
+
+
+def test_create_join_leave_keep_lobby_index_in_sync():
+    alice, bob = _user('alice'), _user('bob')
+    room_id = _room(alice, name='sync')
+    assert run.lobby_index[room_id]['players'] == 0
+    assert _lobby_index() == _room_table()
+
+    sa, sb = _socket(alice), _socket(bob)
+    sa.emit('join_room', {'room_id': room_id})
+    sb.emit('join_room', {'room_id': room_id})
+    assert run.lobby_index[room_id]['players'] == 2
+    sb.emit('leave_room', {'room_id': room_id})
+    assert run.lobby_index[room_id]['players'] == 1
+    sa.emit('leave_room', {'room_id': room_id})  # the last member leaves: the room is deleted
+    assert room_id not in run.lobby_index
+    assert room_id not in _room_table()
+    assert _lobby_index() == _room_table()
+
+
+def test_dissolve_removes_room_from_index_and_table():
+    alice = _user('alice')
+    room_id = _room(alice, name='dissolved')
+    sa = _socket(alice)
+    sa.emit('join_room', {'room_id': room_id})
+    sa.emit('dissolve_room', {'room_id': room_id})
+    assert _events(sa, 'room_dissolved') == [{'room_id': room_id}]
+    assert room_id not in run.lobby_index
+    assert _lobby_index() == _room_table()
+    run.load_lobby_index()  # a restart finds the same lobby
+    assert room_id not in run.lobby_index
+
+
+def _api_rooms(client, query='', **headers):
+    return client.get(f"/api/rooms{query}", headers=headers)
+
+
+def _all_pages(client, query, limit):
+    ids, after = [], None
+    while True:
+        page = _api_rooms(client, f"?limit={limit}{query}" + (f"&after={after}" if after else '')).json
+        assert len(page['rooms']) <= limit
+        ids += [room['id'] for room in page['rooms']]
+        after = page['next']
+        if not after:
+            return ids
+
+
+def _committed_ids(*filters):
+    run.write_queue.flush()
+    with app.app_context():
+        rows = Room.query.filter(*filters).order_by(Room.created_at, Room.id).all()
+        db.session.remove()
+    return [room.id for room in rows]
+
+
+def test_api_rooms_pages_by_keyset_cursor():
+    alice = _user('alice')
+    for i in range(7):
+        _room(alice, mode=('pvp', 'bot', 'chess')[i % 3], name=f"page{i}",
+              room_type='private' if i % 2 else 'public')
+    run.write_queue.flush()  # the writer's next pass: the listing reads committed rows
+    assert _all_pages(alice, '', 3) == _committed_ids()
+    assert _all_pages(alice, '&mode=bot', 2) == _committed_ids(Room.mode == 'bot')
+    assert _all_pages(alice, '&type=private&mode=chess', 2) == \
+        _committed_ids(Room.type == 'private', Room.mode == 'chess')
+    assert _api_rooms(alice, '?after=zzz').status_code == 400
+    assert _api_rooms(alice, '?limit=0').status_code == 400
+    assert _api_rooms(app.test_client()).status_code == 401
+
+
+def test_api_rooms_free_scan_skips_full_rooms():
+    room_id, alice, sa, sb = _pvp_room()
+    spare = _room(alice, name='spare')
+    run.write_queue.flush()
+    free = _all_pages(alice, '&mode=pvp&free=1', 2)
+    assert room_id not in free and spare in free
+    assert room_id in _all_pages(alice, '&mode=pvp', 50)
+    listed = {room['id']: room for room in _api_rooms(alice, '?mode=pvp&limit=200').json['rooms']}
+    assert (listed[room_id]['players'], listed[room_id]['capacity']) == (2, 2)
+    sb.emit('leave_room', {'room_id': room_id})
+    assert room_id in _all_pages(alice, '&mode=pvp&free=1', 2)
+
+
+def test_api_rooms_etag_follows_the_lobby_version():
+    alice = _user('alice')
+    run.write_queue.flush()
+    first = _api_rooms(alice)
+    etag = first.headers['ETag']
+    assert _api_rooms(alice, **{'If-None-Match': etag}).status_code == 304
+    _room(alice, name='etag')
+    # queued, not committed yet: the committed rows and so the version are unchanged
+    assert run.write_queue.pending()
+    assert _api_rooms(alice, **{'If-None-Match': etag}).status_code == 304
+    assert run.write_queue.pending()  # a poll does not flush the writer
+    run.write_queue.flush()  # the commit raises the version
+    fresh = _api_rooms(alice, **{'If-None-Match': etag})
+    assert fresh.status_code == 200 and fresh.headers['ETag'] != etag
+    assert _api_rooms(alice, **{'If-None-Match': fresh.headers['ETag']}).status_code == 304
+
+
+def test_joining_a_new_room_does_not_flush_the_writer():
+    alice = _user('alice')
+    room_id = _room(alice, name='queued')
+    assert run.write_queue.pending()
+    assert alice.get(f"/game/{room_id}").status_code == 200
+    sa = _socket(alice)
+    sa.emit('join_room', {'room_id': room_id})
+    assert _events(sa, 'ttt_init')[0]['you'] == 'X'
+    assert run.write_queue.pending()  # served by the room cache, the insert is still queued
+
+
+def _pvp_room():
+    """Two players seated in a fresh pvp room: room id, their clients and sockets (X first)"""
+    alice, bob = _user('alice'), _user('bob')
+    room_id = _room(alice, name='delta')
+    sa, sb = _socket(alice), _socket(bob)
+    sa.emit('join_room', {'room_id': room_id})
+    sb.emit('join_room', {'room_id': room_id})
+    return room_id, alice, sa, sb
+
+
+def _move(room_id, index, *sockets):
+    # only the player to move gets through, the other one finds the cell taken
+    for socket in sockets:
+        socket.emit('ttt_move', {'room_id': room_id, 'index': index})
+
+
+def _play_round(room_id, sa, sb):
+    """The opener wins on the top row, then both take the rematch: 6 deltas"""
+    for index in (0, 3, 1, 4, 2):
+        _move(room_id, index, sa, sb)
+    sa.emit('ttt_rematch_request', {'room_id': room_id})
+    sb.emit('ttt_rematch_response', {'room_id': room_id, 'response': 'accept'})
+
+
+def _reconnect(client, room_id, since):
+    socket = _socket(client)
+    socket.emit('join_room', {'room_id': room_id, 'since': since})
+    return _events(socket, 'ttt_init')[0], socket
+
+
+def test_rejoin_gets_only_missed_deltas():
+    room_id, alice, sa, sb = _pvp_room()
+    _move(room_id, 0, sa, sb)
+    seen = _events(sa, 'ttt_update')[-1]['seq']
+    sa.disconnect()
+    _move(room_id, 4, sb)
+
+    init, sa = _reconnect(alice, room_id, seen)
+    assert init['you'] == 'X' and 'board' not in init
+    assert [(d['seq'], d['last']) for d in init['deltas']] == [(seen + 1, {'index': 4, 'mark': 'O'})]
+    assert init['seq'] == seen + 1
+
+    init, _ = _reconnect(alice, room_id, seen + 1)  # nothing missed
+    assert init['deltas'] == []
+    sa.emit('ttt_sync', {'room_id': room_id, 'since': seen})
+    assert [d['seq'] for d in _events(sa, 'ttt_deltas')[0]['deltas']] == [seen + 1]
+
+
+def test_rejoin_past_the_buffer_gets_a_snapshot():
+    room_id, alice, sa, sb = _pvp_room()
+    _move(room_id, 0, sa, sb)
+    seen = _events(sa, 'ttt_update')[-1]['seq']
+    while run.active_rooms.get(room_id).seq - seen <= DELTA_BUFFER:
+        _play_round(room_id, sa, sb)
+    _move(room_id, 8, sa, sb)
+    state = run.active_rooms.get(room_id)
+    assert run._deltas_since(state, seen) is None
+
+    init, sa = _reconnect(alice, room_id, seen)
+    assert 'deltas' not in init
+    assert init['board'] == state.game.to_list() and init['seq'] == state.seq
+    sa.emit('ttt_sync', {'room_id': room_id, 'since': seen})
+    assert _events(sa, 'ttt_snapshot') == [{'seq': state.seq, 'board': state.game.to_list(),
+                                           'turn': state.turn, 'winner': None}]
+    init, _ = _reconnect(alice, room_id, state.seq + 1)  # a seq from the future: snapshot too
+    assert 'board' in init
+
+
+def test_full_protocol_sends_the_board_with_every_update():
+    app.config['GAME_PROTOCOL'] = 'full'
+    try:
+        room_id, _, sa, sb = _pvp_room()
+        _move(room_id, 0, sa, sb)
+        _move(room_id, 4, sa, sb)
+    finally:
+        app.config['GAME_PROTOCOL'] = 'delta'
+    updates = _events(sb, 'ttt_update')
+    assert [u['board'] for u in updates] == [['X', '', '', '', '', '', '', '', ''],
+                                             ['X', '', '', '', 'O', '', '', '', '']]
+    assert [u['seq'] for u in updates] == [1, 2]
+    # the buffered deltas stay compact, only what goes out carries the board
+    assert all('board' not in d for d in run.active_rooms.get(room_id).deltas)
+
+
+def test_rematch_compacts_the_move_log():
+    room_id, _, sa, sb = _pvp_room()
+    for _ in range(3):
+        _play_round(room_id, sa, sb)
+    _move(room_id, 4, sa, sb)
+    live = run.active_rooms.get(room_id)
+    log = run.move_log.replay(room_id)
+    assert log == [('seat', 'X', live.seats[0]), ('seat', 'O', live.seats[1]),
+                   ('checkpoint', live.opener, str(live.seq - 1)), ('move', live.opener, '4')]
+    rebuilt = run._rehydrate(room_id)  # as after an eviction or a restart
+    assert (rebuilt.seats, rebuilt.turn, rebuilt.opener, rebuilt.seq, rebuilt.game.to_list()) == \
+        (live.seats, live.turn, live.opener, live.seq, live.game.to_list())
+
+
+def test_second_tab_closing_keeps_the_member():
+    room_id, alice, sa, sb = _pvp_room()
+    tab = _socket(alice)
+    tab.emit('join_room', {'room_id': room_id})
+    tab.disconnect()
+    assert len(run.active_rooms.get(room_id).members) == 2
+    assert run.lobby_index[room_id]['players'] == 2
+    sa.disconnect()  # the last socket of the member
+    assert len(run.active_rooms.get(room_id).members) == 1
+    assert run.lobby_index[room_id]['players'] == 1
+
+
+def test_disconnected_player_keeps_their_seat_from_a_newcomer():
+    room_id, alice, sa, sb = _pvp_room()
+    sa.disconnect()  # X's seat stays held
+    carol = _socket(_user('carol'))
+    carol.emit('join_room', {'room_id': room_id})
+    assert _events(carol, 'spectate_snapshot') and not _events(carol, 'ttt_init')
+    assert len(run.active_rooms.get(room_id).members) == 1
+    init, sa = _reconnect(alice, room_id, None)
+    assert init['you'] == 'X' and not _events(sa, 'error')
+    assert len(run.active_rooms.get(room_id).members) == 2
+
+
+def test_matched_players_survive_leaving_the_dashboard():
+    alice, bob = _user('alice'), _user('bob')
+    da, db_ = _socket(alice), _socket(bob)
+    da.emit('find_match')
+    db_.emit('find_match')
+    found = _events(da, 'match_found')
+    assert len(found) == 1 and _events(db_, 'match_found')[0]['room_id'] == found[0]['room_id']
+    room_id = found[0]['room_id']
+    assert room_id not in socketio.server.rooms(socketio.server.manager.sid_from_eio_sid(da.eio_sid, '/'), '/')
+    da.disconnect()  # the dashboards navigate to the game page
+    db_.disconnect()
+    seats = run.active_rooms.get(room_id).seats
+    marks = []
+    for client in (alice, bob):
+        init, _ = _reconnect(client, room_id, None)
+        marks.append(init['you'])
+    assert marks == ['X', 'O'] and run.active_rooms.get(room_id).seats == seats
+    assert len(run.active_rooms.get(room_id).members) == 2
+
+
+def test_rooms_with_members_are_not_evicted():
+    room_id, _, sa, sb = _pvp_room()
+    assert not run._evict_room(room_id)
+    sa.emit('leave_room', {'room_id': room_id})
+    sb.disconnect()
+    assert run.active_rooms.get(room_id).members == ()
+    assert run._evict_room(room_id)
+    assert run.active_rooms.peek(room_id) is None
+
+
+def _ratings(*names):
+    with app.app_context():
+        ratings = dict(db.session.query(User.username, User.rating).filter(User.username.in_(names)))
+        db.session.remove()
+    return [ratings[name] for name in names]
+
+
+def test_ratings_change_by_delta_in_the_database():
+    room_id, *_ = _pvp_room()
+    players = run.active_rooms.get(room_id).seats
+    assert _ratings(*players) == [1200, 1200]
+    run._rate_game(room_id, players, 1.0)
+    assert _ratings(*players) == [1216, 1184]
+
+    def racing_update(*args):
+        # another worker's game of the first player lands between the read and the write
+        db.session.execute(db.update(User).where(User.username == players[0]).values(rating=User.rating + 10))
+        return elo_update(*args)
+
+    run.elo_update = racing_update
+    try:
+        run._rate_game(room_id, players, 0.5)
+    finally:
+        run.elo_update = elo_update
+    draw = elo_update(1216, 1184, 0.5)
+    assert _ratings(*players) == [draw[0] + 10, draw[1]]
+
+
+def _ndjson(response):
+    assert response.mimetype == 'application/x-ndjson'
+    return [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+
+def test_archived_games_list_and_replay():
+    room_id, alice, sa, sb = _pvp_room()
+    for _ in range(3):
+        _play_round(room_id, sa, sb)  # three games, the opener alternates
+    queued = alice.get(f"/api/rooms/{room_id}/games").json['games']
+    assert [(g['id'], g['opener']) for g in queued] == [(None, 'X'), (None, 'O'), (None, 'X')]
+    assert len(run.game_archive.queued(room_id)) == 3  # listed from memory, not committed by a GET
+    run.write_queue.flush()
+    games = alice.get(f"/api/rooms/{room_id}/games?limit=2").json
+    assert len(games['games']) == 2 and games['next'] == games['games'][-1]['id']
+    older = alice.get(f"/api/rooms/{room_id}/games?limit=2&before={games['next']}").json
+    assert len(older['games']) == 1 and older['next'] is None
+    newest = games['games'][0]
+    assert (newest['mode'], newest['result'], newest['plies']) == ('pvp', newest['opener'], 5)
+    assert [g['opener'] for g in games['games'] + older['games']] == ['X', 'O', 'X']
+
+    run.REPLAY_CHUNK, chunk = 2, run.REPLAY_CHUNK  # a move per query, and the last short read
+    try:
+        lines = _ndjson(alice.get(f"/api/games/{newest['id']}/replay"))
+    finally:
+        run.REPLAY_CHUNK = chunk
+    assert lines[0] == newest
+    assert [(line['ply'], line['mark'], line['index']) for line in lines[1:]] == \
+        [(1, 'X', 0), (2, 'O', 3), (3, 'X', 1), (4, 'O', 4), (5, 'X', 2)]
+    assert alice.get('/api/games/999999/replay').status_code == 404
+    assert app.test_client().get(f"/api/games/{newest['id']}/replay").status_code == 401
+    assert alice.get(f"/api/rooms/{room_id}/games?limit=0").status_code == 400
+
+
+def test_game_in_progress_is_listed_and_replayable():
+    room_id, alice, sa, sb = _pvp_room()
+    _play_round(room_id, sa, sb)
+    _move(room_id, 4, sa, sb)  # O opens the rematch
+    _move(room_id, 0, sa, sb)
+    live, archived = alice.get(f"/api/rooms/{room_id}/games").json['games']
+    assert (live['id'], live['opener'], live['result'], live['plies']) == (None, 'O', None, 2)
+    assert archived['plies'] == 5
+    lines = _ndjson(alice.get(f"/api/rooms/{room_id}/replay"))
+    assert lines[0] == live
+    assert [(line['mark'], line['index']) for line in lines[1:]] == [('O', 4), ('X', 0)]
+    # evicted rooms are rebuilt from the move log
+    sa.disconnect()
+    sb.disconnect()
+    assert run._evict_room(room_id)
+    assert _ndjson(alice.get(f"/api/rooms/{room_id}/replay"))[1:] == lines[1:]
+    assert alice.get('/api/rooms/no-such-room/replay').status_code == 404
+
+
+def _forwarded(event, data, socket, username):
+    """Run a room event the way its owner does for a socket connected to another worker"""
+    sid = socketio.server.manager.sid_from_eio_sid(socket.eio_sid, '/')
+    run._handle_forwarded({'type': 'event', 'event': event, 'data': data,
+                           'sid': sid, 'username': username, 'origin': None})
+    return sid
+
+
+def test_forwarded_events_answer_the_forwarding_socket():
+    room_id = _room(_user('alice'), name='forwarded')
+    sb, sc = _socket(_user('bob')), _socket(_user('carol'))
+    # no request context and no session: the socket and user come with the message
+    sid = _forwarded('_join_owned', {'room_id': room_id}, sb, 'bob-elsewhere')
+    assert _events(sb, 'ttt_init')[0]['you'] == 'X'
+    assert room_id in socketio.server.rooms(sid, '/')
+    sid = _forwarded('_join_owned', {'room_id': room_id, 'spectate': True}, sc, 'carol-elsewhere')
+    assert _events(sc, 'spectate_snapshot')[0]['spectators'] == 1
+    assert run.spectator_hub.watching(sid) == room_id
+    assert run.active_rooms.get(room_id).members == ('bob-elsewhere',)
+    sc.disconnect()  # the watcher's worker tells the owner's hub
+    assert run.spectator_hub.watching(sid) is None
+
+
+def test_login_throttle_counts_forwarded_clients_apart():
+    run.ip_throttle, throttle = Throttle(1, 60), run.ip_throttle
+    try:
+        def attempt(client_ip):
+            return app.test_client().post('/login', data={'username': 'nobody', 'password': 'pw'},
+                                          headers={'X-Forwarded-For': client_ip}).status_code
+        # every request comes from the router's address, each client keeps its own bucket
+        assert [attempt('203.0.113.1'), attempt('203.0.113.2'), attempt('203.0.113.1')] == [200, 200, 429]
+    finally:
+        run.ip_throttle = throttle
+
+
+def test_importing_run_starts_nothing_until_a_request():
+    # flask init-db and other tooling import run.py without serving it; a server
+    # importing the app (gunicorn run:app) starts the services on the first request
+    db_path = os.path.join(tempfile.mkdtemp(), 'import.db')
+    script = ("import os, run; print(run.services_started, os.path.exists(os.environ['DB'])); "
+              "run.app.test_client().get('/'); print(run.services_started, os.path.exists(os.environ['DB']))")
+    out = subprocess.run([sys.executable, '-c', script], cwd=os.path.dirname(os.path.abspath(run.__file__)),
+                         env=dict(os.environ, DATABASE_URL=f"sqlite:///{db_path}", DB=db_path, BOT_WORKERS='1'),
+                         check=True, capture_output=True, text=True, timeout=120).stdout
+    assert out.splitlines()[0] == 'False False' and out.splitlines()[-1] == 'True True'
+
+
+def _import_run_in_child(db_path):
+    import run  # noqa: F401
+
+
+def test_bot_workers_skip_server_startup():
+    # a spawned pool process re-imports the parent's main module, and run.py with it
+    db_path = os.path.join(tempfile.mkdtemp(), 'worker.db')
+    os.environ['DATABASE_URL'], url = f"sqlite:///{db_path}", os.environ['DATABASE_URL']
+    try:
+        child = multiprocessing.get_context('spawn').Process(target=_import_run_in_child, args=(db_path,))
+        child.start()
+        child.join(60)
+    finally:
+        os.environ['DATABASE_URL'] = url
+    assert child.exitcode == 0
+    assert not os.path.exists(db_path)  # no init_database(), no lobby index load
+
+
+if __name__ == "__main__":
+    for name, fn in list(globals().items()):
+        if name.startswith('test_'):
+            fn()
+            print(f"✅ {name}")
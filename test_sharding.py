@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Test sharding: consistent hashing, forwarding dan rebalance antar worker
+"""
+
+from collections import Counter
+
+from room_store import LocalKV, SharedRoomStore
+from sharding import HashRing, ShardedRoomStore, ShardRouter
+
+ROOMS = [f"room-{i}" for i in range(2000)]
+
+
+def test_ring_spreads_rooms_evenly():
+    ring = HashRing(['a', 'b', 'c', 'd'])
+    counts = Counter(ring.owner(r) for r in ROOMS)
+    assert set(counts) == {'a', 'b', 'c', 'd'}
+    assert max(counts.values()) < 2 * min(counts.values())
+
+
+def test_adding_a_worker_only_moves_its_share():
+    before = HashRing(['a', 'b', 'c'])
+    after = HashRing(['a', 'b', 'c', 'd'])
+    moved = [r for r in ROOMS if before.owner(r) != after.owner(r)]
+    assert all(after.owner(r) == 'd' for r in moved)
+    assert len(moved) < len(ROOMS) * 0.4
+    after.remove('d')
+    assert all(before.owner(r) == after.owner(r) for r in ROOMS)
+
+
+def _shard(kv, node):
+    router = ShardRouter(kv, node)
+    store = ShardedRoomStore(SharedRoomStore(kv), router)
+    router.join()
+    return router, store
+
+
+def _room_owned_by(router, node):
+    return next(r for r in ROOMS if router.owner(r) == node)
+
+
+def test_events_are_forwarded_to_owner():
+    kv = LocalKV()
+    a, _ = _shard(kv, 'a')
+    b, _ = _shard(kv, 'b')
+    a.pump(print)
+    room_id = _room_owned_by(a, 'b')
+    assert not a.owns(room_id) and b.owns(room_id)
+    a.forward(room_id, 'on_ttt_move', {'room_id': room_id, 'index': 4}, sid='sid-1', username='alice')
+    received = []
+    b.pump(received.append)
+    assert received[0]['event'] == 'on_ttt_move'
+    assert received[0]['origin'] == 'a' and received[0]['username'] == 'alice'
+
+
+def test_owner_keeps_state_hot():
+    kv = LocalKV()
+    a, store = _shard(kv, 'a')
+    with store.transaction('r1', create=lambda: {'seq': 0}) as state:
+        state['seq'] += 1
+    assert store.get('r1') == {'seq': 1}
+    assert SharedRoomStore(kv).get('r1') is None  # never written to the shared store
+
+
+def test_rebalance_hands_rooms_to_new_worker():
+    kv = LocalKV()
+    a, store_a = _shard(kv, 'a')
+    for room_id in ROOMS[:200]:
+        with store_a.transaction(room_id, create=lambda: {'seq': 0}) as state:
+            state['seq'] = 7
+    b, store_b = _shard(kv, 'b')
+    a.pump(print)  # rebalance: a writes back the rooms b now owns
+    b.pump(print)
+    room_id = _room_owned_by(a, 'b')
+    assert room_id not in store_a._hot
+    assert store_b.get(room_id) == {'seq': 7}
+    assert 0 < a.moved < 200
+
+    b.leave()
+    a.pump(print)
+    assert a.owns(room_id) and store_a.get(room_id) == {'seq': 7}
+
+
+def test_stale_copy_is_dropped_on_handoff():
+    kv = LocalKV()
+    a, store_a = _shard(kv, 'a')
+    b, store_b = _shard(kv, 'b')
+    a.pump(print)
+    room_id = _room_owned_by(a, 'b')
+    b.leave()
+    a.pump(print)
+    with store_a.transaction(room_id, create=lambda: {'seq': 0}) as state:
+        state['seq'] = 3
+    # b comes back and loads the room before a has written its newer copy back
+    b.join()
+    SharedRoomStore(kv)[room_id] = {'seq': 1}
+    assert store_b.get(room_id) == {'seq': 1}
+    a.pump(print)
+    b.pump(print)
+    assert store_b.get(room_id) == {'seq': 3}
+
+
+if __name__ == "__main__":
+    for name, fn in list(globals().items()):
+        if name.startswith('test_'):
+            fn()
+            print(f"✅ {name}")
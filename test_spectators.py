@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Test spectator hub: tier room, snapshot yang digabung dan room yang dibubarkan
+"""
+
+from spectators import SpectatorHub
+
+
+def _broadcast(hub, snapshots):
+    sent = []
+    hub.broadcast(snapshots.get, lambda event, data, room: sent.append((event, data, room)),
+                  lambda seconds: None)
+    return sent
+
+
+def test_tiers_fill_up_and_free():
+    hub = SpectatorHub(tier_size=2, prefix='w')
+    rooms = [hub.add(f"sid{i}", 'r1') for i in range(5)]
+    assert rooms == ['watch:w:r1:0', 'watch:w:r1:0', 'watch:w:r1:1', 'watch:w:r1:1', 'watch:w:r1:2']
+    assert hub.count('r1') == 5 and len(hub) == 5
+    assert hub.remove('sid0') == 'watch:w:r1:0'
+    assert hub.add('sid9', 'r1') == 'watch:w:r1:0'  # the free slot is reused
+    assert hub.remove('nobody') is None
+    for sid in ('sid1', 'sid2', 'sid3', 'sid4', 'sid9'):
+        hub.remove(sid)
+    assert hub.tier_rooms('r1') == [] and hub.stats()['rooms'] == 0
+
+
+def test_snapshot_sent_once_per_change_to_every_tier():
+    hub = SpectatorHub(tier_size=1, prefix='w')
+    hub.add('a', 'r1')
+    hub.add('b', 'r1')
+    snapshots = {'r1': {'seq': 1}}
+    sent = _broadcast(hub, snapshots)
+    assert [room for _, _, room in sent] == ['watch:w:r1:0', 'watch:w:r1:1']
+    assert _broadcast(hub, snapshots) == []  # unchanged: nothing sent
+    snapshots['r1'] = {'seq': 3}  # two moves in between: one snapshot
+    assert [data for _, data, _ in _broadcast(hub, snapshots)] == [{'seq': 3}, {'seq': 3}]
+
+
+def test_room_out_of_memory_and_dissolved():
+    hub = SpectatorHub(prefix='w')
+    hub.add('a', 'r1')
+    assert _broadcast(hub, {'r1': None}) == []
+    sent = _broadcast(hub, {'r1': False})
+    assert sent == [('room_dissolved', {'room_id': 'r1'}, 'watch:w:r1:0')]
+    assert len(hub) == 0 and hub.watching('a') is None
+
+
+if __name__ == "__main__":
+    for name, fn in list(globals().items()):
+        if name.startswith('test_'):
+            fn()
+            print(f"✅ {name}")
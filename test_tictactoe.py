@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Test rules engine TicTacToe (bitmask) terhadap implementasi list lama
+"""
+
+import itertools
+import random
+
+from tictactoe import TicTacToe, get_rules
+
+
+def legacy_check_winner(board):
+    wins = [
+        (0,1,2),(3,4,5),(6,7,8),
+        (0,3,6),(1,4,7),(2,5,8),
+        (0,4,8),(2,4,6)
+    ]
+    for a,b,c in wins:
+        if board[a] and board[a] == board[b] == board[c]:
+            return board[a]
+    if all(cell for cell in board):
+        return 'draw'
+    return None
+
+
+def test_win_masks_3x3():
+    rules = get_rules(3, 3)
+    assert len(rules.win_masks) == 8
+    assert len(rules.lines_through[4]) == 4
+    assert len(rules.lines_through[1]) == 2
+
+
+def test_win_masks_15x15_five():
+    rules = get_rules(15, 5)
+    # 4 directions x 5 offsets through a center cell
+    assert len(rules.lines_through[7 * 15 + 7]) == 20
+    assert len(rules.win_masks) == 2 * 15 * 11 + 2 * 11 * 11
+
+
+def test_matches_legacy_on_random_games():
+    rng = random.Random(1)
+    for _ in range(2000):
+        game = TicTacToe()
+        board = [''] * 9
+        mark = 'X'
+        order = list(range(9))
+        rng.shuffle(order)
+        for index in order:
+            result = game.play(index, mark)
+            board[index] = mark
+            assert result == legacy_check_winner(board)
+            assert game.to_list() == board
+            if result:
+                break
+            mark = 'O' if mark == 'X' else 'X'
+
+
+def test_five_in_a_row_diagonal():
+    game = TicTacToe(15)
+    for i, o in zip(range(4), itertools.count(100)):
+        assert game.play(i * 16 + 20, 'X') is None
+        assert game.play(o, 'O') is None
+    assert game.play(4 * 16 + 20, 'X') == 'X'
+    assert game.result() == 'X'
+
+
+def test_occupied_cell_rejected():
+    game = TicTacToe()
+    game.play(4, 'X')
+    assert not game.is_free(4)
+    assert not game.is_free(9)
+    try:
+        game.play(4, 'O')
+    except ValueError:
+        pass
+    else:
+        assert False, "occupied cell accepted"
+    game.undo(4, 'X')
+    assert game.is_free(4) and game.count == 0
+
+
+if __name__ == "__main__":
+    for name, fn in list(globals().items()):
+        if name.startswith('test_'):
+            fn()
+            print(f"✅ {name}")
@@ -0,0 +1,153 @@
+"""
+Bitmask TicTacToe rules engine.
+
+Each side is stored as an integer bitmask (bit i = cell i, row-major) and
+win detection only checks the precomputed k-in-a-row masks that pass
+through the last move, so a move costs O(k) regardless of board size.
+Works for the classic 3x3 board as well as larger boards such as 15x15
+five-in-a-row.
+"""
+
+from functools import lru_cache
+
+MARKS = ('X', 'O')
+DIRECTIONS = ((0, 1), (1, 0), (1, 1), (1, -1))
+
+
+class Rules:
+    """Precomputed win masks for a size x size board with k in a row"""
+
+    def __init__(self, size=3, k=3):
+        if size < 1 or not 1 <= k <= size:
+            raise ValueError(f"invalid board {size}x{size} with {k} in a row")
+        self.size = size
+        self.k = k
+        self.cells = size * size
+        self.full = (1 << self.cells) - 1
+        self.win_masks = []
+        # lines_through[i] = win masks that contain cell i
+        self.lines_through = [[] for _ in range(self.cells)]
+        for r in range(size):
+            for c in range(size):
+                for dr, dc in DIRECTIONS:
+                    end_r, end_c = r + dr * (k - 1), c + dc * (k - 1)
+                    if not (0 <= end_r < size and 0 <= end_c < size):
+                        continue
+                    squares = [(r + dr * i) * size + (c + dc * i) for i in range(k)]
+                    mask = 0
+                    for sq in squares:
+                        mask |= 1 << sq
+                    self.win_masks.append(mask)
+                    for sq in squares:
+                        self.lines_through[sq].append(mask)
+
+    def wins_through(self, bits, index):
+        """True if `bits` holds a complete line passing through `index`"""
+        for mask in self.lines_through[index]:
+            if bits & mask == mask:
+                return True
+        return False
+
+    def has_win(self, bits):
+        """Full scan over every win mask (used when there is no last move)"""
+        for mask in self.win_masks:
+            if bits & mask == mask:
+                return True
+        return False
+
+
+@lru_cache(maxsize=None)
+def get_rules(size=3, k=3):
+    return Rules(size, k)
+
+
+class TicTacToe:
+    """Board state: one bitmask per side plus an occupancy counter"""
+
+    __slots__ = ('rules', 'x', 'o', 'count')
+
+    def __init__(self, size=3, k=None):
+        self.rules = get_rules(size, k if k is not None else min(size, 5))
+        self.x = 0
+        self.o = 0
+        self.count = 0
+
+    @classmethod
+    def from_cells(cls, cells, size=None, k=None):
+        """Build a game from a list of ''/'X'/'O' strings"""
+        if size is None:
+            size = int(len(cells) ** 0.5)
+        game = cls(size, k)
+        for i, v in enumerate(cells):
+            if v == 'X':
+                game.x |= 1 << i
+                game.count += 1
+            elif v == 'O':
+                game.o |= 1 << i
+                game.count += 1
+        return game
+
+    @property
+    def size(self):
+        return self.rules.size
+
+    @property
+    def cells(self):
+        return self.rules.cells
+
+    def reset(self):
+        self.x = 0
+        self.o = 0
+        self.count = 0
+
+    def is_free(self, index):
+        return 0 <= index < self.rules.cells and not ((self.x | self.o) >> index) & 1
+
+    def empties(self):
+        occupied = self.x | self.o
+        return [i for i in range(self.rules.cells) if not (occupied >> i) & 1]
+
+    def bits(self, mark):
+        return self.x if mark == 'X' else self.o
+
+    def play(self, index, mark):
+        """Place `mark` on `index` and return 'X' | 'O' | 'draw' | None"""
+        if not self.is_free(index):
+            raise ValueError(f"cell {index} is not playable")
+        bit = 1 << index
+        if mark == 'X':
+            self.x |= bit
+            bits = self.x
+        else:
+            self.o |= bit
+            bits = self.o
+        self.count += 1
+        if self.rules.wins_through(bits, index):
+            return mark
+        if self.count == self.rules.cells:
+            return 'draw'
+        return None
+
+    def undo(self, index, mark):
+        bit = 1 << index
+        if mark == 'X':
+            self.x &= ~bit
+        else:
+            self.o &= ~bit
+        self.count -= 1
+
+    def result(self):
+        """Winner of the current position without a last-move hint"""
+        if self.rules.has_win(self.x):
+            return 'X'
+        if self.rules.has_win(self.o):
+            return 'O'
+        if self.count == self.rules.cells:
+            return 'draw'
+        return None
+
+    def to_list(self):
+        """Board as the ''/'X'/'O' list the client renders"""
+        x, o = self.x, self.o
+        return ['X' if (x >> i) & 1 else ('O' if (o >> i) & 1 else '')
+                for i in range(self.rules.cells)]